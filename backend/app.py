@@ -10,15 +10,25 @@ from flask import Flask
 from flask_cors import CORS
 from backend.core.config import Config
 from backend.core.log_config import setup_logging
+from backend.core.compression import register_compression
+from backend.core.metrics import register_metrics
+from backend.core.profiler import register_profiler
+from backend.core.tenancy import register_tenancy
 from backend.routes.activity_route import activity_routes
 from backend.routes.health_route import health_routes
 from backend.routes.sleep_route import sleep_routes
-from backend.data.sync import sync_all_data
-from backend.core.garmin_client import garmin_client
+from backend.routes.profile_route import profile_routes
+from backend.routes.sync_route import sync_routes
+from backend.routes.changes_route import change_routes
+from backend.routes.achievements_route import achievement_routes
+from backend.routes.best_efforts_route import best_effort_routes
+from backend.routes.dashboard_route import dashboard_routes
+from backend.routes.training_load_route import training_load_routes
+from backend.routes.map_route import map_routes
+from backend.routes.export_route import export_routes
+from backend.core.garmin_client import GarminClient
 import logging
 
-# Set up application logging
-setup_logging()
 logger = logging.getLogger(__name__)
 
 def create_app():
@@ -31,11 +41,17 @@ def create_app():
     Raises:
         ValueError: If required configuration is missing.
     """
+    # Set up application logging here rather than at import, so importing the
+    # package does not open app.log or touch the root logger
+    setup_logging()
+    
     try:
         # Validate configuration before starting
         Config.validate()
-        # Initialize Garmin client to validate connectivity
-        garmin_client
+        # Initialize Garmin client to validate connectivity; the GarminDb
+        # data source imports local files and needs no login
+        if Config.DATA_SOURCE == 'garmin_connect':
+            GarminClient()
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
         raise
@@ -44,14 +60,37 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     
-    # Enable CORS for all routes
-    CORS(app)
+    # Allow the configured browser origins only, so other web pages cannot
+    # read the API with a user's credentials
+    CORS(app, origins=Config.CORS_ORIGINS)
+    
+    # Resolve the user of each request from its API token
+    register_tenancy(app)
+    
+    # Time every request; registered first so its after_request hook runs
+    # last and the recorded latency includes compression
+    register_metrics(app)
+    
+    # Negotiate gzip/brotli compression for API responses
+    register_compression(app)
+    
+    # Profile admin-flagged or sampled requests
+    register_profiler(app)
     
     # Register API blueprints
     logger.info("Registering blueprints...")  
     app.register_blueprint(activity_routes)
     app.register_blueprint(health_routes)
     app.register_blueprint(sleep_routes)
+    app.register_blueprint(profile_routes)
+    app.register_blueprint(sync_routes)
+    app.register_blueprint(change_routes)
+    app.register_blueprint(achievement_routes)
+    app.register_blueprint(best_effort_routes)
+    app.register_blueprint(dashboard_routes)
+    app.register_blueprint(training_load_routes)
+    app.register_blueprint(map_routes)
+    app.register_blueprint(export_routes)
     
     # Log all registered routes for debugging
     logger.info("Registered routes:")  
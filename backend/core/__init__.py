@@ -1,4 +1,5 @@
 from .config import Config
-from .create_db import get_db
+from .create_db import get_db, get_read_db, replica_router
 from .log_config import setup_logging
-from .garmin_client import garmin_client
+from .garmin_client import GarminClient
+from .events import event_bus
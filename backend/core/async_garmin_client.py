@@ -0,0 +1,187 @@
+"""
+Asynchronous Garmin Connect client for concurrent fetching.
+
+The sequential fetchers wait for one garminconnect call at a time, so a long
+backfill spends nearly all of its time on network round trips. This module
+issues the same connectapi requests with httpx instead, many at once over a
+pooled keep-alive connection, authenticated with the OAuth2 token of the
+user's pooled GarminClient session (loaded from their garth token store).
+Requests still draw from the user's rate limit, so concurrency only fills
+the budget the sequential fetchers leave idle.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .config import Config
+from .garmin_client import GarminClient, token_store
+from .metrics import track_garmin_call
+
+logger = logging.getLogger(__name__)
+
+# Returns the connectapi path and query parameters of a request, given the
+# garminconnect.Garmin session holding the endpoint URLs and display name
+Endpoint = Callable[[Any], Tuple[str, Optional[Dict[str, Any]]]]
+# Activities listed per request of a date range
+ACTIVITY_PAGE_SIZE = 100
+
+class AsyncGarminClient:
+    """
+    Asynchronous client of one user for the Garmin Connect API.
+
+    Methods mirror GarminClient's and, like them, return None (an empty list
+    for get_activities) instead of raising. At most `concurrency` requests
+    are in flight at once. When a session is shared on GarminClient._client
+    (the fake API of the benchmarks), the calls are made through the
+    GarminClient in worker threads instead.
+
+    Example:
+        >>> client = AsyncGarminClient()
+        >>> async with client:
+        ...     summaries = await asyncio.gather(*(client.get_user_summary(day) for day in days))
+    """
+
+    def __init__(self, user_id: Optional[int] = None, concurrency: Optional[int] = None):
+        """
+        Log the user in through their pooled GarminClient.
+
+        Args:
+            user_id: User to fetch for (default: the current user)
+            concurrency: Maximum requests in flight (default: GARMIN_CONCURRENCY)
+        """
+        self._garmin = GarminClient(user_id)
+        self.user_id = self._garmin.user_id
+        self.concurrency = max(concurrency or Config.GARMIN_CONCURRENCY, 1)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._token_lock = asyncio.Lock()
+        self._http = None
+
+    async def __aenter__(self) -> 'AsyncGarminClient':
+        if GarminClient._client is None:
+            # Imported on first use like garminconnect, to keep startup fast
+            import httpx
+            from garth.http import USER_AGENT
+
+            garth = self._garmin._client.garth
+            self._http = httpx.AsyncClient(
+                base_url=f"https://connectapi.{garth.domain}",
+                headers=USER_AGENT,
+                timeout=garth.timeout,
+                limits=httpx.Limits(max_connections=self.concurrency,
+                                    max_keepalive_connections=self.concurrency),
+            )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _refresh_token(self) -> None:
+        """Exchange the OAuth1 token for a new OAuth2 token and save it."""
+        garth = self._garmin._client.garth
+        garth.refresh_oauth2()
+        garth.dump(token_store(self.user_id))
+        logger.info(f"Refreshed the Garmin Connect token of user {self.user_id}")
+
+    async def _authorization(self) -> str:
+        """Return the Authorization header, refreshing an expired token first."""
+        garth = self._garmin._client.garth
+        if not garth.oauth2_token or garth.oauth2_token.expired:
+            async with self._token_lock:
+                if not garth.oauth2_token or garth.oauth2_token.expired:
+                    await asyncio.to_thread(self._refresh_token)
+        return str(garth.oauth2_token)
+
+    async def _fetch(self, method: str, args: tuple, endpoint: Endpoint, binary: bool = False):
+        """
+        Make one API call once the concurrency and rate limits allow it.
+
+        Args:
+            method: GarminClient method the call mirrors, used as the metric label
+            args: Arguments of that method
+            endpoint: Builds the request path and parameters
+            binary: Return the response body instead of the decoded JSON
+
+        Returns:
+            The response data or None if the call failed
+        """
+        async with self._semaphore:
+            if self._http is None:
+                return await asyncio.to_thread(getattr(self._garmin, method), *args)
+            try:
+                await self._garmin._rate_limiter.acquire_async()
+                with track_garmin_call(method):
+                    path, params = endpoint(self._garmin._client)
+                    response = await self._http.get(path, params=params,
+                                                    headers={'Authorization': await self._authorization()})
+                    response.raise_for_status()
+                if binary:
+                    return response.content
+                return None if response.status_code == 204 else response.json()
+            except Exception as e:
+                logger.error(f"Error in {method}({', '.join(str(arg) for arg in args)}): {e}")
+                return None
+
+    async def get_activities(self, start: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Retrieve activities, newest first; see GarminClient.get_activities()."""
+        return await self._fetch('get_activities', (start, limit), lambda api: (
+            api.garmin_connect_activities, {'start': str(start), 'limit': str(limit)})) or []
+
+    async def get_activities_by_date(self, start_date: str, end_date: str) -> Optional[List[Dict[str, Any]]]:
+        """Retrieve the activities of a date range; see GarminClient.get_activities_by_date()."""
+        if self._http is None:
+            return await self._fetch('get_activities_by_date', (start_date, end_date), None)
+        activities = []
+        while True:
+            params = {'startDate': start_date, 'endDate': end_date,
+                      'start': str(len(activities)), 'limit': str(ACTIVITY_PAGE_SIZE)}
+            page = await self._fetch('get_activities_by_date', (start_date, end_date), lambda api: (
+                api.garmin_connect_activities, params))
+            if page is None:
+                return None
+            activities.extend(page)
+            if len(page) < ACTIVITY_PAGE_SIZE:
+                return activities
+
+    async def get_activity_fit(self, activity_id: str) -> Optional[bytes]:
+        """Download the zipped original FIT file of an activity."""
+        return await self._fetch('get_activity_fit', (activity_id,), lambda api: (
+            f"{api.garmin_connect_fit_download}/{activity_id}", None), binary=True)
+
+    async def get_activity_gpx(self, activity_id: str) -> Optional[bytes]:
+        """Download the GPX export of an activity."""
+        return await self._fetch('get_activity_gpx', (activity_id,), lambda api: (
+            f"{api.garmin_connect_gpx_download}/{activity_id}", None), binary=True)
+
+    async def get_user_summary(self, date_str: str) -> Optional[Dict[str, Any]]:
+        """Get the daily summary of a date ("YYYY-MM-DD")."""
+        return await self._fetch('get_user_summary', (date_str,), lambda api: (
+            f"{api.garmin_connect_daily_summary_url}/{api.display_name}", {'calendarDate': date_str}))
+
+    async def get_stats(self, date_str: str) -> Optional[Dict[str, Any]]:
+        """Get the daily statistics of a date, the same data as its summary."""
+        return await self._fetch('get_stats', (date_str,), lambda api: (
+            f"{api.garmin_connect_daily_summary_url}/{api.display_name}", {'calendarDate': date_str}))
+
+    async def get_heart_rates(self, date_str: str) -> Optional[Dict[str, Any]]:
+        """Get the heart rate data of a date."""
+        return await self._fetch('get_heart_rates', (date_str,), lambda api: (
+            f"{api.garmin_connect_heartrates_daily_url}/{api.display_name}", {'date': date_str}))
+
+    async def get_rhr_day(self, date_str: str) -> Optional[Dict[str, Any]]:
+        """Get the resting heart rate data of a date."""
+        return await self._fetch('get_rhr_day', (date_str,), lambda api: (
+            f"{api.garmin_connect_rhr_url}/{api.display_name}",
+            {'fromDate': date_str, 'untilDate': date_str, 'metricId': 60}))
+
+    async def get_intensity_minutes_data(self, date_str: str) -> Optional[Dict[str, Any]]:
+        """Get the intensity minutes of a date."""
+        return await self._fetch('get_intensity_minutes_data', (date_str,), lambda api: (
+            f"{api.garmin_connect_daily_intensity_minutes}/{date_str}", None))
+
+    async def get_sleep_data(self, date_str: str) -> Optional[Dict[str, Any]]:
+        """Get the sleep data of a date."""
+        return await self._fetch('get_sleep_data', (date_str,), lambda api: (
+            f"{api.garmin_connect_daily_sleep_url}/{api.display_name}",
+            {'date': date_str, 'nonSleepBufferMinutes': 60}))
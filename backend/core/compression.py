@@ -0,0 +1,290 @@
+"""
+HTTP response compression for the API.
+
+This module negotiates gzip/brotli content encoding for API responses and
+keeps precompressed snapshots of the hottest payloads (the unfiltered activity,
+health and sleep lists and the activity max values) per user. Snapshots are
+rebuilt after each sync, so those responses are served without recompressing
+per request, and tagged with the sync generation they were built from, so
+workers that did not run the sync rebuild them once the generation moves.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from flask import Response, request
+from .config import Config
+from .tenancy import current_user_id
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Mimetypes worth compressing; everything else (images, video, already
+# compressed downloads) is passed through untouched
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/csv', 'text/plain', 'text/html'}
+
+def supported_encodings() -> list:
+    """Return the content encodings this server can produce, in preference order."""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the best content encoding accepted by the client.
+
+    Args:
+        accept_encoding: Raw value of the Accept-Encoding request header
+
+    Returns:
+        'br', 'gzip' or None if the client accepts neither
+    """
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+
+    for encoding in supported_encodings():
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    Compress a response body with the given content encoding.
+
+    Args:
+        body: Uncompressed response body
+        encoding: 'br' or 'gzip'
+        level: Compression level, defaults to Config.COMPRESSION_LEVEL
+
+    Returns:
+        Compressed bytes
+    """
+    if level is None:
+        level = Config.COMPRESSION_LEVEL
+    if encoding == 'br':
+        # Brotli quality runs 0-11, scale the gzip-style 1-9 level onto it
+        return brotli.compress(body, quality=min(11, round(level * 11 / 9)))
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+def register_compression(app) -> None:
+    """
+    Install an after_request hook that compresses API responses on the fly.
+
+    Responses are left alone when they are streamed, already encoded, too
+    small to benefit, or not a compressible mimetype.
+
+    Args:
+        app: Flask application instance
+    """
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+
+        body = response.get_data()
+        if len(body) < Config.COMPRESSION_MIN_SIZE:
+            return response
+
+        response.set_data(compress(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+class SnapshotCache:
+    """
+    In-memory store of precompressed JSON payloads.
+
+    Each snapshot is registered with a builder function returning the
+    JSON-serializable payload. The payload is encoded once and compressed
+    once per supported encoding at maximum level; requests then pick the
+    stored variant matching their Accept-Encoding header. Builders read the
+    current user's data, so snapshots are stored per (key, user id).
+
+    A snapshot is stale once the caller's generation is newer than the one
+    it was built from, or after Config.SNAPSHOT_MAX_AGE for changes made
+    outside the change log. Only one request rebuilds a stale snapshot; the
+    others keep serving the previous one meanwhile.
+    """
+
+    def __init__(self):
+        self._builders: Dict[str, Callable[[], Any]] = {}
+        self._snapshots: Dict[tuple, Dict[str, Any]] = {}
+        # One lock per (key, user id), held while its snapshot is rebuilt
+        self._building: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, key: str, builder: Callable[[], Any]) -> None:
+        """
+        Register a payload builder under a snapshot key.
+
+        Args:
+            key: Snapshot name, e.g. 'activities'
+            builder: Zero-argument callable returning the JSON payload
+        """
+        self._builders[key] = builder
+
+    def _build(self, key: str, generation: int) -> Dict[str, Any]:
+        """Run the builder for a key and encode the result in every supported encoding."""
+        payload = self._builders[key]()
+        body = json.dumps(payload, separators=(',', ':'), sort_keys=True, default=str).encode('utf-8')
+        snapshot = {
+            'identity': body,
+            'etag': hashlib.sha1(body).hexdigest(),
+            'generation': generation,
+            'built_at': time.monotonic(),
+        }
+        for encoding in supported_encodings():
+            snapshot[encoding] = compress(body, encoding, level=9)
+        logger.debug(f"Built snapshot '{key}' ({len(body)} bytes)")
+        return snapshot
+
+    def _building_lock(self, cached: tuple) -> threading.Lock:
+        """Return the lock serializing rebuilds of a (key, user id) snapshot."""
+        with self._lock:
+            return self._building.setdefault(cached, threading.Lock())
+
+    @staticmethod
+    def _fresh(snapshot: Optional[Dict[str, Any]], generation: int) -> bool:
+        """Check whether a snapshot still reflects the given generation."""
+        return (snapshot is not None
+                # A lagging read replica may report an older generation
+                and snapshot['generation'] >= generation
+                and time.monotonic() - snapshot['built_at'] <= Config.SNAPSHOT_MAX_AGE)
+
+    def refresh(self, generation: int, keys: Optional[Iterable[str]] = None) -> None:
+        """
+        Rebuild the current user's snapshots, typically right after a sync has finished.
+
+        A failing builder only drops its own snapshot; it is rebuilt lazily
+        on the next request.
+
+        Args:
+            generation: Latest complete generation, read before building
+            keys: Snapshot keys to rebuild, defaults to all registered keys
+        """
+        user_id = current_user_id()
+        for key in list(keys or self._builders):
+            cached = (key, user_id)
+            with self._building_lock(cached):
+                try:
+                    snapshot = self._build(key, generation)
+                    with self._lock:
+                        self._snapshots[cached] = snapshot
+                except Exception as e:
+                    logger.error(f"Failed to refresh snapshot '{key}': {e}")
+                    with self._lock:
+                        self._snapshots.pop(cached, None)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Drop one snapshot for every user, or all of them if no key is given.
+
+        Args:
+            key: Snapshot key to drop
+        """
+        with self._lock:
+            if key is None:
+                self._snapshots.clear()
+            else:
+                for cached in [cached for cached in self._snapshots if cached[0] == key]:
+                    del self._snapshots[cached]
+
+    def get(self, key: str, generation: int) -> Dict[str, Any]:
+        """
+        Return the current user's snapshot for a key, building it if missing or stale.
+
+        While one request rebuilds a stale snapshot, concurrent requests get
+        the stale one instead of building it again; without any snapshot
+        they wait for the build.
+
+        Args:
+            key: Snapshot key
+            generation: Latest complete generation, read before building
+
+        Returns:
+            Snapshot dictionary holding the encoded bodies and ETag
+        """
+        cached = (key, current_user_id())
+        with self._lock:
+            snapshot = self._snapshots.get(cached)
+        if self._fresh(snapshot, generation):
+            return snapshot
+
+        building = self._building_lock(cached)
+        if snapshot is None:
+            building.acquire()
+        elif not building.acquire(blocking=False):
+            return snapshot
+        try:
+            # Another request may have rebuilt it while this one waited
+            with self._lock:
+                snapshot = self._snapshots.get(cached)
+            if not self._fresh(snapshot, generation):
+                snapshot = self._build(key, generation)
+                with self._lock:
+                    self._snapshots[cached] = snapshot
+            return snapshot
+        finally:
+            building.release()
+
+    def response(self, key: str, generation: int) -> Response:
+        """
+        Build a Flask response serving the snapshot for the current request.
+
+        Args:
+            key: Snapshot key
+            generation: Latest complete generation, read before building
+
+        Returns:
+            Response with the negotiated precompressed body, or 304 if the
+            client already holds the current version
+        """
+        snapshot = self.get(key, generation)
+        etag = snapshot['etag']
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+            response = Response(snapshot[encoding] if encoding else snapshot['identity'],
+                                mimetype='application/json')
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        return response
+
+
+# Global snapshot cache shared by the route modules and the sync
+snapshot_cache = SnapshotCache()
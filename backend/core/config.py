@@ -18,13 +18,89 @@ class Config:
     # Server settings
     PORT = int(os.getenv('PORT', 5000))
     
+    # Data source settings: 'garmin_connect' calls the Garmin Connect API live,
+    # 'garmindb' imports from the SQLite files produced by garmindb_cli.py
+    DATA_SOURCE = os.getenv('DATA_SOURCE', 'garmin_connect')
+    GARMINDB_DIR = os.getenv('GARMINDB_DIR')  # Directory holding garmin.db and garmin_activities.db
+    GARMINDB_METRIC = os.getenv('GARMINDB_METRIC', 'true').lower() == 'true'  # Units the GarminDb files were written in
+    
     # Database settings
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_CONNECTION_STRING')
+    if not SQLALCHEMY_DATABASE_URI and DATA_SOURCE == 'garmindb':
+        # Keep the served data on local disk next to the GarminDb mirror
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{BASE_DIR / 'garminsync.db'}"
+    
+    # Read-only database settings for the API read endpoints. Without a replica
+    # connection string reads use the primary with the read isolation level
+    READ_DATABASE_CONNECTION_STRING = os.getenv('READ_DATABASE_CONNECTION_STRING')
+    READ_ISOLATION_LEVEL = os.getenv('READ_ISOLATION_LEVEL', 'AUTOCOMMIT')  # Or 'SNAPSHOT' on Azure SQL
+    REPLICA_MAX_LAG_SECONDS = int(os.getenv('REPLICA_MAX_LAG_SECONDS', 30))  # Fall back to the primary beyond this
+    REPLICA_LAG_CHECK_INTERVAL = int(os.getenv('REPLICA_LAG_CHECK_INTERVAL', 15))  # Seconds between lag probes
     
     # Garmin API settings
     GARMIN_USERNAME = os.getenv('GARMIN_USERNAME')
     GARMIN_PASSWORD = os.getenv('GARMIN_PASSWORD')
+    GARMIN_TOKEN_DIR = os.getenv('GARMIN_TOKEN_DIR', str(BASE_DIR / 'garmin_tokens'))  # One token store per user below it
+    GARMIN_CALLS_PER_MINUTE = int(os.getenv('GARMIN_CALLS_PER_MINUTE', 300))  # Per user, 0 for no limit
+    GARMIN_CALL_BURST = int(os.getenv('GARMIN_CALL_BURST', 30))  # Calls a user may make at once before throttling
+    GARMIN_CONCURRENCY = int(os.getenv('GARMIN_CONCURRENCY', 8))  # Requests in flight per user during a sync, 1 for the sequential fetchers
+    SYNC_WRITE_BATCH = int(os.getenv('SYNC_WRITE_BATCH', 50))  # Rows committed together by the concurrent fetchers
+    SYNC_ACTIVITY_CHUNK_DAYS = int(os.getenv('SYNC_ACTIVITY_CHUNK_DAYS', 30))  # Days of activities listed and checkpointed at a time by date-range syncs
+    SYNC_REFETCH_DAYS = int(os.getenv('SYNC_REFETCH_DAYS', 3))  # Most recent days, today included, fetched by every sync and never checkpointed
+    CHANGES_PAGE_SIZE = int(os.getenv('CHANGES_PAGE_SIZE', 1000))  # Change log rows per /api/changes response
+
+    # Multi-user settings: requests without an API token, syncs run
+    # outside the scheduler and rows from single-user databases belong to
+    # DEFAULT_USER_ID, which uses the GARMIN_USERNAME/GARMIN_PASSWORD account
+    DEFAULT_USER_ID = int(os.getenv('DEFAULT_USER_ID', 1))
+    SYNC_MAX_CONCURRENT_USERS = int(os.getenv('SYNC_MAX_CONCURRENT_USERS', 4))  # Users synced in parallel
+
+    # Request authentication: a request acts for the user whose API token it
+    # carries (Authorization: Bearer). Requests without one are served as
+    # DEFAULT_USER_ID unless AUTH_REQUIRED is set, which team deployments should do.
+    AUTH_REQUIRED = os.getenv('AUTH_REQUIRED', 'false').lower() == 'true'
+    # Take X-User-Id without a token; only behind an auth proxy that sets the
+    # header itself and strips it from client requests
+    TRUST_USER_HEADER = os.getenv('TRUST_USER_HEADER', 'false').lower() == 'true'
+    CORS_ORIGINS = [origin.strip() for origin in os.getenv(
+        'CORS_ORIGINS', 'http://localhost:3000').split(',') if origin.strip()]  # Browser origins allowed to call the API
+
+    # Response compression settings
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))  # Bytes
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))  # gzip level for on-the-fly compression
+    SNAPSHOT_MAX_AGE = int(os.getenv('SNAPSHOT_MAX_AGE', 300))  # Seconds before a precompressed snapshot is rebuilt without a new sync generation
+
+    # Best effort settings: distances in meters and durations in seconds
+    # searched for in every activity track
+    BEST_EFFORT_DISTANCES = [float(value) for value in os.getenv(
+        'BEST_EFFORT_DISTANCES', '1000,5000,10000,21097.5,42195').split(',') if value.strip()]
+    BEST_EFFORT_DURATIONS = [float(value) for value in os.getenv(
+        'BEST_EFFORT_DURATIONS', '60,300,1200,3600').split(',') if value.strip()]
+
+    # Track storage: 'columnar' stores one encoded row per activity,
+    # 'rows' one activity_records row per track point
+    TRACK_STORAGE = os.getenv('TRACK_STORAGE', 'columnar')
+
+    # Training load time constants in days (fatigue and fitness)
+    ATL_DAYS = int(os.getenv('ATL_DAYS', 7))
+    CTL_DAYS = int(os.getenv('CTL_DAYS', 42))
+
+    # Logging settings
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')  # Minimum level logged; DEBUG enables per-item detail
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # 'text' or 'json' (one object per line)
+    LOG_FILE = os.getenv('LOG_FILE', 'app.log')  # Empty to disable file logging
+    LOG_FILE_MAX_BYTES = int(os.getenv('LOG_FILE_MAX_BYTES', 10 * 1024 * 1024))  # Rotate the log file at this size
+    LOG_FILE_BACKUPS = int(os.getenv('LOG_FILE_BACKUPS', 5))  # Rotated log files kept
+    LOG_RATE_LIMIT = float(os.getenv('LOG_RATE_LIMIT', 20))  # INFO/DEBUG records per second per logger, 0 for no limit
+    LOG_RATE_BURST = int(os.getenv('LOG_RATE_BURST', 200))  # Records a logger may emit at once before limiting
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', 1.0))  # Fraction of DEBUG records kept
+
+    # Request profiler settings
+    PROFILER_ADMIN_TOKEN = os.getenv('PROFILER_ADMIN_TOKEN')  # Required for on-demand profiles and reading reports
+    PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', 0))  # Fraction of requests profiled automatically
+    PROFILER_MAX_REPORTS = int(os.getenv('PROFILER_MAX_REPORTS', 100))  # Reports kept in memory
+    PROFILER_DIR = os.getenv('PROFILER_DIR')  # Optional directory to persist reports as JSON
 
     @classmethod
     def validate(cls):
@@ -32,11 +108,15 @@ class Config:
         Validate that all required configuration variables are set.
         Raises ValueError if any required variables are missing.
         """
+        if cls.DATA_SOURCE not in ('garmin_connect', 'garmindb'):
+            raise ValueError(f"Unknown DATA_SOURCE '{cls.DATA_SOURCE}', expected 'garmin_connect' or 'garmindb'")
+        
         required_vars = {
-            'GARMIN_USERNAME': cls.GARMIN_USERNAME,
-            'GARMIN_PASSWORD': cls.GARMIN_PASSWORD,
             'DATABASE_CONNECTION_STRING': cls.SQLALCHEMY_DATABASE_URI,
         }
+        if cls.DATA_SOURCE == 'garmin_connect':
+            required_vars['GARMIN_USERNAME'] = cls.GARMIN_USERNAME
+            required_vars['GARMIN_PASSWORD'] = cls.GARMIN_PASSWORD
         
         missing = [key for key, value in required_vars.items() if not value]
         if missing:
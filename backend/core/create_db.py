@@ -3,32 +3,175 @@ Database connection management for the application.
 
 This module provides functions for establishing and managing database connections
 using SQLAlchemy. It sets up connection pooling and provides a context manager
-pattern for handling database sessions.
+pattern for handling database sessions. Writes go to the primary database, while
+API reads are routed to a read-only engine (a replica, or the primary with
+autocommit/snapshot reads) that falls back to the primary when the replica lags.
 """
 
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.pool import QueuePool
 from .config import Config
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Create database engine with connection pooling for better performance
-engine = create_engine(
-    Config.SQLALCHEMY_DATABASE_URI,
-    pool_size=5,  # Number of connections to keep open
-    max_overflow=10,  # Maximum number of connections to create beyond pool_size
-    pool_timeout=30,  # Seconds to wait before giving up on getting a connection
-    pool_recycle=3600,  # Recycle connections after 1 hour to prevent stale connections
-    pool_pre_ping=True  # Verify connections before using them
-)
+# Engines are created on first use rather than at import, so importing the
+# package (forked workers, tooling, benchmarks) does not connect or read
+# driver settings before create_app() has validated the configuration
+_engine = None
+_read_engine = None
+_engine_lock = threading.Lock()
 
-# Create session factory for creating new database sessions
-SessionFactory = sessionmaker(bind=engine)
+def _create_engine(url: str, **kwargs):
+    """
+    Create an engine with the shared connection pool settings.
+    
+    Args:
+        url: SQLAlchemy database URL
+        **kwargs: Extra create_engine() arguments
+        
+    Returns:
+        SQLAlchemy Engine
+    """
+    if not url:
+        raise ValueError("DATABASE_CONNECTION_STRING environment variable is not set.")
+    
+    # Driver timeouts only apply to the Azure SQL (pyodbc) connection; local SQLite
+    # databases used with the GarminDb data source take no such arguments
+    connect_args = {}
+    if make_url(url).get_backend_name() == 'mssql':
+        connect_args = {'login_timeout': 30, 'timeout': 90}
+    
+    return create_engine(
+        url,
+        connect_args=connect_args,
+        pool_size=5,  # Number of connections to keep open
+        max_overflow=10,  # Maximum number of connections to create beyond pool_size
+        pool_timeout=30,  # Seconds to wait before giving up on getting a connection
+        pool_recycle=3600,  # Recycle connections after 1 hour to prevent stale connections
+        pool_pre_ping=True,  # Verify connections before using them
+        pool_use_lifo=True,  # Reuse warm connections so idle ones can expire
+        **kwargs
+    )
+
+def get_engine():
+    """
+    Return the primary database engine, creating it on first use.
+    
+    Returns:
+        SQLAlchemy Engine for the primary database
+        
+    Raises:
+        ValueError: If DATABASE_CONNECTION_STRING is not configured
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(Config.SQLALCHEMY_DATABASE_URI)
+    return _engine
+
+def get_read_engine():
+    """
+    Return the read-only engine for the API read endpoints, creating it on first use.
+    
+    Autocommit reads do not hold locks for the lifetime of the session, so
+    dashboards stop competing with sync writes; on a replica they leave the
+    primary alone entirely.
+    
+    Returns:
+        SQLAlchemy Engine for the replica, or the primary with the read isolation level
+    """
+    global _read_engine
+    if _read_engine is None:
+        with _engine_lock:
+            if _read_engine is None:
+                _read_engine = _create_engine(
+                    Config.READ_DATABASE_CONNECTION_STRING or Config.SQLALCHEMY_DATABASE_URI,
+                    isolation_level=Config.READ_ISOLATION_LEVEL
+                )
+    return _read_engine
+
+# Thread-local session registries; the factories bind to their engine when
+# the first session is opened
+SessionFactory = sessionmaker()
+Session = scoped_session(lambda: SessionFactory(bind=get_engine()))
+
+ReadSessionFactory = sessionmaker()
+ReadSession = scoped_session(lambda: ReadSessionFactory(bind=get_read_engine()))
+
+
+class ReplicaRouter:
+    """
+    Decide whether reads may go to the replica or must fall back to the primary.
+
+    Reads fall back to the primary for REPLICA_MAX_LAG_SECONDS after this process
+    wrote (so a sync is immediately visible to the snapshots it refreshes), and
+    whenever the replica lag reported by the database exceeds the same threshold.
+    """
+
+    def __init__(self):
+        self._last_write = 0.0
+        self._last_check = 0.0
+        self._replica_lag: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def mark_write(self) -> None:
+        """Record that this process has just committed writes to the primary."""
+        self._last_write = time.monotonic()
+
+    def _probe_lag(self) -> Optional[float]:
+        """
+        Ask the primary how far the readable secondaries are behind.
+
+        Returns:
+            Replica lag in seconds, or None if the database cannot report it
+        """
+        try:
+            with get_engine().connect() as connection:
+                lag = connection.execute(text(
+                    "SELECT MAX(secondary_lag_seconds) FROM sys.dm_database_replica_states"
+                )).scalar()
+            return float(lag) if lag is not None else 0.0
+        except Exception as e:
+            logger.debug(f"Replica lag probe unavailable: {e}")
+            return None
+
+    def replica_lag(self) -> Optional[float]:
+        """Return the last probed replica lag, probing at most every REPLICA_LAG_CHECK_INTERVAL seconds."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_check >= Config.REPLICA_LAG_CHECK_INTERVAL:
+                self._last_check = now
+                self._replica_lag = self._probe_lag()
+            return self._replica_lag
+
+    def use_replica(self) -> bool:
+        """
+        Check whether the next read may be served by the read-only engine.
+
+        Returns:
+            True to read from the read engine, False to fall back to the primary
+        """
+        if not Config.READ_DATABASE_CONNECTION_STRING:
+            # The read engine points at the primary itself, nothing can lag
+            return True
+        if time.monotonic() - self._last_write < Config.REPLICA_MAX_LAG_SECONDS:
+            return False
+
+        lag = self.replica_lag()
+        if lag is not None and lag > Config.REPLICA_MAX_LAG_SECONDS:
+            logger.warning(f"Replica lag {lag:.0f}s exceeds threshold, reading from primary")
+            return False
+        return True
 
-# Create thread-local session registry
-Session = scoped_session(SessionFactory)
+
+# Global router shared by the read endpoints and the sync
+replica_router = ReplicaRouter()
 
 def get_db():
     """
@@ -63,4 +206,21 @@ def get_db():
         yield db
     finally:
         db.close()
-        logger.debug("Database session closed")
\ No newline at end of file
+        logger.debug("Database session closed")
+
+def get_read_db():
+    """
+    Context manager for read-only database sessions.
+    
+    Works like get_db(), but yields a session bound to the read-only engine
+    unless the replica router decides to fall back to the primary. Only use
+    it for queries; writes must go through get_db().
+    
+    Yields:
+        SQLAlchemy Session: A database session for executing read queries
+    """
+    db = ReadSession() if replica_router.use_replica() else Session()
+    try:
+        yield db
+    finally:
+        db.close()
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+In-process event bus for Server-Sent Events.
+
+This module broadcasts sync progress and "data changed" notifications to the
+clients connected to the SSE stream. Every event gets an increasing id and the
+newest events are kept in a short history, so a client reconnecting with the
+Last-Event-ID header receives what it missed. Events are tagged with the
+user whose sync published them and only reach that user's streams. The bus
+lives in the process that runs the sync; with several server workers only
+clients connected to that worker see its events.
+"""
+
+import json
+import logging
+import queue
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, Optional
+from .tenancy import current_user_id
+
+logger = logging.getLogger(__name__)
+
+# Events kept for clients that reconnect with Last-Event-ID
+HISTORY_SIZE = 500
+# Events buffered per client before a slow client starts losing them
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = 15
+
+def format_sse(event_id: int, event: str, data: Dict[str, Any]) -> str:
+    """
+    Encode one event in the text/event-stream wire format.
+
+    Args:
+        event_id: Event id sent as the SSE id field
+        event: Event type, e.g. 'progress'
+        data: JSON-serializable event payload
+
+    Returns:
+        SSE message terminated by a blank line
+    """
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class EventBus:
+    """
+    Fan-out of published events to every subscribed stream.
+
+    Each subscriber owns a bounded queue; publishing never blocks, and when a
+    client falls too far behind its oldest pending events are dropped.
+    """
+
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        # Subscriber queue mapped to the user it streams events of
+        self._subscribers: Dict[queue.Queue, int] = {}
+        self._history = deque(maxlen=history_size)
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def publish(self, event: str, data: Dict[str, Any]) -> int:
+        """
+        Broadcast an event to the current user's subscribers.
+
+        Args:
+            event: Event type
+            data: JSON-serializable event payload
+
+        Returns:
+            Id assigned to the event
+        """
+        user_id = current_user_id()
+        with self._lock:
+            event_id = self._next_id
+            self._next_id += 1
+            message = (event_id, event, data)
+            self._history.append((user_id, message))
+            subscribers = [subscriber for subscriber, subscribed_user in self._subscribers.items()
+                           if subscribed_user == user_id]
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # Drop the oldest pending event to make room for the newest
+                try:
+                    subscriber.get_nowait()
+                    subscriber.put_nowait(message)
+                except (queue.Empty, queue.Full):
+                    pass
+        return event_id
+
+    def subscribe(self, last_event_id: Optional[int] = None, user_id: Optional[int] = None) -> queue.Queue:
+        """
+        Register a new subscriber.
+
+        Args:
+            last_event_id: Id of the last event the client received; newer
+                events still in the history are queued immediately
+            user_id: User whose events to receive; defaults to the current user
+
+        Returns:
+            Queue receiving (id, event, data) tuples
+        """
+        if user_id is None:
+            user_id = current_user_id()
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            if last_event_id is not None:
+                for published_user, message in self._history:
+                    if published_user == user_id and message[0] > last_event_id:
+                        subscriber.put_nowait(message)
+            self._subscribers[subscriber] = user_id
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        """Remove a subscriber registered with subscribe()."""
+        with self._lock:
+            self._subscribers.pop(subscriber, None)
+
+    def stream(self, last_event_id: Optional[int] = None, user_id: Optional[int] = None,
+               heartbeat: float = HEARTBEAT_INTERVAL) -> Iterator[str]:
+        """
+        Yield SSE messages for one client until it disconnects.
+
+        Sends a comment line every `heartbeat` seconds without events so
+        proxies keep the connection open and dead clients are detected.
+
+        Args:
+            last_event_id: Id of the last event the client received
+            user_id: User whose events to stream; defaults to the current user
+            heartbeat: Seconds between keep-alive comments
+
+        Yields:
+            SSE-formatted strings
+        """
+        subscriber = self.subscribe(last_event_id, user_id)
+        try:
+            # Tell the browser how long to wait before reconnecting
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event_id, event, data = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event_id, event, data)
+        finally:
+            self.unsubscribe(subscriber)
+            logger.debug("SSE client disconnected")
+
+
+# Global event bus shared by the sync and the stream endpoint
+event_bus = EventBus()
+
+def publish_progress(phase: str, **data) -> None:
+    """
+    Publish a sync progress event.
+
+    Args:
+        phase: Sync phase, e.g. 'activities', 'health' or 'sleep'
+        **data: Progress details such as the date processed or counts so far
+    """
+    event_bus.publish('progress', {'phase': phase, **data})
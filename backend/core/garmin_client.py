@@ -1,60 +1,181 @@
 """
 Garmin Connect API client for fetching activity and health data.
 
-This module provides a singleton interface to the Garmin Connect API using
+This module provides per-user interfaces to the Garmin Connect API using
 the garminconnect library, handling authentication, session management,
-and data retrieval with appropriate error handling.
+and data retrieval with appropriate error handling. Clients are pooled per
+user; each resumes its session from the user's garth token store under
+GARMIN_TOKEN_DIR, so only the first login needs a password, and each is
+throttled by its own token bucket so one user's sync cannot use up the
+Garmin Connect rate limit of the others.
+
+Run `python -m backend.core.garmin_client <user_id> <garmin_username>` to
+log a user in once and create their token store.
 """
 
-import garminconnect
+import argparse
+import asyncio
+import getpass
 import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
 from typing import Optional, Dict, List, Any
 from .config import Config
+from .metrics import track_garmin_call
+from .tenancy import current_user_id
 
 logger = logging.getLogger(__name__)
 
+class RateLimiter:
+    """
+    Blocking token bucket allowing `rate` calls per minute with bursts.
+    """
+
+    def __init__(self, per_minute: int, burst: int):
+        self.rate = per_minute / 60.0
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token if one is available, else return the seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        """Wait until a call is allowed, then take its token."""
+        if self.rate <= 0:
+            return
+        while True:
+            wait = self._reserve()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Like acquire(), but waits without blocking the event loop."""
+        if self.rate <= 0:
+            return
+        while True:
+            wait = self._reserve()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+def token_store(user_id: int) -> str:
+    """Return the garth token store directory of a user."""
+    return os.path.join(Config.GARMIN_TOKEN_DIR, str(user_id))
+
 class GarminClient:
     """
-    Singleton client for interacting with the Garmin Connect API.
+    Per-user client for interacting with the Garmin Connect API.
     
     This class manages authentication and provides methods for 
     retrieving various types of fitness data from Garmin Connect.
+    GarminClient(user_id) returns the pooled client of that user (the
+    current user by default), logging in on first use.
     """
     
-    _instance = None
+    _instances: Dict[int, 'GarminClient'] = {}
+    _instances_lock = threading.Lock()
+    # Session shared by every user when set on the class, e.g. a fake API
+    # in the benchmarks; otherwise each instance logs in on its own
     _client = None
 
-    def __new__(cls):
-        """Ensure only one instance of the client exists."""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    def __new__(cls, user_id: Optional[int] = None):
+        """Return the pooled client of a user, creating it if needed."""
+        if user_id is None:
+            user_id = current_user_id()
+        with cls._instances_lock:
+            instance = cls._instances.get(user_id)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance.user_id = user_id
+                instance._rate_limiter = RateLimiter(Config.GARMIN_CALLS_PER_MINUTE, Config.GARMIN_CALL_BURST)
+                instance._login_lock = threading.Lock()
+                cls._instances[user_id] = instance
+        return instance
 
-    def __init__(self):
+    def __init__(self, user_id: Optional[int] = None):
         """Initialize the Garmin Connect client if it doesn't exist."""
         if not self._client:
-            self._initialize_client()
+            with self._login_lock:
+                if not self._client:
+                    self._initialize_client()
+
+    @classmethod
+    def discard(cls, user_id: int) -> None:
+        """Drop a user's pooled client, e.g. after their tokens were revoked."""
+        with cls._instances_lock:
+            cls._instances.pop(user_id, None)
+
+    def _credentials(self):
+        """
+        Return the Garmin login of the client's user.
+
+        The default user logs in with GARMIN_USERNAME/GARMIN_PASSWORD; other
+        users need a token store created by this module's command line.
+        """
+        if self.user_id == Config.DEFAULT_USER_ID:
+            return Config.GARMIN_USERNAME, Config.GARMIN_PASSWORD
+        return None, None
 
     def _initialize_client(self):
         """
-        Set up the Garmin Connect client with credentials from config.
+        Set up the Garmin Connect client from the token store or credentials.
         
         Raises:
-            ValueError: If Garmin credentials are not configured.
+            ValueError: If the user has neither a token store nor credentials.
             Exception: If login to Garmin Connect fails.
         """
-        if not Config.GARMIN_USERNAME or not Config.GARMIN_PASSWORD:
-            raise ValueError("Garmin credentials not set. Please configure GARMIN_USERNAME and GARMIN_PASSWORD.")
+        tokens = token_store(self.user_id)
+        has_tokens = os.path.isdir(tokens)
+        username, password = self._credentials()
+        if not has_tokens and (not username or not password):
+            if self.user_id == Config.DEFAULT_USER_ID:
+                raise ValueError("Garmin credentials not set. Please configure GARMIN_USERNAME and GARMIN_PASSWORD.")
+            raise ValueError(f"No Garmin token store for user {self.user_id}; log the user in first")
+        
+        # Imported on first use: garminconnect pulls in garth and pydantic,
+        # which dominate the package import time
+        import garminconnect
         
         try:
-            self._client = garminconnect.Garmin(Config.GARMIN_USERNAME, Config.GARMIN_PASSWORD)
-            self._client.login()
+            client = garminconnect.Garmin(username, password)
+            with track_garmin_call('login'):
+                try:
+                    client.login(tokens if has_tokens else None)
+                except Exception:
+                    if not has_tokens or not password:
+                        raise
+                    # Expired or corrupt tokens: fall back to the password
+                    logger.warning(f"Token login failed for user {self.user_id}, logging in with credentials")
+                    client.login()
+            client.garth.dump(tokens)
+            self._client = client
             self._verify_session()
-            logger.info("Successfully logged in to Garmin Connect")
+            logger.info(f"Successfully logged in to Garmin Connect for user {self.user_id}")
         except Exception as e:
-            logger.error(f"Failed to initialize Garmin client: {e}")
+            self._client = None
+            logger.error(f"Failed to initialize Garmin client for user {self.user_id}: {e}")
             raise
 
+    @contextmanager
+    def _request(self, method: str):
+        """Wait for the user's rate limit, then time the API call."""
+        self._rate_limiter.acquire()
+        with track_garmin_call(method):
+            yield
+
     def _verify_session(self):
         """
         Verify that the session is active by making a simple API call.
@@ -81,11 +202,31 @@ class GarminClient:
             List of activity dictionaries
         """
         try:
-            return self._client.get_activities(start, limit)
+            with self._request('get_activities'):
+                return self._client.get_activities(start, limit)
         except Exception as e:
             logger.error(f"Error fetching activities: {e}")
             return []
 
+    def get_activities_by_date(self, start_date: str, end_date: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Retrieve the activities started within a date range.
+        
+        Args:
+            start_date: First date in format "YYYY-MM-DD"
+            end_date: Last date in format "YYYY-MM-DD"
+            
+        Returns:
+            List of activity dictionaries, or None if retrieval fails, so a
+            failed request is not mistaken for a range without activities
+        """
+        try:
+            with self._request('get_activities_by_date'):
+                return self._client.get_activities_by_date(start_date, end_date)
+        except Exception as e:
+            logger.error(f"Error fetching activities from {start_date} to {end_date}: {e}")
+            return None
+
     def get_activity_gpx(self, activity_id: str) -> Optional[str]:
         """
         Download GPX data for a specific activity.
@@ -97,14 +238,35 @@ class GarminClient:
             String containing GPX XML data or None if retrieval fails
         """
         try:
-            return self._client.download_activity(
-                activity_id,
-                dl_fmt=self._client.ActivityDownloadFormat.GPX
-            )
+            with self._request('get_activity_gpx'):
+                return self._client.download_activity(
+                    activity_id,
+                    dl_fmt=self._client.ActivityDownloadFormat.GPX
+                )
         except Exception as e:
             logger.error(f"Error fetching GPX data for activity {activity_id}: {e}")
             return None
 
+    def get_activity_fit(self, activity_id: str) -> Optional[bytes]:
+        """
+        Download the original FIT file for a specific activity.
+        
+        Args:
+            activity_id: ID of the activity to retrieve the FIT file for
+            
+        Returns:
+            Bytes of the zip archive holding the FIT file or None if retrieval fails
+        """
+        try:
+            with self._request('get_activity_fit'):
+                return self._client.download_activity(
+                    activity_id,
+                    dl_fmt=self._client.ActivityDownloadFormat.ORIGINAL
+                )
+        except Exception as e:
+            logger.warning(f"Error fetching FIT data for activity {activity_id}: {e}")
+            return None
+
     def get_user_summary(self, date_str: str) -> Optional[Dict[str, Any]]:
         """
         Get daily summary data for a specific date.
@@ -116,7 +278,8 @@ class GarminClient:
             Dictionary of summary data or None if retrieval fails
         """
         try:
-            return self._client.get_user_summary(date_str)
+            with self._request('get_user_summary'):
+                return self._client.get_user_summary(date_str)
         except Exception as e:
             logger.error(f"Error fetching user summary for date {date_str}: {e}")
             return None
@@ -132,7 +295,8 @@ class GarminClient:
             Dictionary of heart rate data or None if retrieval fails
         """
         try:
-            return self._client.get_heart_rates(date_str)
+            with self._request('get_heart_rates'):
+                return self._client.get_heart_rates(date_str)
         except Exception as e:
             logger.error(f"Error fetching heart rate data for date {date_str}: {e}")
             return None
@@ -148,7 +312,8 @@ class GarminClient:
             Dictionary of RHR data or None if retrieval fails
         """
         try:
-            return self._client.get_rhr_day(date_str)
+            with self._request('get_rhr_day'):
+                return self._client.get_rhr_day(date_str)
         except Exception as e:
             logger.error(f"Error fetching RHR data for date {date_str}: {e}")
             return None
@@ -164,7 +329,8 @@ class GarminClient:
             Dictionary of intensity minutes data or None if retrieval fails
         """
         try:
-            return self._client.get_intensity_minutes_data(date_str)
+            with self._request('get_intensity_minutes_data'):
+                return self._client.get_intensity_minutes_data(date_str)
         except Exception as e:
             logger.error(f"Error fetching intensity minutes for date {date_str}: {e}")
             return None
@@ -180,7 +346,8 @@ class GarminClient:
             Dictionary of daily stats or None if retrieval fails
         """
         try:
-            return self._client.get_stats(date_str)
+            with self._request('get_stats'):
+                return self._client.get_stats(date_str)
         except Exception as e:
             logger.error(f"Error fetching daily stats for date {date_str}: {e}")
             return None
@@ -196,10 +363,40 @@ class GarminClient:
             Dictionary of sleep data or None if retrieval fails
         """
         try:
-            return self._client.get_sleep_data(date_str)
+            with self._request('get_sleep_data'):
+                return self._client.get_sleep_data(date_str)
         except Exception as e:
             logger.error(f"Error fetching sleep data for date {date_str}: {e}")
             return None
 
-# Create global singleton instance
-garmin_client = GarminClient()
\ No newline at end of file
+def create_token_store(user_id: int, username: str, password: str) -> str:
+    """
+    Log a user in with their Garmin credentials and save their token store.
+
+    Args:
+        user_id: Application user id
+        username: Garmin Connect login
+        password: Garmin Connect password, not stored
+
+    Returns:
+        Path of the token store directory
+    """
+    import garminconnect
+
+    client = garminconnect.Garmin(username, password)
+    client.login()
+    tokens = token_store(user_id)
+    os.makedirs(Config.GARMIN_TOKEN_DIR, exist_ok=True)
+    client.garth.dump(tokens)
+    GarminClient.discard(user_id)
+    logger.info(f"Saved the Garmin token store of user {user_id}")
+    return tokens
+
+if __name__ == '__main__':
+    from backend.core.log_config import setup_logging
+    parser = argparse.ArgumentParser(description="Log a user in to Garmin Connect and save their token store.")
+    parser.add_argument('user_id', type=int, help='Application user id')
+    parser.add_argument('username', help='Garmin Connect login')
+    args = parser.parse_args()
+    setup_logging()
+    create_token_store(args.user_id, args.username, getpass.getpass('Garmin Connect password: '))
@@ -1,44 +1,71 @@
 """
 Logging configuration for the application.
 
-This module configures the application's logging system, setting up
-console and file handlers with appropriate formatting and log levels.
+This module configures the application's logging system. Records are put on
+an in-memory queue by the calling thread and written to the console and the
+log file by a background listener (see backend.core.logging_utils), so slow
+disk I/O never stalls API requests or sync jobs.
 """
 
 import logging
+import sys
+from logging.handlers import RotatingFileHandler
+from backend.core.config import Config
+from backend.core.logging_utils import RateLimitFilter, build_formatter, start_queue_logging
+
+_configured = False
 
 def setup_logging():
     """
-    Configure application logging with consistent formatting.
+    Configure queued application logging with consistent formatting.
     
     Sets up:
-    - Console logging for INFO and above
-    - File logging for all levels
+    - Console and rotating file (LOG_FILE) logging at LOG_LEVEL and above
+    - Text or JSON records depending on LOG_FORMAT
+    - Per-logger rate limiting of INFO and DEBUG records, and sampling of
+      DEBUG records
     - Reduces verbosity from third-party libraries
+    
+    Safe to call more than once; handlers are only installed the first time.
     """
-    # Configure root logger
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    formatter = build_formatter(Config.LOG_FORMAT)
+    level = getattr(logging, Config.LOG_LEVEL.upper(), logging.INFO)
+
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+
+    # Create file handler for persistent logging
+    file_error = None
+    if Config.LOG_FILE:
+        try:
+            file_handler = RotatingFileHandler(
+                Config.LOG_FILE,
+                maxBytes=Config.LOG_FILE_MAX_BYTES,
+                backupCount=Config.LOG_FILE_BACKUPS
+            )
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+        except (IOError, PermissionError) as e:
+            # Gracefully handle permission issues with log files
+            file_error = e
+
+    rate_limit = RateLimitFilter(
+        rate=Config.LOG_RATE_LIMIT,
+        burst=Config.LOG_RATE_BURST,
+        debug_sample_rate=Config.LOG_DEBUG_SAMPLE_RATE
     )
+    start_queue_logging(handlers, level=level, filters=[rate_limit])
 
     # Reduce noise from frequently chatty libraries
     logging.getLogger('urllib3').setLevel(logging.WARNING)
     logging.getLogger('sqlalchemy').setLevel(logging.WARNING)
     logging.getLogger('werkzeug').setLevel(logging.WARNING)
-    
-    # Get the root logger for further configuration
-    root_logger = logging.getLogger()
-    
-    # Create file handler for persistent logging
-    try:
-        file_handler = logging.FileHandler('app.log')
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(
-            logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        )
-        root_logger.addHandler(file_handler)
-    except (IOError, PermissionError) as e:
-        # Gracefully handle permission issues with log files
-        logging.warning(f"Could not set up file logging: {e}")
\ No newline at end of file
+
+    if file_error:
+        logging.warning(f"Could not set up file logging: {file_error}")
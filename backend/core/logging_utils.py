@@ -1,33 +1,204 @@
 """
 Logging configuration utilities.
 
-This module provides functions for setting up and configuring application
-logging, including file handlers, formatters, and log levels for
-different components.
+This module provides the building blocks of the application's logging
+pipeline: a JSON formatter for structured records, a per-logger rate limiting
+and sampling filter for high-volume messages, and a queue-based setup that
+moves formatting and disk I/O off the request and sync threads. Callers only
+put records on an in-memory queue; a single background listener thread
+writes them to the console and the rotating log file.
 """
 
+import atexit
+import copy
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import random
 import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional
 
-def setup_enhanced_logging():
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+TEXT_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format log records as one JSON object per line.
+
+    Each object has the UTC timestamp, level, logger name, message, thread
+    name and source location, the exception text if any, and every attribute
+    passed with `extra=`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+            'module': record.module,
+            'line': record.lineno,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exception'] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                payload[key] = value
+        return json.dumps(payload, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate limit and sample low-severity records per logger.
+
+    Records at or below `max_level` pass through a token bucket per logger
+    name refilled at `rate` records per second up to `burst`; DEBUG records
+    are additionally sampled at `debug_sample_rate`. Warnings and errors are
+    never dropped. The next record let through after a suppression reports
+    how many were dropped, in its message and as the `suppressed` attribute.
+    """
+
+    def __init__(self, rate: float, burst: int, max_level: int = logging.INFO,
+                 debug_sample_rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_level = max_level
+        self.debug_sample_rate = debug_sample_rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        if record.levelno <= logging.DEBUG and self.debug_sample_rate < 1.0 \
+                and random.random() >= self.debug_sample_rate:
+            return False
+        if self.rate <= 0:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, suppressed = self._buckets.get(record.name, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[record.name] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[record.name] = (tokens - 1, now, 0)
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} [{suppressed} records from this logger suppressed]"
+            record.args = None
+            record.suppressed = suppressed
+        return True
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    QueueHandler that keeps the exception text apart from the message.
+
+    The stock handler merges the formatted traceback into the message before
+    enqueueing; this one only resolves the message arguments and the
+    exception text, so the listener's formatter still sees them separately.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def start_queue_logging(handlers: List[logging.Handler], level: int = logging.INFO,
+                        filters: Optional[List[logging.Filter]] = None) -> QueueListener:
+    """
+    Route all root logger records through a queue to the given handlers.
+
+    The root logger gets a single StructuredQueueHandler, so logging calls only apply
+    the filters and enqueue the record; a background QueueListener thread
+    formats and writes it with the handlers. The listener is stopped, and the
+    queue drained, at interpreter exit.
+
+    Args:
+        handlers: Handlers run by the listener thread, with their own levels
+            and formatters
+        level: Root logger level
+        filters: Filters applied in the calling thread before enqueueing,
+            e.g. a RateLimitFilter
+
+    Returns:
+        The started QueueListener
+    """
+    global _listener
+    stop_queue_logging()
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    for log_filter in filters or []:
+        queue_handler.addFilter(log_filter)
+
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_queue_logging() -> None:
+    """Flush the queued records and stop the listener thread, if running."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_queue_logging)
+
+
+def build_formatter(log_format: str) -> logging.Formatter:
+    """Return the formatter for 'json' or 'text' output."""
+    if log_format == 'json':
+        return JsonFormatter()
+    return logging.Formatter(TEXT_FORMAT, datefmt=TEXT_DATE_FORMAT)
+
+
+def setup_enhanced_logging(log_format: str = 'text'):
     """
-    Set up enhanced logging with file rotation and console output.
-    
+    Set up queued logging with file rotation and console output.
+
     Creates:
     - Log directory if it doesn't exist
     - Rotating file handler with size-based rotation
     - Console handler for standard output
     - Configured formatters for both handlers
-    
-    Also reduces logging verbosity for common third-party libraries.
+
+    Both handlers run on the queue listener thread. Also reduces logging
+    verbosity for common third-party libraries.
     """
     if not os.path.exists('logs'):
         os.makedirs('logs')
 
-    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    formatter = logging.Formatter(log_format)
+    formatter = build_formatter(log_format)
 
     # Configure file handler with rotation
     file_handler = RotatingFileHandler(
@@ -43,12 +214,8 @@ def setup_enhanced_logging():
     console_handler.setFormatter(formatter)
     console_handler.setLevel(logging.INFO)
 
-    # Configure root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.DEBUG)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    start_queue_logging([file_handler, console_handler], level=logging.DEBUG)
 
     # Reduce noise from frequently chatty libraries
     logging.getLogger('urllib3').setLevel(logging.WARNING)
-    logging.getLogger('requests').setLevel(logging.WARNING)
\ No newline at end of file
+    logging.getLogger('requests').setLevel(logging.WARNING)
@@ -0,0 +1,157 @@
+"""
+Prometheus metrics for the application.
+
+This module defines the latency and error metrics exported on /metrics:
+request latency per route, database query counts and time per request,
+Garmin Connect API call latency and errors per GarminClient method, and
+sync phase durations per fetcher.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from flask import Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    'garminsync_http_request_duration_seconds',
+    'HTTP request latency by route',
+    ['method', 'route', 'status']
+)
+REQUEST_DB_QUERIES = Histogram(
+    'garminsync_http_request_db_queries',
+    'Number of database queries executed per HTTP request',
+    ['method', 'route'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+)
+REQUEST_DB_TIME = Histogram(
+    'garminsync_http_request_db_duration_seconds',
+    'Time spent in database queries per HTTP request',
+    ['method', 'route']
+)
+DB_QUERIES = Counter(
+    'garminsync_db_queries_total',
+    'Database queries executed, inside and outside requests',
+    ['context']
+)
+GARMIN_API_LATENCY = Histogram(
+    'garminsync_garmin_api_call_duration_seconds',
+    'Garmin Connect API call latency by GarminClient method',
+    ['method'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+GARMIN_API_ERRORS = Counter(
+    'garminsync_garmin_api_errors_total',
+    'Garmin Connect API calls that raised, by GarminClient method',
+    ['method']
+)
+SYNC_PHASE_DURATION = Histogram(
+    'garminsync_sync_phase_duration_seconds',
+    'Duration of each sync phase (fetcher)',
+    ['phase'],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+)
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('query_start_time')
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+
+    if has_request_context() and 'metrics_start' in g:
+        g.db_query_count += 1
+        g.db_query_time += elapsed
+        DB_QUERIES.labels('request').inc()
+    else:
+        DB_QUERIES.labels('background').inc()
+
+@contextmanager
+def track_garmin_call(method: str):
+    """
+    Time a Garmin Connect API call and count it as an error if it raises.
+
+    Args:
+        method: GarminClient method name used as the metric label
+
+    Example:
+        >>> with track_garmin_call('get_activities'):
+        ...     return self._client.get_activities(start, limit)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        GARMIN_API_ERRORS.labels(method).inc()
+        raise
+    finally:
+        GARMIN_API_LATENCY.labels(method).observe(time.perf_counter() - start)
+
+@contextmanager
+def track_sync_phase(phase: str):
+    """
+    Record the duration of a sync phase, e.g. one fetcher run.
+
+    Args:
+        phase: Phase name used as the metric label
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        SYNC_PHASE_DURATION.labels(phase).observe(elapsed)
+        logger.info(f"Sync phase '{phase}' took {elapsed:.1f}s")
+
+def metrics_view() -> Response:
+    """
+    Serve all metrics in the Prometheus text exposition format.
+
+    Endpoint: GET /metrics
+
+    Under a multi-process server with PROMETHEUS_MULTIPROC_DIR set, metrics
+    from every worker are aggregated.
+    """
+    registry = REGISTRY
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+def register_metrics(app) -> None:
+    """
+    Install request timing hooks and the /metrics endpoint.
+
+    Args:
+        app: Flask application instance
+    """
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+        g.db_query_count = 0
+        g.db_query_time = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        if 'metrics_start' not in g:
+            return response
+        # Label by URL rule rather than path so ids don't explode cardinality
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_LATENCY.labels(request.method, route, response.status_code)\
+            .observe(time.perf_counter() - g.metrics_start)
+        REQUEST_DB_QUERIES.labels(request.method, route).observe(g.db_query_count)
+        REQUEST_DB_TIME.labels(request.method, route).observe(g.db_query_time)
+        return response
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
@@ -0,0 +1,221 @@
+"""
+Opt-in request profiler for the Flask application.
+
+This module profiles individual requests with cProfile and records the timing
+of every SQL statement they execute, so a slow dashboard request can be broken
+down into SQL, ORM hydration and JSON encoding time without redeploying.
+Profiling is enabled per request by an admin (X-Profile header or ?profile=1
+query flag plus X-Admin-Token) or by random sampling at PROFILER_SAMPLE_RATE.
+Reports are kept under a generated id returned in the X-Profile-Id header.
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Number of functions kept in a report, sorted by cumulative time
+TOP_FUNCTIONS = 40
+
+def is_admin_request() -> bool:
+    """
+    Check whether the current request carries the profiler admin token.
+
+    Returns:
+        True if PROFILER_ADMIN_TOKEN is configured and matches X-Admin-Token
+    """
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(Config.PROFILER_ADMIN_TOKEN) and hmac.compare_digest(token, Config.PROFILER_ADMIN_TOKEN)
+
+def _profiling_requested() -> bool:
+    """Return True if the current request should be profiled."""
+    flagged = request.headers.get('X-Profile') == '1' or request.args.get('profile') == '1'
+    if flagged and is_admin_request():
+        return True
+    return Config.PROFILER_SAMPLE_RATE > 0 and random.random() < Config.PROFILER_SAMPLE_RATE
+
+
+class ProfileStore:
+    """
+    Bounded store of profiling reports.
+
+    Keeps the newest PROFILER_MAX_REPORTS reports in memory and, if PROFILER_DIR
+    is configured, also writes each report to disk as JSON so it survives
+    restarts and can be fetched from any worker.
+    """
+
+    def __init__(self):
+        self._reports: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, report_id: str) -> str:
+        return os.path.join(Config.PROFILER_DIR, f"{report_id}.json")
+
+    def save(self, report: Dict[str, Any]) -> None:
+        """
+        Store a report under its id, evicting the oldest one when full.
+
+        Args:
+            report: Report dictionary containing an 'id' key
+        """
+        with self._lock:
+            self._reports[report['id']] = report
+            while len(self._reports) > Config.PROFILER_MAX_REPORTS:
+                self._reports.popitem(last=False)
+
+        if Config.PROFILER_DIR:
+            try:
+                os.makedirs(Config.PROFILER_DIR, exist_ok=True)
+                with open(self._path(report['id']), 'w') as f:
+                    json.dump(report, f)
+            except OSError as e:
+                logger.warning(f"Could not write profile report {report['id']}: {e}")
+
+    def get(self, report_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a report by id.
+
+        Args:
+            report_id: Id returned in the X-Profile-Id response header
+
+        Returns:
+            Report dictionary or None if unknown
+        """
+        with self._lock:
+            report = self._reports.get(report_id)
+        if report is None and Config.PROFILER_DIR and report_id.isalnum():
+            try:
+                with open(self._path(report_id)) as f:
+                    report = json.load(f)
+            except (OSError, ValueError):
+                return None
+        return report
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """
+        List the reports held in memory, newest first, without their details.
+
+        Returns:
+            List of report summaries
+        """
+        with self._lock:
+            reports = list(self._reports.values())
+        return [
+            {key: report[key] for key in ('id', 'created_at', 'method', 'path', 'status', 'total_ms', 'sql_ms', 'sql_count')}
+            for report in reversed(reports)
+        ]
+
+
+# Global report store shared with the profile routes
+profile_store = ProfileStore()
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and g.get('profiler') is not None:
+        conn.info.setdefault('profile_query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('profile_query_start')
+    if not start_times or not has_request_context() or g.get('profiler') is None:
+        return
+    g.profile_sql.append({
+        'statement': statement,
+        'duration_ms': round((time.perf_counter() - start_times.pop()) * 1000, 3),
+        'executemany': executemany,
+    })
+
+def _build_report(profiler: cProfile.Profile, response) -> Dict[str, Any]:
+    """Turn a finished profiler and the captured SQL timings into a report."""
+    total_ms = (time.perf_counter() - g.profile_start) * 1000
+    sql_ms = sum(query['duration_ms'] for query in g.profile_sql)
+
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    stats.sort_stats('cumulative')
+    functions = []
+    for func in stats.fcn_list[:TOP_FUNCTIONS]:
+        primitive_calls, total_calls, tottime, cumtime, _ = stats.stats[func]
+        filename, line, name = func
+        functions.append({
+            'function': f"{filename}:{line}({name})",
+            'calls': total_calls,
+            'primitive_calls': primitive_calls,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+        })
+
+    return {
+        'id': uuid.uuid4().hex[:16],
+        'created_at': datetime.utcnow().isoformat(),
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'status': response.status_code,
+        'total_ms': round(total_ms, 3),
+        'sql_ms': round(sql_ms, 3),
+        'sql_count': len(g.profile_sql),
+        'python_ms': round(total_ms - sql_ms, 3),
+        'sql': g.profile_sql,
+        'functions': functions,
+    }
+
+def register_profiler(app) -> None:
+    """
+    Install the profiling before/after request hooks.
+
+    Args:
+        app: Flask application instance
+    """
+    @app.before_request
+    def start_profiler():
+        g.profiler = None
+        if not _profiling_requested():
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Another profiler is already active in this interpreter
+            logger.debug(f"Skipping request profile: {e}")
+            return
+        g.profiler = profiler
+        g.profile_sql = []
+        g.profile_start = time.perf_counter()
+
+    @app.after_request
+    def stop_profiler(response):
+        profiler = g.get('profiler')
+        if profiler is None:
+            return response
+        profiler.disable()
+        g.profiler = None
+
+        report = _build_report(profiler, response)
+        profile_store.save(report)
+        response.headers['X-Profile-Id'] = report['id']
+        logger.info(f"Profiled {report['method']} {report['path']}: {report['total_ms']:.1f}ms total, "
+                    f"{report['sql_ms']:.1f}ms in {report['sql_count']} SQL statements (id {report['id']})")
+        return response
+
+    @app.teardown_request
+    def discard_profiler(exc):
+        # Never leave a profiler running on a worker thread after a failed request
+        profiler = g.get('profiler')
+        if profiler is not None:
+            profiler.disable()
+            g.profiler = None
@@ -0,0 +1,201 @@
+"""
+Per-user scoping of requests and sync jobs.
+
+This module tracks which user the current code runs for. API requests act
+for the user whose API token they carry (falling back to
+Config.DEFAULT_USER_ID unless AUTH_REQUIRED is set, so single-user
+deployments keep working unchanged) and store it on flask.g; sync jobs wrap
+their work in user_scope(). Models stamp new rows with current_user_id() and
+read queries filter with owned_by(), which every per-user index starts with.
+
+Run `python -m backend.core.tenancy <user_id>` to issue a user a new API token.
+"""
+
+import argparse
+import hashlib
+import hmac
+import logging
+import secrets
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from flask import g, has_request_context, jsonify, request
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+USER_HEADER = 'X-User-Id'
+# EventSource cannot set headers, so the event stream may pass the token as
+# this query parameter instead
+TOKEN_PARAMETER = 'access_token'
+# Endpoints serving no user data, e.g. for Prometheus
+PUBLIC_ENDPOINTS = {'metrics'}
+
+# User of the sync job running in the current thread, if any
+_current_user: ContextVar[Optional[int]] = ContextVar('current_user', default=None)
+
+def current_user_id() -> int:
+    """
+    Return the id of the user the current request or job runs for.
+
+    Returns:
+        The request's user, else the user of the enclosing user_scope(),
+        else Config.DEFAULT_USER_ID
+    """
+    if has_request_context() and 'user_id' in g:
+        return g.user_id
+    user_id = _current_user.get()
+    return Config.DEFAULT_USER_ID if user_id is None else user_id
+
+@contextmanager
+def user_scope(user_id: int):
+    """
+    Run the block on behalf of a user.
+
+    Args:
+        user_id: Id of the user whose data the block reads and writes
+
+    Example:
+        >>> with user_scope(2):
+        ...     sync_all_data()
+    """
+    token = _current_user.set(user_id)
+    try:
+        yield user_id
+    finally:
+        _current_user.reset(token)
+
+def owned_by(model):
+    """
+    Build the filter condition restricting a model to the current user's rows.
+
+    Args:
+        model: Model class with a user_id column
+
+    Returns:
+        SQLAlchemy condition for Query.filter()
+    """
+    return model.user_id == current_user_id()
+
+def hash_token(token: str) -> str:
+    """Return the SHA-256 hex digest stored for an API token."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def user_for_token(token: str) -> Optional[int]:
+    """
+    Look up the user an API token belongs to.
+
+    Args:
+        token: API token presented by the client
+
+    Returns:
+        The user's id, or None if no user has the token
+    """
+    # Imported here, since the models import this module
+    from backend.core.create_db import get_db
+    from backend.models.models import User
+
+    digest = hash_token(token)
+    db = next(get_db())
+    try:
+        user = db.query(User.id, User.api_token_hash).filter(User.api_token_hash == digest).first()
+    finally:
+        db.close()
+    return user.id if user and hmac.compare_digest(user.api_token_hash, digest) else None
+
+def issue_token(user_id: int) -> str:
+    """
+    Issue a user a new API token, revoking their previous one.
+
+    Args:
+        user_id: Id of an existing user
+
+    Returns:
+        The token, which is not stored and cannot be shown again
+
+    Raises:
+        ValueError: If the user does not exist
+    """
+    from backend.core.create_db import get_db
+    from backend.models.models import User
+
+    token = secrets.token_urlsafe(32)
+    db = next(get_db())
+    try:
+        user = db.get(User, user_id)
+        if user is None:
+            raise ValueError(f"No user {user_id}")
+        user.api_token_hash = hash_token(token)
+        db.commit()
+    finally:
+        db.close()
+    logger.info(f"Issued a new API token to user {user_id}")
+    return token
+
+def _parse_user_id(value: str) -> Optional[int]:
+    """Parse a user id header value, None if it is not a positive integer."""
+    try:
+        user_id = int(value)
+    except ValueError:
+        return None
+    return user_id if user_id >= 1 else None
+
+def _request_token() -> Optional[str]:
+    """Return the API token of the current request, if it has one."""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() == 'bearer' and token.strip():
+        return token.strip()
+    return request.args.get(TOKEN_PARAMETER) or None
+
+def register_tenancy(app) -> None:
+    """
+    Install a before_request hook resolving the user of each request.
+
+    A request with an API token acts for the token's user; an X-User-Id
+    header naming anyone else is rejected with 403, and an unknown token
+    with 401. The header alone is accepted only with TRUST_USER_HEADER, for
+    deployments behind an authenticating proxy. Requests without either are
+    served as DEFAULT_USER_ID, or rejected with 401 under AUTH_REQUIRED.
+
+    Args:
+        app: Flask application instance
+    """
+    @app.before_request
+    def resolve_user():
+        # CORS preflight requests carry no credentials
+        if request.method == 'OPTIONS' or request.endpoint in PUBLIC_ENDPOINTS:
+            return None
+
+        header = request.headers.get(USER_HEADER)
+        header_user = _parse_user_id(header) if header is not None else None
+        if header is not None and header_user is None:
+            return jsonify({"error": f"Header '{USER_HEADER}' must be a positive user id"}), 400
+
+        if Config.TRUST_USER_HEADER and header_user is not None:
+            g.user_id = header_user
+            return None
+
+        token = _request_token()
+        if token is not None:
+            user_id = user_for_token(token)
+            if user_id is None:
+                return jsonify({"error": "Invalid API token"}), 401
+            if header_user is not None and header_user != user_id:
+                return jsonify({"error": f"Header '{USER_HEADER}' does not match the API token"}), 403
+            g.user_id = user_id
+            return None
+
+        if header_user is not None:
+            return jsonify({"error": f"Header '{USER_HEADER}' requires an API token"}), 401
+        if Config.AUTH_REQUIRED:
+            return jsonify({"error": "Authentication required"}), 401
+        g.user_id = Config.DEFAULT_USER_ID
+        return None
+
+if __name__ == '__main__':
+    from backend.core.log_config import setup_logging
+    parser = argparse.ArgumentParser(description="Issue a user a new API token, revoking the previous one.")
+    parser.add_argument('user_id', type=int, help='Application user id')
+    args = parser.parse_args()
+    setup_logging()
+    print(issue_token(args.user_id))
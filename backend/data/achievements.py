@@ -0,0 +1,220 @@
+"""
+Achievements engine.
+
+This module keeps personal records (longest distance, fastest average speed
+and pace per sport, highest calories, heart rate, training effect and VO2 max)
+and activity streaks per user in the achievements table. Records are updated
+incrementally as each new activity is stored, in the same session, and
+streaks once per batch of stored activities, so serving them never requires
+scanning the activity list.
+"""
+
+import logging
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from backend.core.create_db import get_db
+from backend.core.tenancy import owned_by
+from backend.models.models import Activities, Achievements
+from backend.utils.time_utils import time_to_seconds
+
+logger = logging.getLogger(__name__)
+
+# Sport value of records that apply across all sports
+ALL_SPORTS = 'all'
+
+Category = namedtuple('Category', ['unit', 'value', 'higher_is_better', 'per_sport', 'overall'])
+
+def _pace(activity: Activities) -> Optional[float]:
+    """Return the average pace of an activity in minutes per kilometer."""
+    if not activity.distance or not activity.elapsed_time:
+        return None
+    return time_to_seconds(activity.elapsed_time) / 60 / activity.distance
+
+# Record categories: unit, value extractor, direction, and whether the record
+# is kept per sport and/or across all sports
+CATEGORIES = {
+    'longest_distance': Category('km', lambda a: a.distance, True, True, True),
+    'longest_duration': Category('s', lambda a: time_to_seconds(a.elapsed_time) if a.elapsed_time else None, True, True, True),
+    'fastest_avg_speed': Category('km/h', lambda a: a.avg_speed, True, True, False),
+    'fastest_pace': Category('min/km', _pace, False, True, False),
+    'max_calories': Category('kcal', lambda a: a.calories, True, False, True),
+    'max_heart_rate': Category('bpm', lambda a: a.max_hr, True, False, True),
+    'peak_training_effect': Category('', lambda a: a.training_effect, True, False, True),
+    'best_vo2max': Category('ml/kg/min', lambda a: a.vO2MaxValue, True, False, True),
+}
+
+# Streak categories, counted in consecutive days with at least one activity
+CURRENT_STREAK = 'current_streak'
+LONGEST_STREAK = 'longest_streak'
+STREAK_UNIT = 'days'
+
+def unit_for(category: str) -> str:
+    """Return the unit of an achievement category."""
+    return CATEGORIES[category].unit if category in CATEGORIES else STREAK_UNIT
+
+def load_achievements(db) -> Dict[Tuple[str, str], Achievements]:
+    """
+    Load all of the current user's achievements, keyed by (category, sport).
+
+    There are a few rows per sport, so a batch of new activities can share
+    one load; pass the result to update_achievements() for each of them.
+    """
+    return {(row.category, row.sport): row for row in db.query(Achievements).filter(owned_by(Achievements))}
+
+def _set_record(db, rows: dict, category: str, sport: str, value: float, activity: Activities) -> None:
+    """Create or overwrite the record row of a category and sport."""
+    row = rows.get((category, sport))
+    if row is None:
+        row = rows[(category, sport)] = Achievements(category=category, sport=sport)
+        db.add(row)
+    row.value = value
+    row.activity_id = activity.activity_id
+    row.achieved_at = activity.start_time
+    row.updated_at = datetime.utcnow()
+
+def _set_streak(db, rows: dict, category: str, start, end) -> Achievements:
+    """Create or overwrite a streak row."""
+    row = rows.get((category, ALL_SPORTS))
+    if row is None:
+        row = rows[(category, ALL_SPORTS)] = Achievements(category=category, sport=ALL_SPORTS)
+        db.add(row)
+    row.value = (end - start).days + 1
+    row.streak_start = start
+    row.streak_end = end
+    row.achieved_at = datetime.combine(end, datetime.min.time())
+    row.activity_id = None
+    row.updated_at = datetime.utcnow()
+    return row
+
+def _rebuild_streaks(db, rows: dict, since: Optional[date] = None) -> None:
+    """
+    Recompute both streaks from the current user's distinct activity days.
+
+    With `since` only the days from it on are scanned, which must be the
+    start of the stored current streak; the stored longest streak is kept
+    unless a longer one is found.
+    """
+    query = db.query(Activities.start_time).filter(owned_by(Activities))
+    if since is not None:
+        query = query.filter(Activities.start_time >= datetime.combine(since, datetime.min.time()))
+    days = sorted({start_time.date() for (start_time,) in query if start_time is not None})
+    if not days:
+        return
+
+    longest = current = (days[0], days[0])
+    for day in days[1:]:
+        if day == current[1] + timedelta(days=1):
+            current = (current[0], day)
+        else:
+            current = (day, day)
+        if (current[1] - current[0]) > (longest[1] - longest[0]):
+            longest = current
+
+    _set_streak(db, rows, CURRENT_STREAK, *current)
+    stored = rows.get((LONGEST_STREAK, ALL_SPORTS))
+    if since is None or stored is None or (longest[1] - longest[0]).days + 1 > stored.value:
+        _set_streak(db, rows, LONGEST_STREAK, *longest)
+
+def update_streaks(db, since: Optional[date], rows: Optional[dict] = None) -> None:
+    """
+    Update the streaks once after a batch of activities was stored.
+
+    Call it in the session that stored the activities, before committing.
+    New activities that do not predate the current streak can only extend
+    it or start later ones, so only the days from its start are scanned.
+    Older activities (backfills) can join or split earlier streaks and
+    cause a single full recompute.
+
+    Args:
+        db: Database session; the caller commits
+        since: Day of the oldest newly stored activity; None if none were stored
+        rows: Preloaded achievements, see load_achievements() (optional)
+    """
+    if since is None:
+        return
+    if rows is None:
+        rows = load_achievements(db)
+    current = rows.get((CURRENT_STREAK, ALL_SPORTS))
+    if current is None or since < current.streak_start:
+        _rebuild_streaks(db, rows)
+    else:
+        _rebuild_streaks(db, rows, current.streak_start)
+
+def update_achievements(db, activity: Activities, rows: Optional[dict] = None) -> List[Tuple[str, str]]:
+    """
+    Update the stored records with a newly stored activity.
+
+    Call it in the session that adds the activity, before committing, so the
+    activity and its records are written together. Streaks are updated once
+    per batch of activities by update_streaks().
+
+    Args:
+        db: Database session
+        activity: New Activities instance
+        rows: Achievements from load_achievements(), updated in place;
+            loaded from the database if omitted
+
+    Returns:
+        List of (category, sport) records the activity set
+    """
+    if activity.start_time is None:
+        return []
+    sport = activity.sport or 'unknown'
+    if rows is None:
+        rows = load_achievements(db)
+
+    improved = []
+    for category, definition in CATEGORIES.items():
+        value = definition.value(activity)
+        if value is None or value <= 0:
+            continue
+        scopes = ([sport] if definition.per_sport else []) + ([ALL_SPORTS] if definition.overall else [])
+        for scope in scopes:
+            current = rows.get((category, scope))
+            if current is not None:
+                better = value > current.value if definition.higher_is_better else value < current.value
+                if not better:
+                    continue
+            _set_record(db, rows, category, scope, value, activity)
+            improved.append((category, scope))
+    return improved
+
+def rebuild_achievements(db) -> int:
+    """
+    Recompute the current user's achievements from their stored activities.
+
+    Args:
+        db: Database session; the caller commits
+
+    Returns:
+        Number of activities scanned
+    """
+    db.query(Achievements).filter(owned_by(Achievements)).delete()
+    rows = {}
+    count = 0
+    for activity in db.query(Activities).filter(owned_by(Activities)).order_by(Activities.start_time):
+        update_achievements(db, activity, rows)
+        count += 1
+    _rebuild_streaks(db, rows)
+    return count
+
+def ensure_achievements() -> None:
+    """
+    Build the current user's achievements once for activities stored before the table existed.
+
+    Does nothing when achievements exist or there are no activities yet.
+    """
+    db = next(get_db())
+    try:
+        if db.query(Achievements.id).filter(owned_by(Achievements)).first() is not None \
+                or db.query(Activities.activity_id).filter(owned_by(Activities)).first() is None:
+            return
+        count = rebuild_achievements(db)
+        db.commit()
+        logger.info(f"Built achievements from {count} stored activities")
+    except Exception as e:
+        logger.error(f"Error building achievements: {e}")
+        db.rollback()
+    finally:
+        db.close()
@@ -0,0 +1,204 @@
+"""
+Best effort engine.
+
+This module finds the fastest time over each configured distance (1 km, 5 km,
+10 km, half and full marathon by default) and the longest distance covered in
+each configured duration within an activity's track. The elapsed time and
+the cumulative distance derived at ingest are taken once per activity, and
+every window start is matched to its window end with a single vectorized
+np.searchsorted call per target, so the search is O(n log n) instead of a
+Python loop over all pairs.
+Results are computed at ingest and stored in the best_efforts table.
+
+Run `python -m backend.data.best_efforts` to compute best efforts for
+activities stored before the table existed.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+import numpy as np
+from sqlalchemy import exists
+from backend.core.config import Config
+from backend.core.create_db import get_db
+from backend.core.tenancy import user_scope
+from backend.data.tracks import Track, has_track, load_track
+from backend.models.models import Activities, BestEfforts
+
+logger = logging.getLogger(__name__)
+
+DISTANCE = 'distance'
+DURATION = 'duration'
+
+def track_arrays(track: Track) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Build elapsed time and cumulative distance arrays from a track.
+
+    The cumulative distance is the one derived when the track was stored
+    (see backend.utils.track_metrics), restarted at the first timed point.
+
+    Args:
+        track: Track columns as returned by load_track() or store_track()
+
+    Returns:
+        Tuple of (elapsed seconds, cumulative meters, record numbers of the
+        timed points), or None if the track has fewer than two timed points
+    """
+    timed = np.flatnonzero(~np.isnan(track['timestamp']))
+    if timed.size < 2:
+        return None
+
+    elapsed = track['timestamp'][timed] - track['timestamp'][timed[0]]
+    # Clock jumps backwards would break the binary search
+    np.maximum.accumulate(elapsed, out=elapsed)
+
+    distance = track['cumulative_distance'][timed] - track['cumulative_distance'][timed[0]]
+    return elapsed, distance, timed
+
+def best_distance_effort(elapsed: np.ndarray, distance: np.ndarray, target: float) -> Optional[Tuple[float, int, int]]:
+    """
+    Find the fastest time over a target distance.
+
+    For every start point the first point reaching start distance + target is
+    found by binary search, and the finishing time is interpolated between
+    that point and the one before it.
+
+    Args:
+        elapsed: Elapsed seconds per point, non-decreasing
+        distance: Cumulative meters per point, non-decreasing
+        target: Target distance in meters
+
+    Returns:
+        Tuple of (seconds, start index, end index), or None if the track is
+        shorter than the target
+    """
+    if distance[-1] - distance[0] < target:
+        return None
+
+    goal = distance + target
+    end = np.searchsorted(distance, goal, side='left')
+    valid = end < distance.size
+    starts = np.flatnonzero(valid)
+    end = end[valid]
+
+    # Interpolate the moment the target distance is crossed
+    segment = distance[end] - distance[end - 1]
+    fraction = np.divide(goal[starts] - distance[end - 1], segment,
+                         out=np.ones_like(segment), where=segment > 0)
+    finish = elapsed[end - 1] + fraction * (elapsed[end] - elapsed[end - 1])
+    durations = finish - elapsed[starts]
+
+    best = int(np.argmin(durations))
+    return float(durations[best]), int(starts[best]), int(end[best])
+
+def best_duration_effort(elapsed: np.ndarray, distance: np.ndarray, target: float) -> Optional[Tuple[float, int, int]]:
+    """
+    Find the longest distance covered in a target duration.
+
+    Args:
+        elapsed: Elapsed seconds per point, non-decreasing
+        distance: Cumulative meters per point, non-decreasing
+        target: Target duration in seconds
+
+    Returns:
+        Tuple of (meters, start index, end index), or None if the track is
+        shorter than the target
+    """
+    if elapsed[-1] - elapsed[0] < target:
+        return None
+
+    goal = elapsed + target
+    valid = goal <= elapsed[-1]
+    starts = np.flatnonzero(valid)
+    # Distance at exactly start + target, interpolated along the track
+    covered = np.interp(goal[starts], elapsed, distance) - distance[starts]
+
+    best = int(np.argmax(covered))
+    start = int(starts[best])
+    end = int(min(np.searchsorted(elapsed, goal[start], side='left'), elapsed.size - 1))
+    return float(covered[best]), start, end
+
+def compute_best_efforts(activity_id: str, track: Track) -> List[BestEfforts]:
+    """
+    Compute the best efforts of an activity for the configured targets.
+
+    Args:
+        activity_id: Activity the track belongs to
+        track: Track columns as returned by load_track()
+
+    Returns:
+        List of BestEfforts model instances, one per reachable target
+    """
+    arrays = track_arrays(track)
+    if arrays is None:
+        return []
+    elapsed, distance, timed = arrays
+
+    efforts = []
+    for target in Config.BEST_EFFORT_DISTANCES:
+        result = best_distance_effort(elapsed, distance, target)
+        if result:
+            seconds, start, end = result
+            efforts.append(BestEfforts(activity_id=activity_id, effort_type=DISTANCE, target=target,
+                                       elapsed_seconds=seconds, distance_meters=target,
+                                       start_record=int(timed[start]), end_record=int(timed[end])))
+    for target in Config.BEST_EFFORT_DURATIONS:
+        result = best_duration_effort(elapsed, distance, target)
+        if result and result[0] > 0:
+            meters, start, end = result
+            efforts.append(BestEfforts(activity_id=activity_id, effort_type=DURATION, target=target,
+                                       elapsed_seconds=target, distance_meters=meters,
+                                       start_record=int(timed[start]), end_record=int(timed[end])))
+    return efforts
+
+def store_best_efforts(db, activity_id: str, track: Track) -> int:
+    """
+    Replace the stored best efforts of an activity.
+
+    Call it in the session that stores the activity track; the caller commits.
+
+    Args:
+        db: Database session
+        activity_id: Activity the track belongs to
+        track: Track columns as returned by load_track() or store_track()
+
+    Returns:
+        Number of best efforts stored
+    """
+    db.query(BestEfforts).filter_by(activity_id=activity_id).delete()
+    efforts = compute_best_efforts(activity_id, track)
+    db.add_all(efforts)
+    return len(efforts)
+
+def backfill_best_efforts() -> int:
+    """
+    Compute best efforts for stored activities that have a track but none yet.
+
+    Returns:
+        Number of activities processed
+    """
+    db = next(get_db())
+    try:
+        pending = db.query(Activities.activity_id, Activities.user_id)\
+            .filter(has_track())\
+            .filter(~exists().where(BestEfforts.activity_id == Activities.activity_id))\
+            .all()
+
+        for activity_id, user_id in pending:
+            track = load_track(db, activity_id)
+            with user_scope(user_id):
+                store_best_efforts(db, activity_id, track)
+                db.commit()
+            db.expunge_all()
+
+        logger.info(f"Computed best efforts for {len(pending)} activities")
+        return len(pending)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    from backend.core.log_config import setup_logging
+    setup_logging()
+    backfill_best_efforts()
@@ -0,0 +1,254 @@
+"""
+Change log for synced data.
+
+This module numbers sync runs as generations and records every insert,
+update or delete the fetchers make as (entity, key, generation) rows in the
+change_log table, in the same transaction as the data itself. Clients that
+remember the last generation they saw can then fetch only what changed
+since, instead of reloading full lists after every sync.
+
+Syncs of a user can overlap and commit their rows over minutes, so the
+generation served to clients is the newest one below every generation still
+being written: a client holding it has seen all changes up to it, and rows
+committed later under a running generation are delivered once it finishes.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlalchemy import and_, event, func, insert, or_, update
+from backend.core.create_db import get_engine, get_read_db
+from backend.core.tenancy import owned_by
+from backend.models.models import Activities, HealthSummary, SleepMetrics, SyncGeneration, ChangeLog
+
+logger = logging.getLogger(__name__)
+
+# Synced entities with their model and key column
+ENTITIES = {
+    'activities': (Activities, Activities.activity_id),
+    'health': (HealthSummary, HealthSummary.date),
+    'sleep': (SleepMetrics, SleepMetrics.date),
+}
+
+# Unfinished generations older than this belong to a sync that died without
+# finishing them and no longer hold back the served generation
+ABANDONED_AFTER = timedelta(hours=24)
+
+# Generation of the sync running in the current thread, if any
+current_generation: ContextVar[Optional[int]] = ContextVar('current_generation', default=None)
+
+def _start_generation() -> int:
+    """Insert a new sync generation row and return its number."""
+    # Own connection rather than a session: get_db() returns the thread's
+    # scoped session, which may hold the caller's uncommitted writes
+    with get_engine().begin() as connection:
+        result = connection.execute(insert(SyncGeneration).values(started_at=datetime.utcnow()))
+        return result.inserted_primary_key[0]
+
+def _finish_generation(generation: int, success: bool) -> None:
+    """Mark a sync generation as finished."""
+    try:
+        with get_engine().begin() as connection:
+            connection.execute(update(SyncGeneration)
+                               .where(SyncGeneration.generation == generation)
+                               .values(finished_at=datetime.utcnow(), success=success))
+    except Exception as e:
+        logger.error(f"Error finishing sync generation {generation}: {e}")
+
+@contextmanager
+def sync_generation():
+    """
+    Open a new sync generation for the changes written inside the block.
+
+    Yields:
+        The generation number
+
+    Example:
+        >>> with sync_generation() as generation:
+        ...     activity_fetcher.fetch_and_store_activities(client)
+    """
+    generation = _start_generation()
+    token = current_generation.set(generation)
+    success = False
+    try:
+        yield generation
+        success = True
+    finally:
+        current_generation.reset(token)
+        _finish_generation(generation, success)
+
+def _generation_for(db) -> int:
+    """
+    Return the generation to tag changes written through a session with.
+
+    Writes made outside sync_generation(), e.g. by a fetcher run from a
+    script, get a generation of their own for each transaction of the
+    session, finished when the transaction commits or rolls back.
+    """
+    generation = current_generation.get()
+    if generation is None:
+        generation = db.info.get('change_generation')
+        if generation is None:
+            generation = db.info['change_generation'] = _start_generation()
+            for identifier in ('after_commit', 'after_rollback'):
+                if not event.contains(db, identifier, _end_session_generation):
+                    event.listen(db, identifier, _end_session_generation)
+    return generation
+
+def _end_session_generation(db) -> None:
+    """Finish the generation of a session's transaction once it has ended."""
+    generation = db.info.pop('change_generation', None)
+    if generation is not None:
+        _finish_generation(generation, True)
+
+def record_change(db, entity: str, key, operation: str) -> None:
+    """
+    Add a change log row to the session, committed together with the data.
+
+    Args:
+        db: Database session holding the change
+        entity: 'activities', 'health' or 'sleep'
+        key: Activity id or date of the changed row
+        operation: 'insert', 'update' or 'delete'
+    """
+    key = key.isoformat() if hasattr(key, 'isoformat') else str(key)
+    db.add(ChangeLog(generation=_generation_for(db), entity=entity, key=key, operation=operation))
+
+def update_from(existing, new_record) -> bool:
+    """
+    Copy the column values of a freshly processed record onto a stored one.
+
+    Args:
+        existing: Stored model instance
+        new_record: Unsaved model instance of the same class
+
+    Returns:
+        True if any value differed, i.e. the stored row was really updated
+    """
+    changed = False
+    for key, value in new_record.__dict__.items():
+        if key in ('_sa_instance_state', 'id'):
+            continue
+        if getattr(existing, key) != value:
+            setattr(existing, key, value)
+            changed = True
+    return changed
+
+def latest_generation(db) -> int:
+    """
+    Return the newest complete generation that recorded a change for the current user.
+
+    A generation is complete once it and every earlier generation of the
+    user have finished, so no more changes can appear at or below it.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Generation number, or 0 if nothing has been recorded yet
+    """
+    running = db.query(func.min(SyncGeneration.generation))\
+        .filter(owned_by(SyncGeneration))\
+        .filter(SyncGeneration.finished_at.is_(None))\
+        .filter(SyncGeneration.started_at > datetime.utcnow() - ABANDONED_AFTER)\
+        .scalar()
+    query = db.query(func.max(ChangeLog.generation)).filter(owned_by(ChangeLog))
+    if running is not None:
+        query = query.filter(ChangeLog.generation < running)
+    return query.scalar() or 0
+
+def read_latest_generation() -> int:
+    """Return latest_generation() for the current user, read in a session of its own."""
+    db = next(get_read_db())
+    try:
+        return latest_generation(db)
+    finally:
+        db.close()
+
+def read_changed_entities(since: int, until: int) -> Dict[str, int]:
+    """
+    Count the current user's changes per entity between two generations, in a session of its own.
+
+    Args:
+        since: Last generation already announced
+        until: Newest generation to include, normally latest_generation()
+
+    Returns:
+        Dictionary mapping each entity with changes to their number
+    """
+    db = next(get_read_db())
+    try:
+        rows = db.query(ChangeLog.entity, func.count(ChangeLog.id))\
+            .filter(owned_by(ChangeLog))\
+            .filter(ChangeLog.generation > since)\
+            .filter(ChangeLog.generation <= until)\
+            .group_by(ChangeLog.entity)
+        return {entity: count for entity, count in rows}
+    finally:
+        db.close()
+
+def changes_since(db, since: int, until: int) -> Dict[str, Dict[str, str]]:
+    """
+    Collapse the current user's changes after a generation into one operation per row.
+
+    A row inserted and then updated counts as inserted; a row whose last
+    change is a delete counts as deleted.
+
+    Args:
+        db: Database session
+        since: Generation the client already has
+        until: Newest generation to include, normally latest_generation()
+
+    Returns:
+        Dictionary mapping entity to {key: operation}
+    """
+    return changes_page(db, since, until)[0]
+
+def changes_page(db, since: int, until: int, after: Optional[int] = None,
+                 limit: Optional[int] = None) -> Tuple[Dict[str, Dict[str, str]], Optional[Tuple[int, Optional[int]]]]:
+    """
+    Collapse up to `limit` of the current user's changes after a position into one operation per row.
+
+    Changes are read in (generation, id) order. A page ends on a generation
+    boundary unless a single generation holds more than `limit` changes, in
+    which case the continuation also carries the id of the last change read.
+
+    Args:
+        db: Database session
+        since: Generation the client already has, or has partly read with `after`
+        until: Newest generation to include, normally latest_generation()
+        after: Id of the last change read of generation `since` (optional)
+        limit: Maximum number of change log rows to read (default: all)
+
+    Returns:
+        Tuple of the changes as returned by changes_since() and the
+        (since, after) position of the next page, or None if there is none
+    """
+    position = ChangeLog.generation > since
+    if after is not None:
+        position = or_(position, and_(ChangeLog.generation == since, ChangeLog.id > after))
+    query = db.query(ChangeLog.generation, ChangeLog.id, ChangeLog.entity, ChangeLog.key, ChangeLog.operation)\
+        .filter(owned_by(ChangeLog))\
+        .filter(position)\
+        .filter(ChangeLog.generation <= until)\
+        .order_by(ChangeLog.generation, ChangeLog.id)
+    if limit is not None:
+        # One extra row tells whether the page ends on a generation boundary
+        query = query.limit(limit + 1)
+    rows = query.all()
+
+    continuation = None
+    if limit is not None and len(rows) > limit:
+        last, following = rows[limit - 1], rows[limit]
+        continuation = (last.generation, None if following.generation != last.generation else last.id)
+        rows = rows[:limit]
+
+    changes = {entity: {} for entity in ENTITIES}
+    for _, _, entity, key, operation in rows:
+        previous = changes.setdefault(entity, {}).get(key)
+        if operation == 'update' and previous == 'insert':
+            continue
+        changes[entity][key] = operation
+    return changes, continuation
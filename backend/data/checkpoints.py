@@ -0,0 +1,198 @@
+"""
+Resumable sync checkpoints.
+
+A backfill of years of history takes thousands of Garmin Connect calls, and
+without a record of what has been done a run that dies halfway (throttling,
+a worker restart) has to start over. The fetchers therefore record the days
+of each entity they have fetched and stored as spans of consecutive days in
+the sync_checkpoints table, in the transactions that store the data, and
+skip covered days on the next run. An interrupted sync resumes where it
+stopped, and a long range can be synced in chunks.
+
+Garmin keeps revising the most recent days for a while (late watch
+uploads, sleep scored the next morning, recomputed daily stats), so the
+last SYNC_REFETCH_DAYS days are never recorded and are fetched by every
+sync.
+"""
+
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+from backend.core.config import Config
+from backend.core.create_db import get_db
+from backend.core.tenancy import owned_by
+from backend.models.models import SyncCheckpoint
+
+logger = logging.getLogger(__name__)
+
+# Inclusive (first day, last day)
+Span = Tuple[date, date]
+
+def merge_spans(spans: List[Span]) -> List[Span]:
+    """
+    Merge overlapping and adjacent spans.
+
+    Args:
+        spans: Spans in any order
+
+    Returns:
+        Disjoint spans in chronological order
+    """
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def missing_days(spans: List[Span], start: date, end: date) -> List[date]:
+    """
+    List the days of a range that no span covers.
+
+    Args:
+        spans: Completed spans
+        start: First day of the range
+        end: Last day of the range
+
+    Returns:
+        Uncovered days in chronological order
+    """
+    days = []
+    day = start
+    for span_start, span_end in merge_spans(spans) + [(end + timedelta(days=1), end + timedelta(days=1))]:
+        while day <= end and day < span_start:
+            days.append(day)
+            day += timedelta(days=1)
+        day = max(day, span_end + timedelta(days=1))
+        if day > end:
+            break
+    return days
+
+def day_chunks(days: List[date], size: int) -> List[List[date]]:
+    """
+    Split days into chunks of consecutive days.
+
+    Args:
+        days: Days in chronological order
+        size: Most days per chunk
+
+    Returns:
+        Lists of consecutive days, each at most `size` long
+    """
+    chunks = []
+    for day in days:
+        if chunks and len(chunks[-1]) < size and day == chunks[-1][-1] + timedelta(days=1):
+            chunks[-1].append(day)
+        else:
+            chunks.append([day])
+    return chunks
+
+def refetch_start() -> date:
+    """Return the first day of the trailing window that every sync fetches again."""
+    return datetime.now().date() - timedelta(days=max(Config.SYNC_REFETCH_DAYS, 1) - 1)
+
+def load_spans(db, entity: str) -> List[Span]:
+    """Return the current user's completed spans of an entity."""
+    return merge_spans([(row.start_date, row.end_date) for row in db.query(SyncCheckpoint)
+                        .filter(owned_by(SyncCheckpoint))
+                        .filter(SyncCheckpoint.entity == entity)])
+
+def checkpoint_summary(db) -> Dict[str, List[Dict]]:
+    """
+    Describe the current user's completed spans.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Dictionary mapping each checkpointed entity to its spans, oldest first
+    """
+    summary = {}
+    for row in db.query(SyncCheckpoint).filter(owned_by(SyncCheckpoint))\
+            .order_by(SyncCheckpoint.entity, SyncCheckpoint.start_date):
+        summary.setdefault(row.entity, []).append(row.to_dict())
+    return summary
+
+class Checkpoint:
+    """
+    Progress of one entity's sync over a date range.
+
+    On creation the stored spans are read and `days` lists the days of the
+    range they do not cover (every day when forced), which is what the
+    fetcher needs to fetch. The fetcher marks days done once their data is
+    committed, and save() adds them to the stored spans. A day that fails is
+    simply not marked, so the next run retries just that day. Days of the
+    trailing refetch window are fetched but never recorded, since their
+    data may still change.
+
+    Example:
+        >>> checkpoint = Checkpoint('health', start, end)
+        >>> for day in checkpoint.days:
+        ...     store(db, day); checkpoint.save(db); db.commit()
+        ...     checkpoint.done(day)
+        >>> checkpoint.commit()
+    """
+
+    def __init__(self, entity: str, start: date, end: date, force: bool = False):
+        """
+        Read the stored progress of an entity.
+
+        Args:
+            entity: 'activities', 'health' or 'sleep'
+            start: First day of the range
+            end: Last day of the range
+            force: Fetch every day of the range, covered or not
+        """
+        self.entity = entity
+        db = next(get_db())
+        try:
+            self._spans = load_spans(db, entity)
+        finally:
+            db.close()
+        self._complete_before = refetch_start()
+        # Spans recorded before the window was widened may reach into it
+        covered = [(span_start, min(span_end, self._complete_before - timedelta(days=1)))
+                   for span_start, span_end in self._spans if span_start < self._complete_before]
+        self.days = missing_days([] if force else covered, start, end)
+        # Days are marked done by fetch coroutines and saved on writer threads
+        self._lock = threading.Lock()
+
+    def done(self, *days: date) -> None:
+        """Mark days as fetched and committed."""
+        complete = [(day, day) for day in days if day < self._complete_before]
+        if complete:
+            with self._lock:
+                self._spans = merge_spans(self._spans + complete)
+
+    def save(self, db) -> None:
+        """
+        Record the days marked done so far, without committing.
+
+        Args:
+            db: Database session, committed by the caller with the fetched data
+        """
+        with self._lock:
+            spans = self._spans
+        existing = db.query(SyncCheckpoint).filter(owned_by(SyncCheckpoint))\
+            .filter(SyncCheckpoint.entity == self.entity).all()
+        # Keep spans another sync of the user may have saved meanwhile
+        spans = merge_spans([(row.start_date, row.end_date) for row in existing] + spans)
+        if spans == [(row.start_date, row.end_date) for row in sorted(existing, key=lambda row: row.start_date)]:
+            return
+        for row in existing:
+            db.delete(row)
+        db.add_all(SyncCheckpoint(entity=self.entity, start_date=start, end_date=end) for start, end in spans)
+
+    def commit(self) -> None:
+        """Record the days marked done so far in their own transaction."""
+        db = next(get_db())
+        try:
+            self.save(db)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error saving the {self.entity} sync checkpoint: {e}")
+            db.rollback()
+        finally:
+            db.close()
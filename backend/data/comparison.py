@@ -0,0 +1,143 @@
+"""
+Activity comparison.
+
+This module aligns two activities, e.g. two runs of the same route, by the
+distance covered instead of by time: both tracks are resampled onto a common
+distance grid with np.interp, after which the time gap between the efforts
+and their heart rate and speed differences are plain array subtractions at
+every grid point. Comparisons are cached per activity pair and sync
+generation.
+"""
+
+from typing import Dict, Optional
+import numpy as np
+from backend.core.cache import GenerationCache
+from backend.core.tenancy import owned_by
+from backend.data.best_efforts import track_arrays
+from backend.data.tracks import Track, load_track
+from backend.models.models import Activities
+
+# Default and smallest spacing of the distance grid in meters
+DEFAULT_STEP_M = 10.0
+MIN_STEP_M = 1.0
+# The step is widened so that no comparison has more grid points than this
+MAX_POINTS = 5000
+
+compare_cache = GenerationCache()
+
+def _resample(grid: np.ndarray, distance: np.ndarray, values: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Interpolate a track column onto the distance grid, skipping missing values.
+
+    Returns:
+        The values at the grid points, or None if fewer than two are recorded
+    """
+    recorded = ~np.isnan(values)
+    if np.count_nonzero(recorded) < 2:
+        return None
+    return np.interp(grid, distance[recorded], values[recorded])
+
+def _rounded(values: Optional[np.ndarray], decimals: int) -> Optional[list]:
+    """Convert an array to a rounded list for JSON, NaN to null and None through."""
+    if values is None:
+        return None
+    values = np.round(values, decimals)
+    return np.where(np.isnan(values), None, values).tolist()
+
+def align_tracks(track_a: Track, track_b: Track, step: float = DEFAULT_STEP_M) -> Optional[Dict]:
+    """
+    Resample two tracks onto a common distance grid and compare them.
+
+    The grid runs from the start to the shorter track's total distance.
+    Speeds come from the pace derived at ingest, interpolated over the
+    points where the athlete was stopped.
+
+    Args:
+        track_a: Track columns of the reference activity
+        track_b: Track columns of the compared activity
+        step: Grid spacing in meters, widened to keep at most MAX_POINTS points
+
+    Returns:
+        Dictionary with the grid distances and, at each of them, the elapsed
+        seconds of both efforts and the gap (positive when B is behind), and
+        both heart rates and speeds with their deltas (B minus A), or None if
+        either track has no usable distance
+    """
+    arrays_a, arrays_b = track_arrays(track_a), track_arrays(track_b)
+    if arrays_a is None or arrays_b is None:
+        return None
+    length = min(arrays_a[1][-1], arrays_b[1][-1])
+    if length <= 0:
+        return None
+
+    step = max(step, length / (MAX_POINTS - 1))
+    grid = np.append(np.arange(0.0, length, step), length)
+
+    series = {}
+    for name, track, (elapsed, distance, timed) in (('a', track_a, arrays_a), ('b', track_b, arrays_b)):
+        series[name] = {
+            'elapsed': np.interp(grid, distance, elapsed),
+            'heart_rate': _resample(grid, distance, track['heart_rate'][timed]),
+            # Pace in s/km to km/h; stopped points have no pace
+            'speed': _resample(grid, distance, 3600 / track['pace'][timed]),
+        }
+
+    def delta(metric: str) -> Optional[np.ndarray]:
+        a, b = series['a'][metric], series['b'][metric]
+        return None if a is None or b is None else b - a
+
+    gap = series['b']['elapsed'] - series['a']['elapsed']
+    hr_delta, speed_delta = delta('heart_rate'), delta('speed')
+    return {
+        'step_m': round(float(step), 2),
+        'distance': _rounded(grid, 1),
+        'elapsed': {name: _rounded(series[name]['elapsed'], 1) for name in series},
+        'time_gap': _rounded(gap, 1),
+        'heart_rate': {
+            **{name: _rounded(series[name]['heart_rate'], 1) for name in series},
+            'delta': _rounded(hr_delta, 1),
+        },
+        'speed': {
+            **{name: _rounded(series[name]['speed'], 2) for name in series},
+            'delta': _rounded(speed_delta, 2),
+        },
+        'summary': {
+            'distance_m': round(float(length), 1),
+            'final_gap_s': round(float(gap[-1]), 1),
+            'max_gap_s': round(float(np.max(gap)), 1),
+            'min_gap_s': round(float(np.min(gap)), 1),
+            'mean_hr_delta': None if hr_delta is None else round(float(np.mean(hr_delta)), 1),
+            'mean_speed_delta': round(float(np.nanmean(speed_delta)), 2)
+            if speed_delta is not None and not np.isnan(speed_delta).all() else None,
+        },
+    }
+
+def build_comparison(db, activity_a: str, activity_b: str, step: float = DEFAULT_STEP_M) -> Optional[Dict]:
+    """
+    Compare two of the current user's activities along the distance covered.
+
+    Args:
+        db: Database session
+        activity_a: Reference activity
+        activity_b: Activity compared against it
+        step: Grid spacing in meters
+
+    Returns:
+        The align_tracks() result with both activities' summaries added,
+        {'error': ...} if either track cannot be aligned, or None if either
+        activity does not exist
+    """
+    activities = {activity.activity_id: activity for activity in db.query(Activities)
+                  .filter(owned_by(Activities))
+                  .filter(Activities.activity_id.in_([activity_a, activity_b]))}
+    if activity_a not in activities or activity_b not in activities:
+        return None
+
+    track_a, track_b = load_track(db, activity_a), load_track(db, activity_b)
+    comparison = align_tracks(track_a, track_b, step) if track_a is not None and track_b is not None else None
+    if comparison is None:
+        return {'error': "Both activities need a track with timestamps and distance"}
+
+    comparison['a'] = activities[activity_a].to_dict()
+    comparison['b'] = activities[activity_b].to_dict()
+    return comparison
@@ -6,51 +6,126 @@ processing it through the appropriate processors, and storing
 it in the database.
 """
 
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import List
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
 from sqlalchemy import func
+from backend.core.config import Config
 from backend.core.garmin_client import GarminClient
-from backend.models.models import get_db, Activities, ActivityRecords
-from backend.utils.data_utils import parse_gpx
+from backend.core.events import publish_progress
+from backend.data.change_log import record_change
+from backend.data.checkpoints import Checkpoint, day_chunks
+from backend.data.fetchers.pipeline import BatchWriter, run_pipelined
+from backend.data.achievements import load_achievements, update_achievements, update_streaks
+from backend.data.best_efforts import store_best_efforts
+from backend.data.map_index import store_map_index
+from backend.data.tracks import store_track
+from backend.data.training_load import update_training_load
+from backend.models.models import get_db, Activities
+from backend.utils.db_util import get_earliest_date
+from backend.utils.data_utils import parse_fit, parse_gpx
 from backend.data.processors.activity_processor import process_activity, process_gps_data
 
 logger = logging.getLogger(__name__)
 
-def fetch_and_store_activities(client):
+def activity_checkpoint(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                        force: bool = False) -> Checkpoint:
+    """
+    Read the activity sync progress over a date range.
+    
+    Args:
+        start_date: First date to sync (default: the earliest date with data)
+        end_date: Last date to sync (default and at most: today)
+        force: Sync every date, including those already synced
+        
+    Returns:
+        Checkpoint listing the dates to fetch
+    """
+    today = datetime.now().date()
+    end_date = min(end_date or today, today)
+    if start_date is None:
+        start_date = get_earliest_date()
+        start_date = start_date if not hasattr(start_date, 'date') else start_date.date()
+    return Checkpoint('activities', start_date, end_date, force)
+
+def fetch_and_store_activities(client, start_date: Optional[date] = None,
+                               end_date: Optional[date] = None, force: bool = False):
     """
     Fetch activities from Garmin Connect and store them in the database.
     
+    Without a date range the 100 most recent activities are checked. With
+    one, the activities are listed SYNC_ACTIVITY_CHUNK_DAYS at a time and
+    each chunk is checkpointed once stored, skipping the dates a previous
+    sync has completed unless forced.
+    
     Args:
         client: Initialized GarminClient instance
+        start_date: First date to sync (default: the earliest date with data)
+        end_date: Last date to sync (default: today)
+        force: Refetch dates already synced
         
     Returns:
-        True if successful, False if an error occurred
+        Number of new activities stored
     """
     db = next(get_db())
     try:
-        activities = client.get_activities(0, 100)  
+        checkpoint = None
+        if start_date is None and end_date is None:
+            listings = [(client.get_activities(0, 100), [])]
+        else:
+            checkpoint = activity_checkpoint(start_date, end_date, force)
+            # Listed lazily, so each chunk is stored before the next is requested
+            listings = ((client.get_activities_by_date(chunk[0].isoformat(), chunk[-1].isoformat()), chunk)
+                        for chunk in day_chunks(checkpoint.days, Config.SYNC_ACTIVITY_CHUNK_DAYS))
         
         new_activities_count = 0
-        for activity in activities:
-            try:
-                new_activity = process_activity(activity)
-                existing = db.query(Activities).filter_by(
-                    activity_id=activity["activityId"]
-                ).first()
-                
-                if not existing:
-                    db.add(new_activity)
-                    fetch_and_store_activity_details(db, client, activity["activityId"])
-                    new_activities_count += 1
-                    
-            except Exception as e:
-                logger.error(f"Error processing activity {activity.get('activityId')}: {e}")
+        earliest = None
+        for activities, chunk in listings:
+            if activities is None:
+                logger.error(f"Could not list the activities from {chunk[0]} to {chunk[-1]}")
                 continue
-                
+            complete = True
+            # Records of the chunk's activities, loaded with the first new one
+            records = None
+            for activity in sorted(activities, key=lambda activity: activity.get("startTimeLocal") or ''):
+                try:
+                    new_activity = process_activity(activity)
+                    existing = db.query(Activities).filter_by(
+                        activity_id=activity["activityId"]
+                    ).first()
+                    
+                    if not existing:
+                        if records is None:
+                            records = load_achievements(db)
+                        store_new_activity(db, activity["activityId"], new_activity, records)
+                        fetch_and_store_activity_details(db, client, activity["activityId"])
+                        new_activities_count += 1
+                        if new_activity.start_time and (earliest is None or new_activity.start_time.date() < earliest):
+                            earliest = new_activity.start_time.date()
+                        publish_progress('activities', activity_id=str(activity["activityId"]),
+                                         new_activities=new_activities_count)
+                        
+                except Exception as e:
+                    logger.error(f"Error processing activity {activity.get('activityId')}: {e}")
+                    complete = False
+                    continue
+            
+            if checkpoint:
+                # Saved with the chunk's activities, through the previously committed chunks
+                checkpoint.save(db)
+                db.commit()
+                if complete:
+                    checkpoint.done(*chunk)
+        
+        # Recompute the training load and streaks from the oldest new activity's day
+        update_training_load(db, earliest)
+        update_streaks(db, earliest)
+        if checkpoint:
+            checkpoint.save(db)
         db.commit()
         logger.info(f"Added {new_activities_count} new activities")
-        return True
+        return new_activities_count
         
     except Exception as e:
         logger.error(f"Error in activity fetch and store: {e}")
@@ -59,9 +134,81 @@ def fetch_and_store_activities(client):
     finally:
         db.close()
 
+def store_new_activity(db, activity_id, new_activity: Activities, records: Optional[dict] = None) -> None:
+    """
+    Add a new activity to the session and update the records with it.
+    
+    Streaks are left to update_streaks() once the batch is stored.
+    
+    Args:
+        db: Database session
+        activity_id: ID of the activity
+        new_activity: Processed activity
+        records: Achievements from load_achievements(), shared by a batch (optional)
+    """
+    db.add(new_activity)
+    record_change(db, 'activities', activity_id, 'insert')
+    update_achievements(db, new_activity, records)
+
+def download_track(client, activity_id: str) -> List[dict]:
+    """
+    Download and parse the track of an activity.
+    
+    The original FIT file is preferred: it is several times smaller than the
+    GPX export, faster to parse, and carries distance, cadence, power and
+    temperature. Activities without a usable FIT file (e.g. manual entries or
+    uploads in other formats) fall back to GPX.
+    
+    Args:
+        client: Initialized GarminClient instance
+        activity_id: ID of the activity
+        
+    Returns:
+        Parsed track points, empty if the activity has no track
+    """
+    fit_data = client.get_activity_fit(activity_id)
+    gps_data = parse_fit(fit_data) if fit_data else []
+    if not gps_data:
+        gpx_data = client.get_activity_gpx(activity_id)
+        gps_data = parse_gpx(gpx_data) if gpx_data else []
+    return gps_data
+
+async def download_track_async(client, activity_id: str) -> List[dict]:
+    """
+    Download and parse the track of an activity; see download_track().
+    
+    Args:
+        client: AsyncGarminClient instance
+        activity_id: ID of the activity
+        
+    Returns:
+        Parsed track points, empty if the activity has no track
+    """
+    fit_data = await client.get_activity_fit(activity_id)
+    # Parsing is CPU bound; keep it off the event loop
+    gps_data = await asyncio.to_thread(parse_fit, fit_data) if fit_data else []
+    if not gps_data:
+        gpx_data = await client.get_activity_gpx(activity_id)
+        gps_data = await asyncio.to_thread(parse_gpx, gpx_data) if gpx_data else []
+    return gps_data
+
+def store_activity_details(db, activity_id: str, gps_data: List[dict]) -> None:
+    """
+    Store the track of an activity and the data derived from it.
+    
+    Args:
+        db: Database session
+        activity_id: ID of the activity
+        gps_data: Parsed track points
+    """
+    records = process_gps_data(str(activity_id), gps_data)
+    track = store_track(db, activity_id, records)
+    store_best_efforts(db, str(activity_id), track)
+    store_map_index(db, activity_id, track)
+
 def fetch_and_store_activity_details(db, client, activity_id: str) -> None:
     """
-    Fetch GPS data for a specific activity and store it in the database.
+    Fetch the track of a specific activity and store it in the database.
     
     Args:
         db: Database session
@@ -69,17 +216,152 @@ def fetch_and_store_activity_details(db, client, activity_id: str) -> None:
         activity_id: ID of the activity to fetch details for
     """
     try:
-        gpx_data = client.get_activity_gpx(activity_id)  
-        if not gpx_data:
-            return
-
-        gps_data = parse_gpx(gpx_data)
-        if not gps_data:
-            return
-
-        db.query(ActivityRecords).filter_by(activity_id=activity_id).delete()
-        records = process_gps_data(activity_id, gps_data)
-        for record in records:
-            db.add(record)
+        gps_data = download_track(client, activity_id)
+        if gps_data:
+            store_activity_details(db, activity_id, gps_data)
     except Exception as e:
-        logger.error(f"Error fetching GPS data for activity {activity_id}: {e}")
\ No newline at end of file
+        logger.error(f"Error fetching track data for activity {activity_id}: {e}")
+
+def store_activities(db, items: List[Tuple[dict, Activities, List[dict]]]) -> int:
+    """
+    Store a batch of new activities with their tracks, without committing.
+    
+    Args:
+        db: Database session
+        items: (API activity, processed activity, parsed track points) triples
+        
+    Returns:
+        Number of activities stored
+    """
+    stored = 0
+    records = load_achievements(db)
+    for activity, new_activity, gps_data in items:
+        activity_id = activity["activityId"]
+        if db.query(Activities.activity_id).filter_by(activity_id=activity_id).first():
+            continue
+        store_new_activity(db, activity_id, new_activity, records)
+        if gps_data:
+            try:
+                store_activity_details(db, activity_id, gps_data)
+            except Exception as e:
+                logger.error(f"Error storing track data for activity {activity_id}: {e}")
+        stored += 1
+    return stored
+
+async def fetch_and_store_activities_async(client, start_date: Optional[date] = None,
+                                           end_date: Optional[date] = None, force: bool = False) -> int:
+    """
+    Fetch activities and store them, downloading many tracks at a time.
+    
+    Concurrent counterpart of fetch_and_store_activities(): the chunks of a
+    date range are listed at once, then the tracks of new activities are
+    downloaded and parsed GARMIN_CONCURRENCY at a time while a BatchWriter
+    stores the activities. A chunk is checkpointed once all of its new
+    activities are committed.
+    
+    Args:
+        client: AsyncGarminClient instance
+        start_date: First date to sync (default: the earliest date with data)
+        end_date: Last date to sync (default: today)
+        force: Refetch dates already synced
+        
+    Returns:
+        Number of new activities stored
+    """
+    checkpoint = None
+    chunks = []
+    # New activities of each listed chunk not yet committed; a chunk with an
+    # activity that failed never reaches zero and is left for the next run
+    pending = {}
+    if start_date is None and end_date is None:
+        listed = [(activity, None) for activity in await client.get_activities(0, 100)]
+    else:
+        checkpoint = await asyncio.to_thread(activity_checkpoint, start_date, end_date, force)
+        chunks = day_chunks(checkpoint.days, Config.SYNC_ACTIVITY_CHUNK_DAYS)
+        listings = await asyncio.gather(*(client.get_activities_by_date(chunk[0].isoformat(), chunk[-1].isoformat())
+                                          for chunk in chunks))
+        listed = []
+        for index, (chunk, activities) in enumerate(zip(chunks, listings)):
+            if activities is None:
+                logger.error(f"Could not list the activities from {chunk[0]} to {chunk[-1]}")
+                continue
+            pending[index] = 0
+            listed.extend((activity, index) for activity in activities)
+    activities = [activity for activity, _ in listed]
+
+    def known_ids() -> set:
+        db = next(get_db())
+        try:
+            ids = [str(activity["activityId"]) for activity in activities]
+            # Batched to stay under SQL Server's limit of 2100 query parameters
+            return {activity_id for offset in range(0, len(ids), 1000)
+                    for (activity_id,) in db.query(Activities.activity_id)
+                    .filter(Activities.activity_id.in_(ids[offset:offset + 1000]))}
+        finally:
+            db.close()
+
+    known = await asyncio.to_thread(known_ids) if activities else set()
+    # Oldest first, so activities are stored roughly in the order they happened
+    new = sorted(((activity, index) for activity, index in listed if str(activity["activityId"]) not in known),
+                 key=lambda item: item[0].get("startTimeLocal") or '')
+    earliest = None
+    fetched = 0
+
+    def chunk_committed(index: int) -> None:
+        if not pending[index]:
+            checkpoint.done(*chunks[index])
+
+    if checkpoint:
+        for _, index in new:
+            pending[index] += 1
+        for index in pending:
+            chunk_committed(index)
+
+    def store(db, items: List[Tuple[dict, Activities, List[dict], Optional[int]]]) -> int:
+        stored = store_activities(db, [item[:3] for item in items])
+        if checkpoint:
+            checkpoint.save(db)
+        return stored
+
+    def committed(items: List[Tuple[dict, Activities, List[dict], Optional[int]]]) -> None:
+        for *_, index in items:
+            pending[index] -= 1
+            chunk_committed(index)
+
+    async with BatchWriter(store, committed=committed if checkpoint else None) as writer:
+        async def fetch_activity(item: Tuple[dict, Optional[int]]) -> None:
+            nonlocal earliest, fetched
+            activity, index = item
+            activity_id = activity.get("activityId")
+            try:
+                new_activity = process_activity(activity)
+                try:
+                    gps_data = await download_track_async(client, activity_id)
+                except Exception as e:
+                    logger.error(f"Error fetching track data for activity {activity_id}: {e}")
+                    gps_data = []
+                await writer.put((activity, new_activity, gps_data, index))
+                if new_activity.start_time and (earliest is None or new_activity.start_time.date() < earliest):
+                    earliest = new_activity.start_time.date()
+                fetched += 1
+                publish_progress('activities', activity_id=str(activity_id), new_activities=fetched)
+            except Exception as e:
+                logger.error(f"Error processing activity {activity_id}: {e}")
+
+        await run_pipelined(fetch_activity, new)
+
+    # Recompute the training load and streaks from the oldest new activity's day
+    def refresh_training_load() -> None:
+        db = next(get_db())
+        try:
+            update_training_load(db, earliest)
+            update_streaks(db, earliest)
+            if checkpoint:
+                checkpoint.save(db)
+            db.commit()
+        finally:
+            db.close()
+
+    await asyncio.to_thread(refresh_training_load)
+    logger.info(f"Added {writer.changed} new activities")
+    return writer.changed
@@ -0,0 +1,256 @@
+"""
+GarminDb import module.
+
+This module reads activities, activity records, sleep and daily summaries from
+the SQLite files produced by the GarminDb pipeline (garmindb_cli.py), converts
+them through the processors and stores them in the application database. It
+replaces the Garmin Connect fetchers when DATA_SOURCE is set to 'garmindb', so
+a sync becomes a local import and needs no Garmin credentials.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import func
+import idbutils
+from garmindb import GarminConnectConfigManager
+from garmindb.garmindb import (
+    GarminDb, ActivitiesDb, Activities as GarminDbActivities,
+    ActivityRecords as GarminDbActivityRecords, StepsActivities, CycleActivities,
+    Sleep, DailySummary
+)
+from backend.core.config import Config
+from backend.core.create_db import get_db
+from backend.core.events import publish_progress
+from backend.core.tenancy import owned_by
+from backend.data.change_log import record_change, update_from
+from backend.data.achievements import update_achievements, update_streaks
+from backend.data.best_efforts import store_best_efforts
+from backend.data.map_index import store_map_index
+from backend.data.tracks import store_track
+from backend.data.training_load import update_training_load
+from backend.models.models import Activities, HealthSummary, SleepMetrics
+from backend.data.processors.activity_processor import process_garmindb_activity, process_garmindb_records
+from backend.data.processors.health_processor import process_garmindb_daily_summary
+from backend.data.processors.sleep_processor import process_garmindb_sleep
+
+logger = logging.getLogger(__name__)
+
+# Days re-imported before the latest stored day, since GarminDb rewrites the
+# most recent (possibly partial) day on every garmindb_cli.py run
+DAYS_OVERLAP = 1
+
+def get_garmindb_params():
+    """
+    Build the idbutils database parameters for the GarminDb SQLite files.
+
+    Uses GARMINDB_DIR if configured, otherwise the DBs directory from the
+    GarminDb config file (~/.GarminDb/GarminConnectConfig.json).
+
+    Returns:
+        idbutils.DbParams pointing at the GarminDb SQLite directory
+    """
+    if Config.GARMINDB_DIR:
+        return idbutils.DbParams(db_type='sqlite', db_path=Config.GARMINDB_DIR)
+    return GarminConnectConfigManager().get_db_params()
+
+def import_activities(db_params, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+    """
+    Import activities not yet stored, together with their track records.
+
+    Args:
+        db_params: GarminDb database parameters
+        start_date: First day of activities to import (optional)
+        end_date: Last day of activities to import (optional)
+
+    Returns:
+        Number of new activities stored
+    """
+    activities_db = ActivitiesDb(db_params)
+    db = next(get_db())
+    try:
+        existing_ids = {row[0] for row in db.query(Activities.activity_id).all()}
+        new_activities_count = 0
+        earliest = None
+
+        with activities_db.managed_session() as session:
+            query = session.query(GarminDbActivities)
+            if start_date:
+                query = query.filter(GarminDbActivities.start_time >= datetime.combine(start_date, time.min))
+            if end_date:
+                query = query.filter(GarminDbActivities.start_time < datetime.combine(end_date + timedelta(days=1), time.min))
+            for activity in query.order_by(GarminDbActivities.start_time):
+                activity_id = str(activity.activity_id)
+                if activity_id in existing_ids or activity.start_time is None:
+                    continue
+                try:
+                    sport_activity = (
+                        session.query(StepsActivities).filter_by(activity_id=activity.activity_id).one_or_none()
+                        or session.query(CycleActivities).filter_by(activity_id=activity.activity_id).one_or_none()
+                    )
+                    new_activity = process_garmindb_activity(activity, sport_activity, Config.GARMINDB_METRIC)
+                    db.add(new_activity)
+                    record_change(db, 'activities', activity_id, 'insert')
+                    update_achievements(db, new_activity)
+
+                    records = session.query(GarminDbActivityRecords)\
+                        .filter_by(activity_id=activity.activity_id)\
+                        .order_by(GarminDbActivityRecords.record)\
+                        .all()
+                    new_records = process_garmindb_records(activity_id, records, Config.GARMINDB_METRIC)
+                    track = store_track(db, activity_id, new_records)
+                    store_best_efforts(db, activity_id, track)
+                    store_map_index(db, activity_id, track)
+
+                    db.commit()
+                    new_activities_count += 1
+                    if earliest is None or new_activity.start_time.date() < earliest:
+                        earliest = new_activity.start_time.date()
+                except Exception as e:
+                    logger.error(f"Error importing activity {activity_id}: {e}")
+                    db.rollback()
+
+        # Recompute the training load and streaks from the oldest imported activity's day
+        update_training_load(db, earliest)
+        update_streaks(db, earliest)
+        db.commit()
+
+        logger.info(f"Imported {new_activities_count} new activities from GarminDb")
+        return new_activities_count
+    finally:
+        db.close()
+
+def _import_days(source_db, source_model, target_model, process, entity: str,
+                 start_date: Optional[date] = None, end_date: Optional[date] = None,
+                 force: bool = False) -> int:
+    """
+    Upsert per-day rows from a GarminDb table into an application table.
+
+    Without a start date only days from the latest stored day (minus
+    DAYS_OVERLAP) onwards are read, so repeated imports stay proportional to
+    the new data.
+
+    Args:
+        source_db: GarminDb database instance
+        source_model: GarminDb model class keyed by a 'day' column
+        target_model: Application model class keyed by a 'date' column
+        process: Processor converting a source row to a target model instance
+        entity: Change log entity name of the target table
+        start_date: First day to import (optional)
+        end_date: Last day to import (optional)
+        force: Read every day from the start, not just from the latest stored day
+
+    Returns:
+        Number of days inserted or updated
+    """
+    db = next(get_db())
+    try:
+        latest = db.query(func.max(target_model.date)).filter(owned_by(target_model)).scalar()
+        records_processed = 0
+
+        with source_db.managed_session() as session:
+            query = session.query(source_model)
+            if start_date:
+                query = query.filter(source_model.day >= start_date)
+            elif latest and not force:
+                query = query.filter(source_model.day >= latest - timedelta(days=DAYS_OVERLAP))
+            if end_date:
+                query = query.filter(source_model.day <= end_date)
+
+            for row in query.order_by(source_model.day):
+                try:
+                    new_record = process(row)
+                    if new_record is None:
+                        continue
+
+                    existing = db.query(target_model)\
+                        .filter(owned_by(target_model))\
+                        .filter_by(date=new_record.date)\
+                        .first()
+                    if existing:
+                        if not update_from(existing, new_record):
+                            continue
+                        record_change(db, entity, new_record.date, 'update')
+                    else:
+                        db.add(new_record)
+                        record_change(db, entity, new_record.date, 'insert')
+
+                    db.commit()
+                    records_processed += 1
+                except Exception as e:
+                    logger.error(f"Error importing {source_model.__tablename__} for {row.day}: {e}")
+                    db.rollback()
+
+        return records_processed
+    finally:
+        db.close()
+
+def import_health_data(db_params, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                       force: bool = False) -> int:
+    """
+    Import daily summaries into the health summary table.
+
+    Args:
+        db_params: GarminDb database parameters
+        start_date: First day to import (optional)
+        end_date: Last day to import (optional)
+        force: Re-read every day, not just from the latest stored day
+
+    Returns:
+        Number of health records stored
+    """
+    records_processed = _import_days(GarminDb(db_params), DailySummary, HealthSummary,
+                                     process_garmindb_daily_summary, 'health', start_date, end_date, force)
+    logger.info(f"Imported {records_processed} health records from GarminDb")
+    return records_processed
+
+def import_sleep_data(db_params, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                      force: bool = False) -> int:
+    """
+    Import nightly sleep rows into the sleep metrics table.
+
+    Args:
+        db_params: GarminDb database parameters
+        start_date: First day to import (optional)
+        end_date: Last day to import (optional)
+        force: Re-read every day, not just from the latest stored day
+
+    Returns:
+        Number of sleep records stored
+    """
+    records_processed = _import_days(GarminDb(db_params), Sleep, SleepMetrics, process_garmindb_sleep, 'sleep',
+                                     start_date, end_date, force)
+    logger.info(f"Imported {records_processed} sleep records from GarminDb")
+    return records_processed
+
+def import_all(start_date: Optional[date] = None, end_date: Optional[date] = None,
+               entities: Optional[Iterable[str]] = None, force: bool = False) -> dict:
+    """
+    Import activities, health and sleep data from the GarminDb mirror.
+
+    Args:
+        start_date: First day to import (optional)
+        end_date: Last day to import (optional)
+        entities: Subset of 'activities', 'health' and 'sleep' (default: all)
+        force: Re-read health and sleep days already stored; activities
+            already stored are always kept as they are
+
+    Returns:
+        Dictionary with the number of records stored per entity
+
+    Raises:
+        Exception: If the GarminDb files cannot be opened
+    """
+    db_params = get_garmindb_params()
+    counts = {}
+    for entity in ('activities', 'health', 'sleep'):
+        if entities is not None and entity not in entities:
+            continue
+        if entity == 'activities':
+            counts[entity] = import_activities(db_params, start_date, end_date)
+        elif entity == 'health':
+            counts[entity] = import_health_data(db_params, start_date, end_date, force)
+        else:
+            counts[entity] = import_sleep_data(db_params, start_date, end_date, force)
+        publish_progress(entity, records_stored=counts[entity])
+    return counts
@@ -6,24 +6,30 @@ processing it through the appropriate processors, and storing
 it in the database.
 """
 
+import asyncio
 import logging
-from datetime import datetime, timedelta, date
+from datetime import datetime, date
 from backend.core.garmin_client import GarminClient
 from backend.core.create_db import get_db
+from backend.core.events import publish_progress
+from backend.core.tenancy import owned_by
+from backend.data.change_log import record_change, update_from
+from backend.data.checkpoints import Checkpoint
+from backend.data.fetchers.pipeline import BatchWriter, run_pipelined
 from backend.models.models import HealthSummary
 from backend.utils.db_util import get_earliest_date
 from backend.data.processors.health_processor import process_health_data
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
-def fetch_heart_rate_data(client, date_str: str) -> Dict:
+def summarize_heart_rates(heart_rates: Optional[Dict], rhr_data) -> Dict:
     """
-    Fetch heart rate data with improved null handling.
+    Extract the heart rate metrics of a day from the API responses.
     
     Args:
-        client: Initialized GarminClient instance
-        date_str: Date string in format "YYYY-MM-DD"
+        heart_rates: Response of get_heart_rates()
+        rhr_data: Response of get_rhr_day()
         
     Returns:
         Dictionary containing heart rate data and metrics
@@ -35,64 +41,81 @@ def fetch_heart_rate_data(client, date_str: str) -> Dict:
         'hr_values': []
     }
     
-    try:
-        heart_rates = client.get_heart_rates(date_str)
-        logger.debug(f"Raw heart rates response: {heart_rates}")
-        
-        if heart_rates and isinstance(heart_rates, dict):
-            heart_rate_values = heart_rates.get('heartRateValues', [])
-            if heart_rate_values and isinstance(heart_rate_values, list):
-                hr_values = []
-                for hr in heart_rate_values:
-                    try:
-                        if isinstance(hr, dict) and hr.get('value') is not None:
-                            value = float(hr['value'])
-                            hr_values.append(value)
-                    except (ValueError, TypeError):
-                        continue
-                
-                if hr_values:
-                    heart_rate_debug['hr_values'] = hr_values
-                    heart_rate_debug['avg_hr'] = int(round(sum(hr_values) / len(hr_values)))
-                    heart_rate_debug['max_hr'] = int(max(hr_values))
-                    logger.debug(f"Processed HR values - Avg: {heart_rate_debug['avg_hr']}, Max: {heart_rate_debug['max_hr']}")
-    except Exception as e:
-        logger.error(f"Error fetching heart rates: {str(e)}")
+    logger.debug(f"Raw heart rates response: {heart_rates}")
+    if heart_rates and isinstance(heart_rates, dict):
+        heart_rate_values = heart_rates.get('heartRateValues', [])
+        if heart_rate_values and isinstance(heart_rate_values, list):
+            hr_values = []
+            for hr in heart_rate_values:
+                try:
+                    if isinstance(hr, dict) and hr.get('value') is not None:
+                        value = float(hr['value'])
+                        hr_values.append(value)
+                except (ValueError, TypeError):
+                    continue
+            
+            if hr_values:
+                heart_rate_debug['hr_values'] = hr_values
+                heart_rate_debug['avg_hr'] = int(round(sum(hr_values) / len(hr_values)))
+                heart_rate_debug['max_hr'] = int(max(hr_values))
+                logger.debug(f"Processed HR values - Avg: {heart_rate_debug['avg_hr']}, Max: {heart_rate_debug['max_hr']}")
 
     try:
-        rhr_data = client.get_rhr_day(date_str)
         if isinstance(rhr_data, list) and rhr_data:
             rhr_entry = next((item for item in rhr_data if isinstance(item, dict) and item.get('metricId') == 60), None)
             if rhr_entry:
                 heart_rate_debug['resting_hr'] = int(rhr_entry.get('value')) if rhr_entry.get('value') is not None else None
                 logger.debug(f"Found RHR value: {heart_rate_debug['resting_hr']}")
     except Exception as e:
-        logger.error(f"Error fetching RHR: {str(e)}")
+        logger.error(f"Error parsing RHR: {str(e)}")
 
     return heart_rate_debug
 
-def fetch_health_data_with_debug(client, date_str: str) -> Dict:
+def fetch_heart_rate_data(client, date_str: str) -> Dict:
     """
-    Fetch health data from all endpoints with improved null handling.
+    Fetch heart rate data with improved null handling.
     
     Args:
         client: Initialized GarminClient instance
         date_str: Date string in format "YYYY-MM-DD"
         
     Returns:
-        Dictionary containing processed health data
+        Dictionary containing heart rate data and metrics
     """
-    hr_data = fetch_heart_rate_data(client, date_str)
-    
     try:
-        summary = client.get_user_summary(date_str) or {}
-        logger.debug(f"Summary data: {summary}")
+        heart_rates = client.get_heart_rates(date_str)
     except Exception as e:
-        logger.error(f"Failed to fetch user summary: {e}")
-        summary = {}
+        logger.error(f"Error fetching heart rates: {str(e)}")
+        heart_rates = None
+
+    try:
+        rhr_data = client.get_rhr_day(date_str)
+    except Exception as e:
+        logger.error(f"Error fetching RHR: {str(e)}")
+        rhr_data = None
+
+    return summarize_heart_rates(heart_rates, rhr_data)
+
+def build_health_data(hr_data: Dict, summary: Optional[Dict], intensity_data: Optional[Dict],
+                      daily_stats: Optional[Dict], date_str: str) -> Dict:
+    """
+    Combine the API responses of a day into the health data to process.
+    
+    Args:
+        hr_data: Heart rate metrics from summarize_heart_rates()
+        summary: Response of get_user_summary()
+        intensity_data: Response of get_intensity_minutes_data()
+        daily_stats: Response of get_stats()
+        date_str: Date string in format "YYYY-MM-DD"
+        
+    Returns:
+        Dictionary containing processed health data
+    """
+    summary = summary or {}
+    logger.debug(f"Summary data: {summary}")
 
     try:
-        intensity_data = client.get_intensity_minutes_data(date_str) or {}
+        intensity_data = intensity_data or {}
         logger.debug(f"Raw intensity data: {intensity_data}")
         
         moderate = intensity_data.get('moderateIntensityDuration', 0) or 0
@@ -105,15 +128,10 @@ def fetch_health_data_with_debug(client, date_str: str) -> Dict:
         logger.debug(f"Calculated intensity minutes: {total_intensity_minutes} "
                     f"(moderate: {moderate_minutes}, vigorous: {vigorous_minutes})")
     except Exception as e:
-        logger.error(f"Failed to fetch intensity minutes: {str(e)}")
+        logger.error(f"Failed to parse intensity minutes: {str(e)}")
         total_intensity_minutes = 0
 
-    try:
-        daily_stats = client.get_stats(date_str) or {}
-        active_calories = daily_stats.get('activeKilocalories')
-    except Exception as e:
-        logger.error(f"Failed to fetch daily stats: {str(e)}")
-        active_calories = None
+    active_calories = (daily_stats or {}).get('activeKilocalories')
 
     processed_data = {
         'restingHeartRate': hr_data['resting_hr'],
@@ -131,27 +149,150 @@ def fetch_health_data_with_debug(client, date_str: str) -> Dict:
     logger.debug(f"Final processed data for {date_str}: {processed_data}")
     return processed_data
 
-def fetch_and_store_health_data(client=None):
+def fetch_health_data_with_debug(client, date_str: str) -> Dict:
+    """
+    Fetch health data from all endpoints with improved null handling.
+    
+    Args:
+        client: Initialized GarminClient instance
+        date_str: Date string in format "YYYY-MM-DD"
+        
+    Returns:
+        Dictionary containing processed health data
+        
+    Raises:
+        ValueError: If the daily summary could not be fetched
+    """
+    hr_data = fetch_heart_rate_data(client, date_str)
+    
+    try:
+        summary = client.get_user_summary(date_str)
+    except Exception as e:
+        logger.error(f"Failed to fetch user summary: {e}")
+        summary = None
+    if summary is None:
+        # Leave the day to be retried instead of storing it with zeroed totals
+        raise ValueError(f"No daily summary for {date_str}")
+
+    try:
+        intensity_data = client.get_intensity_minutes_data(date_str)
+    except Exception as e:
+        logger.error(f"Failed to fetch intensity minutes: {str(e)}")
+        intensity_data = None
+
+    try:
+        daily_stats = client.get_stats(date_str)
+    except Exception as e:
+        logger.error(f"Failed to fetch daily stats: {str(e)}")
+        daily_stats = None
+
+    return build_health_data(hr_data, summary, intensity_data, daily_stats, date_str)
+
+async def fetch_health_data_async(client, date_str: str) -> Dict:
+    """
+    Fetch the health data of a day from all endpoints at once.
+    
+    Args:
+        client: AsyncGarminClient instance
+        date_str: Date string in format "YYYY-MM-DD"
+        
+    Returns:
+        Dictionary containing processed health data
+        
+    Raises:
+        ValueError: If the daily summary could not be fetched
+    """
+    heart_rates, rhr_data, summary, intensity_data, daily_stats = await asyncio.gather(
+        client.get_heart_rates(date_str),
+        client.get_rhr_day(date_str),
+        client.get_user_summary(date_str),
+        client.get_intensity_minutes_data(date_str),
+        client.get_stats(date_str),
+    )
+    if summary is None:
+        raise ValueError(f"No daily summary for {date_str}")
+    return build_health_data(summarize_heart_rates(heart_rates, rhr_data),
+                             summary, intensity_data, daily_stats, date_str)
+
+def store_health_records(db, records: List[Tuple[date, HealthSummary]]) -> int:
+    """
+    Insert or update processed health records, without committing.
+    
+    Args:
+        db: Database session
+        records: (date, HealthSummary) pairs
+        
+    Returns:
+        Number of records inserted or updated
+    """
+    days = [day for day, _ in records]
+    existing = {row.date: row for row in db.query(HealthSummary)
+                .filter(owned_by(HealthSummary))
+                .filter(HealthSummary.date.in_(days))}
+    changed = 0
+    for day, new_health in records:
+        stored = existing.get(day)
+        if stored:
+            if update_from(stored, new_health):
+                record_change(db, 'health', day, 'update')
+                changed += 1
+        else:
+            db.add(new_health)
+            existing[day] = new_health
+            record_change(db, 'health', day, 'insert')
+            changed += 1
+    return changed
+
+def health_checkpoint(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                      force: bool = False) -> Checkpoint:
+    """
+    Read the health sync progress over a date range.
+    
+    Args:
+        start_date: First date to sync (default: the earliest date with data)
+        end_date: Last date to sync (default and at most: today)
+        force: Sync every date, including those already synced
+        
+    Returns:
+        Checkpoint listing the dates to fetch
+    """
+    today = datetime.now().date()
+    end_date = min(end_date or today, today)
+    if start_date is None:
+        start_date = get_earliest_date()
+        start_date = start_date if not hasattr(start_date, 'date') else start_date.date()
+    return Checkpoint('health', start_date, end_date, force)
+
+def fetch_and_store_health_data(client=None, start_date: Optional[date] = None,
+                                end_date: Optional[date] = None, force: bool = False):
     """
     Main function to fetch and store health data.
     
+    Dates a previous sync has completed are skipped unless forced.
+    
     Args:
         client: Optional GarminClient instance. If None, a new instance will be created.
+        start_date: First date to sync (default: the earliest date with data)
+        end_date: Last date to sync (default: today)
+        force: Refetch dates already synced
+        
+    Returns:
+        Number of health records inserted or updated
     """
     if client is None:
         client = GarminClient()
     
     db = next(get_db())
     try:
-        end_date = datetime.now().date()
-        start_date = get_earliest_date()
-        current_date = start_date if not hasattr(start_date, 'date') else start_date.date()
+        checkpoint = health_checkpoint(start_date, end_date, force)
+        total_days = len(checkpoint.days)
         records_processed = 0
+        records_changed = 0
         
-        while current_date <= end_date:
+        for days_processed, current_date in enumerate(checkpoint.days, 1):
             try:
                 date_str = current_date.strftime("%Y-%m-%d")
-                logger.info(f"Processing date: {date_str}")
+                logger.debug(f"Processing date: {date_str}")
                 
                 processed_data = fetch_health_data_with_debug(client, date_str)
                 
@@ -162,27 +303,83 @@ def fetch_and_store_health_data(client=None):
                 )
 
                 if new_health:
-                    existing = db.query(HealthSummary).filter_by(date=current_date).first()
-                    if existing:
-                        for key, value in new_health.__dict__.items():
-                            if key != '_sa_instance_state':
-                                setattr(existing, key, value)
-                    else:
-                        db.add(new_health)
-                    
-                    db.commit()
+                    records_changed += store_health_records(db, [(current_date, new_health)])
                     records_processed += 1
+                # Saved with the day's data, through the previously committed days
+                checkpoint.save(db)
+                db.commit()
+                checkpoint.done(current_date)
                 
             except Exception as e:
                 logger.error(f"Error processing health data for {current_date}: {e}")
                 db.rollback()
             
-            current_date += timedelta(days=1)
-            
-        logger.info(f"Processed {records_processed} health records")
+            publish_progress('health', date=current_date.isoformat(), days_processed=days_processed,
+                             total_days=total_days, records_stored=records_processed)
+        
+        checkpoint.commit()
+        logger.info(f"Processed {records_processed} health records, {records_changed} changed")
+        return records_changed
         
     except Exception as e:
         logger.error(f"Error in health data fetch: {e}")
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def fetch_and_store_health_data_async(client, start_date: Optional[date] = None,
+                                            end_date: Optional[date] = None, force: bool = False) -> int:
+    """
+    Fetch and store health data, many dates at a time.
+    
+    Concurrent counterpart of fetch_and_store_health_data(): dates are
+    fetched GARMIN_CONCURRENCY at a time, each with all of its endpoints at
+    once, while a BatchWriter stores the results.
+    
+    Args:
+        client: AsyncGarminClient instance
+        start_date: First date to sync (default: the earliest date with data)
+        end_date: Last date to sync (default: today)
+        force: Refetch dates already synced
+        
+    Returns:
+        Number of health records inserted or updated
+    """
+    checkpoint = await asyncio.to_thread(health_checkpoint, start_date, end_date, force)
+    days = checkpoint.days
+    days_processed = 0
+
+    def store(db, records: List[Tuple[date, HealthSummary]]) -> int:
+        changed = store_health_records(db, records)
+        # Saved with the batch, through the previously committed dates
+        checkpoint.save(db)
+        return changed
+
+    async with BatchWriter(store, committed=lambda records: checkpoint.done(*(day for day, _ in records))) as writer:
+        async def fetch_day(day: date) -> None:
+            nonlocal days_processed
+            try:
+                date_str = day.strftime("%Y-%m-%d")
+                logger.debug(f"Processing date: {date_str}")
+                processed_data = await fetch_health_data_async(client, date_str)
+                new_health = process_health_data(
+                    data=processed_data,
+                    date=datetime.combine(day, datetime.min.time()),
+                    hr_values=[]
+                )
+                if new_health:
+                    await writer.put((day, new_health))
+                else:
+                    checkpoint.done(day)
+            except Exception as e:
+                logger.error(f"Error processing health data for {day}: {e}")
+
+            days_processed += 1
+            publish_progress('health', date=day.isoformat(), days_processed=days_processed,
+                             total_days=len(days), records_stored=writer.stored)
+
+        await run_pipelined(fetch_day, days)
+
+    await asyncio.to_thread(checkpoint.commit)
+    logger.info(f"Processed {writer.stored} health records, {writer.changed} changed")
+    return writer.changed
@@ -0,0 +1,141 @@
+"""
+Building blocks of the concurrent fetchers.
+
+The concurrent fetchers run many Garmin Connect requests at once on an
+asyncio event loop. Database writes stay synchronous SQLAlchemy code and
+run on a dedicated writer thread fed by a queue, in batches committed
+together, so the requests keep flowing while a batch is written and the
+database sees a few large transactions instead of one per date.
+"""
+
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+from backend.core.config import Config
+from backend.core.create_db import get_db
+
+logger = logging.getLogger(__name__)
+
+# Queued after the last item to stop the writer
+_DONE = object()
+
+async def run_pipelined(worker: Callable[[Any], Awaitable[None]], items: Iterable,
+                        concurrency: Optional[int] = None) -> None:
+    """
+    Run a coroutine function over items with bounded concurrency.
+
+    Items are started in order as earlier ones finish, so with dates in
+    chronological order the sync still progresses roughly day by day.
+
+    Args:
+        worker: Coroutine function handling one item; it should handle its
+            own errors, since an exception cancels the remaining items
+        items: Items to process
+        concurrency: Items in flight at once (default: GARMIN_CONCURRENCY)
+    """
+    iterator = iter(items)
+
+    async def run():
+        for item in iterator:
+            await worker(item)
+
+    await asyncio.gather(*(run() for _ in range(max(concurrency or Config.GARMIN_CONCURRENCY, 1))))
+
+class BatchWriter:
+    """
+    Writer task storing queued items in batched transactions.
+
+    Fetch coroutines put() items as they arrive; the writer collects up to
+    `batch_size` of them (fewer when the queue runs dry) and passes them to
+    `store(db, items)` on its own thread, then commits. The store function
+    returns the number of rows it changed. If a batch fails it is rolled
+    back and retried item by item, so a bad item loses only itself, as with
+    the per-date commits of the sequential fetchers. Writes run in the
+    caller's context, so rows are owned by the current user and tagged with
+    the current sync generation. The optional `committed(items)` callback is
+    called with the items of every committed batch, e.g. to advance a sync
+    checkpoint.
+
+    Example:
+        >>> async with BatchWriter(store_health_records) as writer:
+        ...     await writer.put((day, record))
+        >>> writer.changed
+    """
+
+    def __init__(self, store: Callable[[Any, List[Any]], int], batch_size: Optional[int] = None,
+                 committed: Optional[Callable[[List[Any]], None]] = None):
+        self._store = store
+        self._committed = committed
+        self.batch_size = max(batch_size or Config.SYNC_WRITE_BATCH, 1)
+        # Bounded, so fetching cannot run arbitrarily far ahead of the writes
+        self._queue = asyncio.Queue(maxsize=self.batch_size * 2)
+        self._executor = None
+        self._task = None
+        self._db = None
+        self.stored = 0
+        self.changed = 0
+        self.failed = 0
+
+    async def __aenter__(self) -> 'BatchWriter':
+        # One thread owns the session, as SQLite connections require
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sync-writer')
+        self._db = await self._call(lambda: next(get_db()))
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if not self._task.done():
+                await self._queue.put(_DONE)
+            await self._task
+        finally:
+            await self._call(self._db.close)
+            self._executor.shutdown()
+
+    async def put(self, item: Any) -> None:
+        """Queue an item for writing, waiting while the queue is full."""
+        if self._task.done():
+            # The writer died; surface its error instead of blocking forever
+            self._task.result()
+        await self._queue.put(item)
+
+    async def _call(self, function: Callable[[], Any]) -> Any:
+        """Run a function on the writer thread in the current context."""
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, context.run, function)
+
+    async def _run(self) -> None:
+        """Write batches until the end marker is queued."""
+        while True:
+            items = [await self._queue.get()]
+            while len(items) < self.batch_size and not self._queue.empty():
+                items.append(self._queue.get_nowait())
+            done = items[-1] is _DONE
+            if done:
+                items.pop()
+            if items:
+                await self._call(lambda: self._write(items))
+            if done:
+                return
+
+    def _write(self, items: List[Any]) -> None:
+        """Store and commit a batch, retrying its items one by one on failure."""
+        try:
+            changed = self._store(self._db, items)
+            self._db.commit()
+        except Exception as e:
+            self._db.rollback()
+            if len(items) == 1:
+                logger.error(f"Error storing {items[0]!r}: {e}")
+                self.failed += 1
+                return
+            logger.warning(f"Error storing a batch of {len(items)} items, retrying one by one: {e}")
+            for item in items:
+                self._write([item])
+            return
+        self.stored += len(items)
+        self.changed += changed
+        if self._committed:
+            self._committed(items)
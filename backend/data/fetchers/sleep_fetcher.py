@@ -6,39 +6,103 @@ processing it through the appropriate processors, and storing
 it in the database.
 """
 
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
 from backend.core.garmin_client import GarminClient
 from backend.core.create_db import get_db
+from backend.core.events import publish_progress
+from backend.core.tenancy import owned_by
+from backend.data.change_log import record_change, update_from
+from backend.data.checkpoints import Checkpoint
+from backend.data.fetchers.pipeline import BatchWriter, run_pipelined
 from backend.models.models import SleepMetrics
 from backend.data.processors.sleep_processor import process_sleep_data
 
 logger = logging.getLogger(__name__)
 
-def fetch_and_store_sleep_data(client=None):
+def store_sleep_records(db, records: List[Tuple[date, SleepMetrics]]) -> int:
+    """
+    Insert or update processed sleep records, without committing.
+    
+    Args:
+        db: Database session
+        records: (date, SleepMetrics) pairs
+        
+    Returns:
+        Number of records inserted or updated
+    """
+    days = [day for day, _ in records]
+    existing = {row.date: row for row in db.query(SleepMetrics)
+                .filter(owned_by(SleepMetrics))
+                .filter(SleepMetrics.date.in_(days))}
+    changed = 0
+    for day, new_sleep in records:
+        stored = existing.get(day)
+        if stored:
+            if update_from(stored, new_sleep):
+                record_change(db, 'sleep', day, 'update')
+                changed += 1
+        else:
+            db.add(new_sleep)
+            existing[day] = new_sleep
+            record_change(db, 'sleep', day, 'insert')
+            changed += 1
+    return changed
+
+def sleep_checkpoint(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                     force: bool = False) -> Checkpoint:
+    """
+    Read the sleep sync progress over a date range.
+    
+    Args:
+        start_date: First date to sync (default: 180 days ago)
+        end_date: Last date to sync (default and at most: today)
+        force: Sync every date, including those already synced
+        
+    Returns:
+        Checkpoint listing the dates to fetch
+    """
+    today = datetime.now().date()
+    end_date = min(end_date or today, today)
+    return Checkpoint('sleep', start_date or today - timedelta(days=180), end_date, force)
+
+def fetch_and_store_sleep_data(client=None, start_date: Optional[date] = None,
+                               end_date: Optional[date] = None, force: bool = False):
     """
     Fetch sleep data from Garmin Connect and store it in the database.
     
+    Dates a previous sync has completed are skipped unless forced.
+    
     Args:
         client: Optional GarminClient instance. If None, a new instance will be created.
+        start_date: First date to sync (default: 180 days ago)
+        end_date: Last date to sync (default: today)
+        force: Refetch dates already synced
+        
+    Returns:
+        Number of sleep records inserted or updated
     """
     if client is None:
         client = GarminClient()
     
     db = next(get_db())
     try:
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=180)
-        current_date = start_date
+        checkpoint = sleep_checkpoint(start_date, end_date, force)
+        total_days = len(checkpoint.days)
         records_processed = 0
+        records_changed = 0
         
-        while current_date.date() <= end_date.date():
+        for days_processed, current_date in enumerate(checkpoint.days, 1):
             try:
                 sleep_data = client.get_sleep_data(current_date.strftime("%Y-%m-%d"))
+                if sleep_data is None:
+                    raise ValueError("Sleep data request failed")
                 
                 if sleep_data and isinstance(sleep_data, dict):
                     if sleep_data.get('privacyProtected'):
-                        logger.warning(f"Sleep data for {current_date.date()} is privacy protected")
+                        logger.warning(f"Sleep data for {current_date} is privacy protected")
                         sleep_data = client.get_user_summary(current_date.strftime("%Y-%m-%d"))
                     
                     if not sleep_data.get('privacyProtected'):
@@ -46,32 +110,95 @@ def fetch_and_store_sleep_data(client=None):
                         
                         # Add null check here
                         if new_sleep is not None:
-                            existing = db.query(SleepMetrics).filter_by(
-                                date=current_date.date()
-                            ).first()
-                            
-                            if existing:
-                                for key, value in new_sleep.__dict__.items():
-                                    if key != '_sa_instance_state':
-                                        setattr(existing, key, value)
-                            else:
-                                db.add(new_sleep)
-                                
-                            db.commit()
+                            records_changed += store_sleep_records(db, [(current_date, new_sleep)])
                             records_processed += 1
                         else:
-                            logger.debug(f"No valid sleep data for {current_date.date()}")
+                            logger.debug(f"No valid sleep data for {current_date}")
+                
+                # Saved with the day's data, through the previously committed days
+                checkpoint.save(db)
+                db.commit()
+                checkpoint.done(current_date)
                         
             except Exception as e:
                 logger.error(f"Error processing sleep data for {current_date}: {e}")
                 db.rollback()
             
-            current_date += timedelta(days=1)
-            
-        logger.info(f"Processed {records_processed} sleep records")
+            publish_progress('sleep', date=current_date.isoformat(), days_processed=days_processed,
+                             total_days=total_days, records_stored=records_processed)
+        
+        checkpoint.commit()
+        logger.info(f"Processed {records_processed} sleep records, {records_changed} changed")
+        return records_changed
         
     except Exception as e:
         logger.error(f"Error in sleep data fetch: {e}")
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def fetch_and_store_sleep_data_async(client, start_date: Optional[date] = None,
+                                           end_date: Optional[date] = None, force: bool = False) -> int:
+    """
+    Fetch and store sleep data, many dates at a time.
+    
+    Concurrent counterpart of fetch_and_store_sleep_data(): dates are
+    fetched GARMIN_CONCURRENCY at a time while a BatchWriter stores the
+    results.
+    
+    Args:
+        client: AsyncGarminClient instance
+        start_date: First date to sync (default: 180 days ago)
+        end_date: Last date to sync (default: today)
+        force: Refetch dates already synced
+        
+    Returns:
+        Number of sleep records inserted or updated
+    """
+    checkpoint = await asyncio.to_thread(sleep_checkpoint, start_date, end_date, force)
+    days = checkpoint.days
+    days_processed = 0
+
+    def store(db, records: List[Tuple[date, SleepMetrics]]) -> int:
+        changed = store_sleep_records(db, records)
+        # Saved with the batch, through the previously committed dates
+        checkpoint.save(db)
+        return changed
+
+    async with BatchWriter(store, committed=lambda records: checkpoint.done(*(day for day, _ in records))) as writer:
+        async def fetch_day(current_date: date) -> None:
+            nonlocal days_processed
+            try:
+                date_str = current_date.strftime("%Y-%m-%d")
+                sleep_data = await client.get_sleep_data(date_str)
+                if sleep_data is None:
+                    raise ValueError("Sleep data request failed")
+                
+                new_sleep = None
+                if sleep_data and isinstance(sleep_data, dict):
+                    if sleep_data.get('privacyProtected'):
+                        logger.warning(f"Sleep data for {current_date} is privacy protected")
+                        sleep_data = await client.get_user_summary(date_str)
+                        if sleep_data is None:
+                            raise ValueError("User summary request failed")
+                    
+                    if not sleep_data.get('privacyProtected'):
+                        new_sleep = process_sleep_data(sleep_data, current_date)
+                        if new_sleep is None:
+                            logger.debug(f"No valid sleep data for {current_date}")
+                if new_sleep is not None:
+                    await writer.put((current_date, new_sleep))
+                else:
+                    checkpoint.done(current_date)
+            except Exception as e:
+                logger.error(f"Error processing sleep data for {current_date}: {e}")
+
+            days_processed += 1
+            publish_progress('sleep', date=current_date.isoformat(), days_processed=days_processed,
+                             total_days=len(days), records_stored=writer.stored)
+
+        await run_pipelined(fetch_day, days)
+
+    await asyncio.to_thread(checkpoint.commit)
+    logger.info(f"Processed {writer.stored} sleep records, {writer.changed} changed")
+    return writer.changed
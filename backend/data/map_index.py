@@ -0,0 +1,142 @@
+"""
+Spatial index of activity tracks.
+
+This module maintains, for every activity with GPS positions, a bounding box
+with a simplified copy of the track (activity_map_index) and the grid cells
+the track passes through (map_cells). Cells are Web Mercator tiles at
+INDEX_ZOOM, so a map viewport becomes a range of cell indices and the cells
+of any lower zoom level are the index cells divided by a power of two. Both
+are written at sync time in the session that stores the track, so map
+queries never decode full tracks.
+
+Run `python -m backend.data.map_index` to index activities stored before the
+index existed.
+"""
+
+import logging
+from typing import Tuple
+import numpy as np
+from sqlalchemy import exists
+from backend.core.create_db import get_db
+from backend.core.tenancy import user_scope
+from backend.data.tracks import TRACK_SCALES, Track, has_track, load_track
+from backend.models.models import Activities, ActivityMapIndex, MapCells
+from backend.utils.geo_utils import mercator_tile, simplify_to_grid
+from backend.utils.track_codec import decode_track, encode_track
+
+logger = logging.getLogger(__name__)
+
+# Zoom level of the grid cells in map_cells (tiles of ~300 m at the equator)
+INDEX_ZOOM = 17
+# Zoom level the stored simplified tracks are drawn at without loss
+PATH_ZOOM = 16
+
+_PATH_SCALES = {'lat': TRACK_SCALES['position_lat'], 'lon': TRACK_SCALES['position_long']}
+
+def track_positions(track: Track) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the latitudes and longitudes of the track points with a position."""
+    lats, lons = track['position_lat'], track['position_long']
+    # Missing positions become 0 and are dropped with the zero placeholders
+    valid = (np.nan_to_num(lats) != 0) & (np.nan_to_num(lons) != 0)
+    return lats[valid], lons[valid]
+
+def build_map_index(activity_id: str, track: Track) -> list:
+    """
+    Build the spatial index rows of an activity track.
+
+    Args:
+        activity_id: Activity the track belongs to
+        track: Track columns as returned by load_track() or store_track()
+
+    Returns:
+        List with the ActivityMapIndex instance followed by its MapCells
+        instances, or an empty list if the track has no positions
+    """
+    lats, lons = track_positions(track)
+    if lats.size == 0:
+        return []
+
+    kept = simplify_to_grid(lats, lons, PATH_ZOOM)
+    entry = ActivityMapIndex(
+        activity_id=activity_id,
+        min_lat=float(lats.min()), max_lat=float(lats.max()),
+        min_lon=float(lons.min()), max_lon=float(lons.max()),
+        points=int(kept.size),
+        path=encode_track({'lat': lats[kept], 'lon': lons[kept]}, _PATH_SCALES),
+    )
+
+    x, y = mercator_tile(lats, lons, INDEX_ZOOM)
+    cells, counts = np.unique(np.stack((np.floor(x), np.floor(y)), axis=1).astype(np.int64),
+                              axis=0, return_counts=True)
+    return [entry] + [MapCells(activity_id=activity_id, cell_x=int(cell_x), cell_y=int(cell_y), points=int(count))
+                      for (cell_x, cell_y), count in zip(cells.tolist(), counts.tolist())]
+
+def store_map_index(db, activity_id: str, track: Track) -> int:
+    """
+    Replace the spatial index rows of an activity.
+
+    Call it in the session that stores the activity track; the caller commits.
+
+    Args:
+        db: Database session
+        activity_id: Activity the track belongs to
+        track: Track columns as returned by load_track() or store_track()
+
+    Returns:
+        Number of grid cells the track passes through
+    """
+    activity_id = str(activity_id)
+    db.query(MapCells).filter_by(activity_id=activity_id).delete()
+    db.query(ActivityMapIndex).filter_by(activity_id=activity_id).delete()
+    rows = build_map_index(activity_id, track)
+    db.add_all(rows)
+    return max(len(rows) - 1, 0)
+
+def decode_path(entry: ActivityMapIndex) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode the simplified track of an index entry.
+
+    Returns:
+        Tuple of (latitudes, longitudes)
+    """
+    _, columns = decode_track(entry.path)
+    return columns['lat'], columns['lon']
+
+def backfill_map_index() -> int:
+    """
+    Index stored activities that have a track but no index entry yet.
+
+    Activities whose track has no positions are loaded again on every run;
+    they are cheap to skip and may gain positions when re-synced.
+
+    Returns:
+        Number of activities indexed
+    """
+    db = next(get_db())
+    try:
+        pending = db.query(Activities.activity_id, Activities.user_id)\
+            .filter(has_track())\
+            .filter(~exists().where(ActivityMapIndex.activity_id == Activities.activity_id))\
+            .all()
+
+        indexed = 0
+        for activity_id, user_id in pending:
+            track = load_track(db, activity_id)
+            with user_scope(user_id):
+                if track is not None and store_map_index(db, activity_id, track):
+                    indexed += 1
+                db.commit()
+            db.expunge_all()
+
+        logger.info(f"Indexed the tracks of {indexed} activities")
+        return indexed
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    from backend.core.log_config import setup_logging
+    setup_logging()
+    backfill_map_index()
@@ -1,3 +1,3 @@
-from .activity_processor import process_activity, process_gps_data
-from .health_processor import process_health_data
-from .sleep_processor import process_sleep_data
\ No newline at end of file
+from .activity_processor import process_activity, process_gps_data, process_garmindb_activity, process_garmindb_records
+from .health_processor import process_health_data, process_garmindb_daily_summary
+from .sleep_processor import process_sleep_data, process_garmindb_sleep
\ No newline at end of file
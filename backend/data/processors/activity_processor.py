@@ -8,11 +8,15 @@ extracting relevant metrics for storage and analysis.
 
 import logging
 from typing import Dict, List
-from models.models import Activities, ActivityRecords
-from utils.time_utils import seconds_to_time
+from backend.models.models import Activities, ActivityRecords
+from backend.utils.time_utils import seconds_to_time, parse_timestamp
 
 logger = logging.getLogger(__name__)
 
+# Conversion factors for GarminDb files written with statute units
+KM_PER_MILE = 1.609344
+METERS_PER_FOOT = 0.3048
+
 def process_activity(activity: Dict) -> Activities:
     """
     Convert raw activity data to an Activities model instance.
@@ -24,9 +28,9 @@ def process_activity(activity: Dict) -> Activities:
         Activities model instance populated with activity data
     """
     return Activities(
-        activity_id=activity["activityId"],
+        activity_id=str(activity["activityId"]),
         locationName=activity.get("locationName", ""),
-        start_time=activity["startTimeLocal"],
+        start_time=parse_timestamp(activity["startTimeLocal"]),
         sport=activity["activityType"]["typeKey"],
         distance=round(activity["distance"] / 1000, 2),
         elapsed_time=seconds_to_time(activity["duration"]),
@@ -47,7 +51,7 @@ def process_gps_data(activity_id: str, gps_points: list) -> List[ActivityRecords
     
     Args:
         activity_id: Unique identifier for the parent activity
-        gps_points: List of GPS data points extracted from GPX data
+        gps_points: List of GPS data points extracted from GPX or FIT data
         
     Returns:
         List of ActivityRecords model instances for database storage
@@ -61,7 +65,81 @@ def process_gps_data(activity_id: str, gps_points: list) -> List[ActivityRecords
             position_long=point['lon'],
             altitude=point.get('ele'),
             heart_rate=point.get('hr'),
-            speed=point.get('speed')
+            speed=point.get('speed'),
+            distance=point.get('distance'),
+            cadence=point.get('cadence'),
+            power=point.get('power'),
+            temperature=point.get('temp')
         )
         for i, point in enumerate(gps_points)
-    ]
\ No newline at end of file
+    ]
+
+
+def process_garmindb_activity(activity, sport_activity=None, metric: bool = True) -> Activities:
+    """
+    Convert a GarminDb activities row to an Activities model instance.
+    
+    Args:
+        activity: garmindb Activities row read from garmin_activities.db
+        sport_activity: Matching steps_activities or cycle_activities row, if any,
+            providing steps and VO2 max
+        metric: False if the GarminDb files store statute units (miles, mph)
+        
+    Returns:
+        Activities model instance populated with activity data
+    """
+    distance_factor = 1.0 if metric else KM_PER_MILE
+    return Activities(
+        activity_id=str(activity.activity_id),
+        locationName=activity.name or "",
+        start_time=activity.start_time,
+        sport=activity.sport,
+        distance=round((activity.distance or 0) * distance_factor, 2),
+        elapsed_time=activity.elapsed_time,
+        avg_speed=round((activity.avg_speed or 0) * distance_factor, 2),
+        max_speed=round((activity.max_speed or 0) * distance_factor, 2),
+        calories=activity.calories,
+        avg_hr=activity.avg_hr,
+        max_hr=activity.max_hr,
+        steps=getattr(sport_activity, 'steps', None),
+        training_effect=round(activity.training_effect or 0, 2),
+        training_load=round(activity.training_load or 0, 2),
+        vO2MaxValue=round(getattr(sport_activity, 'vo2_max', None) or 0, 2)
+    )
+
+def _celsius(temperature, metric: bool):
+    """Convert a GarminDb temperature to Celsius."""
+    if temperature is None or metric:
+        return temperature
+    return (temperature - 32) * 5 / 9
+
+def process_garmindb_records(activity_id: str, records: list, metric: bool = True) -> List[ActivityRecords]:
+    """
+    Convert GarminDb activity_records rows to ActivityRecords model instances.
+    
+    Args:
+        activity_id: Unique identifier for the parent activity
+        records: garmindb ActivityRecords rows ordered by record number
+        metric: False if the GarminDb files store statute units (feet, miles, mph, F)
+        
+    Returns:
+        List of ActivityRecords model instances for database storage
+    """
+    speed_factor = distance_factor = 1.0 if metric else KM_PER_MILE
+    altitude_factor = 1.0 if metric else METERS_PER_FOOT
+    return [
+        ActivityRecords(
+            activity_id=activity_id,
+            record=i,
+            timestamp=record.timestamp,
+            position_lat=record.position_lat,
+            position_long=record.position_long,
+            altitude=record.altitude * altitude_factor if record.altitude is not None else None,
+            heart_rate=record.hr,
+            speed=record.speed * speed_factor if record.speed is not None else None,
+            distance=record.distance * distance_factor if record.distance is not None else None,
+            cadence=record.cadence,
+            temperature=_celsius(record.temperature, metric)
+        )
+        for i, record in enumerate(records)
+    ]
@@ -9,7 +9,8 @@ extracting relevant metrics for storage and analysis.
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime
-from models.models import HealthSummary
+from backend.models.models import HealthSummary
+from backend.utils.time_utils import time_to_seconds
 
 logger = logging.getLogger(__name__)
 
@@ -40,4 +41,35 @@ def process_health_data(data: Dict, date: datetime, hr_values: List[float]) -> O
         active_calories=data.get('activeCalories'),
         body_battery_charged=data.get('bodyBatteryChargedValue', 0),
         body_battery_drained=data.get('bodyBatteryDrainedValue', 0)
-    )
\ No newline at end of file
+    )
+
+
+def process_garmindb_daily_summary(summary) -> Optional[HealthSummary]:
+    """
+    Convert a GarminDb daily_summary row to a HealthSummary model instance.
+    
+    Intensity minutes are weighted the same way as the Garmin Connect fetcher:
+    vigorous minutes count double.
+    
+    Args:
+        summary: garmindb DailySummary row read from garmin.db
+        
+    Returns:
+        HealthSummary model instance or None if the day holds no data
+    """
+    moderate_minutes = time_to_seconds(summary.moderate_activity_time) // 60 if summary.moderate_activity_time else 0
+    vigorous_minutes = time_to_seconds(summary.vigorous_activity_time) // 60 if summary.vigorous_activity_time else 0
+
+    data = {
+        'restingHeartRate': summary.rhr,
+        'maxHeartRate': summary.hr_max,
+        'averageHeartRate': None,
+        'averageStressLevel': summary.stress_avg,
+        'maxStressLevel': None,
+        'totalSteps': summary.steps,
+        'intensityMinutes': moderate_minutes + vigorous_minutes * 2,
+        'activeCalories': summary.calories_active,
+        'bodyBatteryChargedValue': summary.bb_charged,
+        'bodyBatteryDrainedValue': None
+    }
+    return process_health_data(data, datetime.combine(summary.day, datetime.min.time()), hr_values=[])
@@ -9,9 +9,9 @@ extracting relevant metrics for storage and analysis.
 import logging
 from typing import Dict, Optional
 from datetime import datetime, time
-from models.models import SleepMetrics
-from utils.time_utils import seconds_to_time
-from utils.data_utils import safe_int, safe_float, parse_timestamp
+from backend.models.models import SleepMetrics
+from backend.utils.time_utils import seconds_to_time
+from backend.utils.data_utils import safe_int, safe_float, parse_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -54,4 +54,31 @@ def process_sleep_data(sleep_data: Dict, date: datetime) -> Optional[SleepMetric
         awake_time=seconds_to_time(awake),
         avg_respiration=daily_sleep.get('averageRespirationValue'),
         stress_during_sleep=daily_sleep.get('avgSleepStress')
-    )
\ No newline at end of file
+    )
+
+
+def process_garmindb_sleep(sleep) -> Optional[SleepMetrics]:
+    """
+    Convert a GarminDb sleep row to a SleepMetrics model instance.
+    
+    Args:
+        sleep: garmindb Sleep row read from garmin.db
+        
+    Returns:
+        SleepMetrics model instance or None if insufficient data
+    """
+    if not (sleep.deep_sleep or sleep.light_sleep):
+        return None
+
+    return SleepMetrics(
+        date=sleep.day,
+        start_time=sleep.start,
+        end_time=sleep.end,
+        total_sleep=sleep.total_sleep,
+        deep_sleep=sleep.deep_sleep,
+        light_sleep=sleep.light_sleep,
+        rem_sleep=sleep.rem_sleep,
+        awake_time=sleep.awake,
+        avg_respiration=sleep.avg_rr,
+        stress_during_sleep=sleep.avg_stress
+    )
@@ -0,0 +1,92 @@
+"""
+Multi-user sync scheduler.
+
+This module syncs every user of the deployment: the default user plus each
+user with syncing enabled and a Garmin token store. Users are synced in
+parallel by a bounded worker pool, least recently synced first, so a team
+larger than the pool is served round-robin across runs. Every user's calls
+go through their own GarminClient and its rate limit, so a user with a long
+history cannot starve the others of Garmin Connect capacity.
+
+Run `python -m backend.data.scheduler` to sync all users once, e.g. from cron.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from sqlalchemy import func
+from backend.core.config import Config
+from backend.core.create_db import get_db
+from backend.core.garmin_client import token_store
+from backend.core.tenancy import user_scope
+from backend.data.sync import sync_all_data
+from backend.models.models import SyncGeneration, User
+
+logger = logging.getLogger(__name__)
+
+def users_to_sync() -> List[int]:
+    """
+    List the users to sync, least recently synced first.
+
+    With DATA_SOURCE=garmindb only the default user is synced, since the
+    local mirror holds a single account.
+
+    Returns:
+        User ids; users never synced come first
+    """
+    if Config.DATA_SOURCE == 'garmindb':
+        return [Config.DEFAULT_USER_ID]
+
+    db = next(get_db())
+    try:
+        user_ids = {Config.DEFAULT_USER_ID}
+        for (user_id,) in db.query(User.id).filter_by(sync_enabled=True):
+            if os.path.isdir(token_store(user_id)):
+                user_ids.add(user_id)
+        last_synced = dict(db.query(SyncGeneration.user_id, func.max(SyncGeneration.started_at))
+                           .group_by(SyncGeneration.user_id)
+                           .all())
+    finally:
+        db.close()
+    return sorted(user_ids, key=lambda user_id: (last_synced.get(user_id) is not None,
+                                                 last_synced.get(user_id), user_id))
+
+def sync_user(user_id: int, force: bool = False) -> bool:
+    """
+    Sync one user's data.
+
+    Args:
+        user_id: User to sync
+        force: Passed to sync_all_data()
+
+    Returns:
+        True if the sync succeeded
+    """
+    with user_scope(user_id):
+        return sync_all_data(force)
+
+def sync_all_users(force: bool = False) -> Dict[int, bool]:
+    """
+    Sync every user, SYNC_MAX_CONCURRENT_USERS at a time.
+
+    Args:
+        force: Passed to sync_all_data()
+
+    Returns:
+        Dictionary mapping user id to whether their sync succeeded
+    """
+    user_ids = users_to_sync()
+    workers = max(1, min(Config.SYNC_MAX_CONCURRENT_USERS, len(user_ids)))
+    logger.info(f"Syncing {len(user_ids)} users with {workers} workers")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sync') as executor:
+        results = dict(zip(user_ids, executor.map(lambda user_id: sync_user(user_id, force), user_ids)))
+    failed = [user_id for user_id, success in results.items() if not success]
+    if failed:
+        logger.warning(f"Sync failed for users {failed}")
+    return results
+
+if __name__ == '__main__':
+    from backend.core.log_config import setup_logging
+    setup_logging()
+    sync_all_users()
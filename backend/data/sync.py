@@ -3,25 +3,119 @@ Comprehensive data synchronization module.
 Handles fetching and storing data from Garmin Connect to the database.
 """
 
+import asyncio
 import logging
+from datetime import date
+from typing import Dict, Iterable, Optional
 from backend.data.fetchers import activity_fetcher
 from backend.data.fetchers import health_fetcher 
 from backend.data.fetchers import sleep_fetcher
-from backend.core.garmin_client import garmin_client
+from backend.core.config import Config
+from backend.core.async_garmin_client import AsyncGarminClient
+from backend.core.garmin_client import GarminClient
+from backend.core.compression import snapshot_cache
+from backend.core.create_db import replica_router
+from backend.core.events import event_bus
+from backend.core.metrics import track_sync_phase
+from backend.data.change_log import read_changed_entities, read_latest_generation, sync_generation
+from backend.data.achievements import ensure_achievements
 
 logger = logging.getLogger(__name__)
 
-def sync_all_data(force: bool = False) -> bool:
+# Synced entities, in the order they are fetched
+SYNC_ENTITIES = ('activities', 'health', 'sleep')
+
+FETCHERS = {
+    'activities': activity_fetcher.fetch_and_store_activities,
+    'health': health_fetcher.fetch_and_store_health_data,
+    'sleep': sleep_fetcher.fetch_and_store_sleep_data,
+}
+ASYNC_FETCHERS = {
+    'activities': activity_fetcher.fetch_and_store_activities_async,
+    'health': health_fetcher.fetch_and_store_health_data_async,
+    'sleep': sleep_fetcher.fetch_and_store_sleep_data_async,
+}
+
+async def fetch_all_async(client: AsyncGarminClient, entities: Iterable[str] = SYNC_ENTITIES,
+                          start_date: Optional[date] = None, end_date: Optional[date] = None,
+                          force: bool = False) -> Dict[str, int]:
     """
-    Synchronizes all types of data from Garmin Connect to the database.
+    Run the concurrent fetchers one after another.
+    
+    Args:
+        client: AsyncGarminClient of the current user
+        entities: Entities to fetch
+        start_date: First date to sync (default: each fetcher's own)
+        end_date: Last date to sync (default: today)
+        force: Refetch dates already synced
     
-    This is the main entry point for data synchronization. It orchestrates
+    Returns:
+        Dictionary mapping each entity to its number of changed rows
+    """
+    changes = {}
+    async with client:
+        for entity in entities:
+            with track_sync_phase(entity):
+                changes[entity] = await ASYNC_FETCHERS[entity](client, start_date, end_date, force)
+    return changes
+
+def announce_changes(generation: int) -> None:
+    """
+    Publish a 'changed' event for the changes a finished sync made visible on /api/changes.
+
+    /api/changes serves only the generations below every sync still running,
+    so a sync that finishes while an older one runs announces nothing; the
+    older sync announces both once it finishes. The event carries the served
+    generation, which clients can pass to /api/changes without skipping rows.
+
+    Args:
+        generation: Generation of the finished sync
+    """
+    served = read_latest_generation()
+    if served < generation:
+        logger.info(f"Changes of generation {generation} wait for an older sync to finish")
+        return
+    # Older generations were announced by their own syncs
+    changed = read_changed_entities(generation - 1, served)
+    if changed:
+        event_bus.publish('changed', {'entities': changed, 'generation': served})
+
+def sync_all_data(force: bool = False, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                  entities: Optional[Iterable[str]] = None) -> bool:
+    """
+    Synchronizes all types of data of the current user from the configured source to the database.
+    
+    This is the main entry point for data synchronization; run it inside
+    user_scope() to sync another user than DEFAULT_USER_ID, or use
+    backend.data.scheduler to sync every user. It orchestrates
     fetching activities, health summaries, and sleep data using the respective
-    fetcher modules.
+    fetcher modules. With DATA_SOURCE=garmindb the same data is imported from
+    the local GarminDb SQLite files instead of Garmin Connect. With
+    GARMIN_CONCURRENCY above 1 the concurrent fetchers are used, which keep
+    that many requests in flight and batch their database writes.
+    
+    The fetchers checkpoint the dates they complete (see
+    backend.data.checkpoints) and skip them on the next run, so a sync
+    that dies halfway resumes where it stopped. Health days are synced from
+    the earliest date with data and sleep from 180 days back unless a start
+    date is given; activities are synced by date range only when one is
+    given, otherwise the 100 most recent are checked. The GarminDb import
+    takes the same range and entities but keeps no checkpoints: without a
+    start date it reads activities not yet stored and the days from the
+    latest one stored.
+    
+    Every run opens a new sync generation that tags the change log rows the
+    fetchers write. Progress is published on the event bus as it happens,
+    followed by a 'changed' event naming the entities that received new or
+    updated rows and the generation to pass to /api/changes, see
+    announce_changes().
     
     Args:
         force (bool): If True, forces redownload of all data regardless of
                       what's already in the database. Defaults to False.
+        start_date: First date to sync (optional)
+        end_date: Last date to sync (optional, default today)
+        entities: Entities from SYNC_ENTITIES to sync (default: all)
     
     Returns:
         bool: True if synchronization was successful, False otherwise.
@@ -31,18 +125,58 @@ def sync_all_data(force: bool = False) -> bool:
         >>> success = sync_all_data()
         >>> print(f"Sync successful: {success}")
     """
-    logger.info("Starting comprehensive data sync from Garmin Connect...")
-    
+    entities = [entity for entity in SYNC_ENTITIES if entities is None or entity in entities]
+    event_bus.publish('sync', {'state': 'started', 'source': Config.DATA_SOURCE, 'entities': entities})
+    generation = None
     try:
-        # Use the singleton garmin_client instance to fetch data
-        # Each fetcher handles its own database operations
-        activity_fetcher.fetch_and_store_activities(garmin_client)
-        health_fetcher.fetch_and_store_health_data(garmin_client)
-        sleep_fetcher.fetch_and_store_sleep_data(garmin_client)
+        # Achievements are updated as activities are stored; build them once
+        # for activities stored before the table existed
+        ensure_achievements()
+        
+        with sync_generation() as generation:
+            if Config.DATA_SOURCE == 'garmindb':
+                logger.info("Starting data import from the GarminDb mirror...")
+                # Imported here so the garmindb/fitfile stack only loads when used
+                from backend.data.fetchers import garmindb_importer
+                with track_sync_phase('garmindb_import'):
+                    changes = garmindb_importer.import_all(start_date, end_date, entities, force)
+            elif Config.GARMIN_CONCURRENCY > 1:
+                logger.info("Starting concurrent data sync from Garmin Connect...")
+                # Log in before starting the event loop
+                changes = asyncio.run(fetch_all_async(AsyncGarminClient(), entities, start_date, end_date, force))
+            else:
+                logger.info("Starting comprehensive data sync from Garmin Connect...")
+                # Use the current user's pooled GarminClient to fetch data
+                # Each fetcher handles its own database operations
+                garmin_client = GarminClient()
+                changes = {}
+                for entity in entities:
+                    with track_sync_phase(entity):
+                        changes[entity] = FETCHERS[entity](garmin_client, start_date, end_date, force)
+        
+        # Keep reads on the primary until the replica has caught up, then
+        # rebuild the precompressed hot payloads so the next reads are cheap
+        replica_router.mark_write()
+        with track_sync_phase('snapshots'):
+            snapshot_cache.refresh(read_latest_generation())
+        
+        # Announced after the snapshots are rebuilt, so clients refetching the
+        # changed entities get fresh data
+        announce_changes(generation)
+        event_bus.publish('sync', {'state': 'finished', 'success': True})
         
-        logger.info("All data synced successfully!")
+        logger.info(f"All data synced successfully! Changed rows: {changes}")
         return True
         
     except Exception as e:
         logger.error(f"Error during data sync: {e}")
+        # Fetchers commit as they go, so a failed sync may still have written,
+        # and finishing its generation may release newer syncs' changes
+        replica_router.mark_write()
+        if generation is not None:
+            try:
+                announce_changes(generation)
+            except Exception as announce_error:
+                logger.error(f"Error announcing changes: {announce_error}")
+        event_bus.publish('sync', {'state': 'finished', 'success': False, 'error': str(e)})
         return False
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""
+Activity track storage.
+
+This module stores and loads activity tracks. With TRACK_STORAGE=columnar
+(the default) a track is written as a single activity_tracks row holding all
+points as delta-encoded, compressed columns (see backend.utils.track_codec),
+instead of one activity_records row per point. Readers use load_track(),
+which returns the columns as NumPy arrays from either format, so activities
+stored before the switch keep working until they are migrated.
+
+Columnar tracks also hold the per-point metrics derived at ingest (step and
+cumulative distance, grade, pace and the moving mask, see
+backend.utils.track_metrics). load_track() derives them on the fly for
+tracks stored as rows or before the metrics existed.
+
+Run `python -m backend.data.tracks` to convert existing activity_records rows
+to the columnar format, and `python -m backend.data.tracks --derive` to add
+the derived metrics to columnar tracks stored without them.
+"""
+
+import argparse
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy import exists
+from backend.core.config import Config
+from backend.core.create_db import get_db
+from backend.models.models import Activities, ActivityRecords, ActivityTracks
+from backend.utils.track_codec import decode_track, encode_track
+from backend.utils.track_metrics import DERIVED_SCALES, derive_metrics
+
+logger = logging.getLogger(__name__)
+
+# Track columns, named after the ActivityRecords attributes, with the factor
+# applied before rounding: timestamps (epoch seconds) keep milliseconds,
+# positions ~1 cm, altitude 1 cm, speed 1 m/h, distance 1 cm, temperature 0.1 C
+TRACK_SCALES = {
+    'timestamp': 1000,
+    'position_lat': 1e7,
+    'position_long': 1e7,
+    'altitude': 100,
+    'heart_rate': 1,
+    'speed': 1000,
+    'distance': 1e5,
+    'cadence': 1,
+    'power': 1,
+    'temperature': 10,
+}
+
+# Scales of every column a columnar track blob may hold
+STORED_SCALES = {**TRACK_SCALES, **DERIVED_SCALES}
+
+Track = Dict[str, np.ndarray]
+
+def records_to_track(records: List[ActivityRecords]) -> Track:
+    """
+    Convert ActivityRecords, ordered by record number, to track columns.
+
+    Args:
+        records: ActivityRecords instances, stored or not
+
+    Returns:
+        Column name mapped to a float array, NaN for missing values;
+        timestamps are seconds since the epoch
+    """
+    timestamps = np.array([record.timestamp for record in records], dtype='datetime64[ms]')
+    seconds = np.where(np.isnat(timestamps), np.nan, timestamps.astype(np.int64) / 1000)
+    track = {'timestamp': seconds}
+    for name in TRACK_SCALES:
+        if name != 'timestamp':
+            track[name] = np.array([getattr(record, name) for record in records], dtype=float)
+    return track
+
+def track_timestamps(track: Track) -> List[Optional[datetime]]:
+    """
+    Convert the timestamp column of a track back to datetimes.
+
+    Args:
+        track: Track columns
+
+    Returns:
+        List of naive datetimes, None where the point has no timestamp
+    """
+    seconds = track['timestamp']
+    milliseconds = np.round(np.nan_to_num(seconds) * 1000).astype(np.int64).astype('datetime64[ms]')
+    return [None if np.isnan(value) else moment
+            for value, moment in zip(seconds.tolist(), milliseconds.tolist())]
+
+def with_derived(track: Track) -> Track:
+    """Add the DERIVED_SCALES columns to raw track columns and return the track."""
+    track.update(derive_metrics(track))
+    return track
+
+def encode_columns(track: Track) -> bytes:
+    """Encode track columns, derived ones included, omitting empty columns."""
+    columns = {name: values for name, values in track.items() if not np.isnan(values).all()}
+    return encode_track(columns, {name: STORED_SCALES[name] for name in columns})
+
+def encode_records(records: List[ActivityRecords]) -> bytes:
+    """Encode ActivityRecords and their derived metrics as a columnar track blob."""
+    return encode_columns(with_derived(records_to_track(records)))
+
+def build_track_rows(activity_id: str, records: List[ActivityRecords], track: Optional[Track] = None) -> list:
+    """
+    Build the model instances storing a track in the configured format.
+
+    Args:
+        activity_id: Activity the records belong to
+        records: ActivityRecords ordered by record number
+        track: The records' columns with the derived metrics, if already built
+
+    Returns:
+        List with one ActivityTracks instance, or the records themselves when
+        TRACK_STORAGE is 'rows'
+    """
+    if Config.TRACK_STORAGE == 'rows':
+        return list(records)
+    if track is None:
+        track = with_derived(records_to_track(records))
+    return [ActivityTracks(activity_id=str(activity_id), points=len(records), data=encode_columns(track))]
+
+def store_track(db, activity_id: str, records: List[ActivityRecords]) -> Track:
+    """
+    Replace the stored track of an activity.
+
+    Call it in the session that stores the activity; the caller commits.
+
+    Args:
+        db: Database session
+        activity_id: Activity the records belong to
+        records: ActivityRecords ordered by record number
+
+    Returns:
+        The stored track columns, with the derived metrics
+    """
+    activity_id = str(activity_id)
+    track = with_derived(records_to_track(records))
+    db.query(ActivityRecords).filter_by(activity_id=activity_id).delete()
+    db.query(ActivityTracks).filter_by(activity_id=activity_id).delete()
+    db.add_all(build_track_rows(activity_id, records, track))
+    return track
+
+def load_track(db, activity_id: str) -> Optional[Track]:
+    """
+    Load the track of an activity from whichever format stores it.
+
+    Args:
+        db: Database session
+        activity_id: Activity to load
+
+    Returns:
+        Column name mapped to a float array for every column in TRACK_SCALES
+        and DERIVED_SCALES, NaN for missing values, or None if the activity
+        has no track
+    """
+    data = db.query(ActivityTracks.data).filter_by(activity_id=str(activity_id)).scalar()
+    if data is not None:
+        return decode_columns(data)
+
+    records = db.query(ActivityRecords)\
+        .filter_by(activity_id=str(activity_id))\
+        .order_by(ActivityRecords.record)\
+        .all()
+    return with_derived(records_to_track(records)) if records else None
+
+def decode_columns(data: bytes) -> Track:
+    """Decode a columnar track blob, deriving the metrics if it lacks them."""
+    count, columns = decode_track(data)
+    track = {name: columns[name] if name in columns else np.full(count, np.nan)
+             for name in TRACK_SCALES}
+    if 'step_distance' not in columns:
+        return with_derived(track)
+    for name in DERIVED_SCALES:
+        track[name] = columns[name] if name in columns else np.full(count, np.nan)
+    return track
+
+def has_track():
+    """Return a SQL condition that is true for activities with a stored track."""
+    return exists().where(ActivityTracks.activity_id == Activities.activity_id) | \
+        exists().where(ActivityRecords.activity_id == Activities.activity_id)
+
+def migrate_tracks(keep_rows: bool = False) -> int:
+    """
+    Convert activities stored as activity_records rows to columnar tracks.
+
+    Each activity is converted and committed on its own, so the migration
+    can be interrupted and resumed.
+
+    Args:
+        keep_rows: Keep the activity_records rows after conversion
+
+    Returns:
+        Number of activities converted
+    """
+    db = next(get_db())
+    try:
+        pending = [activity_id for (activity_id,) in db.query(ActivityRecords.activity_id)
+                   .filter(~exists().where(ActivityTracks.activity_id == ActivityRecords.activity_id))
+                   .distinct()]
+
+        for activity_id in pending:
+            records = db.query(ActivityRecords)\
+                .filter_by(activity_id=activity_id)\
+                .order_by(ActivityRecords.record)\
+                .all()
+            db.add(ActivityTracks(activity_id=activity_id, points=len(records), data=encode_records(records)))
+            if not keep_rows:
+                db.query(ActivityRecords).filter_by(activity_id=activity_id).delete()
+            db.commit()
+            db.expunge_all()
+
+        logger.info(f"Converted the tracks of {len(pending)} activities to columnar storage")
+        return len(pending)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def derive_stored_tracks() -> int:
+    """
+    Add the derived metrics to columnar tracks stored without them.
+
+    Each track is rewritten and committed on its own, so the backfill can be
+    interrupted and resumed.
+
+    Returns:
+        Number of tracks rewritten
+    """
+    db = next(get_db())
+    try:
+        activity_ids = [activity_id for (activity_id,) in db.query(ActivityTracks.activity_id)]
+        rewritten = 0
+        for activity_id in activity_ids:
+            stored = db.query(ActivityTracks).filter_by(activity_id=activity_id).one()
+            if 'step_distance' in decode_track(stored.data)[1]:
+                continue
+            stored.data = encode_columns(decode_columns(stored.data))
+            db.commit()
+            db.expunge_all()
+            rewritten += 1
+
+        logger.info(f"Added derived metrics to {rewritten} activity tracks")
+        return rewritten
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    from backend.core.log_config import setup_logging
+    parser = argparse.ArgumentParser(description="Convert activity_records rows to columnar activity tracks.")
+    parser.add_argument('--keep-rows', action='store_true', help='Keep the activity_records rows after conversion')
+    parser.add_argument('--derive', action='store_true',
+                        help='Instead add the derived metrics to columnar tracks stored without them')
+    args = parser.parse_args()
+    setup_logging()
+    if args.derive:
+        derive_stored_tracks()
+    else:
+        migrate_tracks(keep_rows=args.keep_rows)
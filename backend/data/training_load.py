@@ -0,0 +1,126 @@
+"""
+Training load model.
+
+This module maintains a daily fitness / fatigue / form series per user from
+the training load of their stored activities. Acute (ATL) and chronic (CTL) training
+load are exponentially weighted moving averages of the daily load with time
+constants of Config.ATL_DAYS and Config.CTL_DAYS, and form (TSB) is the
+previous day's CTL minus ATL. Every day only depends on the day before, so
+when activities arrive only the days from the earliest new activity onwards
+are recomputed, seeded from the stored day before it; a sync costs O(new
+days) however long the history is.
+
+Run `python -m backend.data.training_load` to rebuild the whole series, e.g.
+after changing the time constants.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Optional
+import numpy as np
+from sqlalchemy import func
+from backend.core.config import Config
+from backend.core.create_db import get_db
+from backend.core.tenancy import owned_by, user_scope
+from backend.models.models import Activities, TrainingLoad
+
+logger = logging.getLogger(__name__)
+
+def _daily_loads(db, start: date, days: int) -> np.ndarray:
+    """Sum the training load of the current user's activities on each day from start."""
+    loads = np.zeros(days)
+    rows = db.query(Activities.start_time, Activities.training_load)\
+        .filter(owned_by(Activities))\
+        .filter(Activities.start_time >= datetime.combine(start, datetime.min.time()))\
+        .filter(Activities.training_load.isnot(None))\
+        .all()
+    if rows:
+        offsets = np.array([(start_time.date() - start).days for start_time, _ in rows])
+        values = np.array([load for _, load in rows], dtype=float)
+        in_range = offsets < days
+        np.add.at(loads, offsets[in_range], values[in_range])
+    return loads
+
+def update_training_load(db, since: Optional[date] = None, today: Optional[date] = None) -> int:
+    """
+    Extend the current user's series to today, recomputing it from a changed day.
+
+    Call it in the session that stores new activities, before committing.
+    Without `since` only the days after the last stored day are added, which
+    keeps the decay of fatigue and fitness current on days without activities.
+
+    Args:
+        db: Database session; the caller commits
+        since: Earliest day whose load changed, e.g. the day of the oldest
+            newly stored activity (optional)
+        today: Last day of the series; defaults to the current date
+
+    Returns:
+        Number of days written
+    """
+    first_activity, last_activity = db.query(func.min(Activities.start_time), func.max(Activities.start_time))\
+        .filter(owned_by(Activities))\
+        .one()
+    if first_activity is None:
+        return 0
+    last_stored = db.query(func.max(TrainingLoad.date)).filter(owned_by(TrainingLoad)).scalar()
+
+    start = last_stored + timedelta(days=1) if last_stored else first_activity.date()
+    if since is not None and since < start:
+        start = since
+    start = max(start, first_activity.date())
+    end = max(today or date.today(), last_activity.date())
+    if start > end:
+        return 0
+
+    # The series is contiguous, so the day before start seeds the recursion
+    previous = db.query(TrainingLoad)\
+        .filter(owned_by(TrainingLoad), TrainingLoad.date == start - timedelta(days=1))\
+        .one_or_none()
+    atl = previous.atl if previous else 0.0
+    ctl = previous.ctl if previous else 0.0
+
+    days = (end - start).days + 1
+    loads = _daily_loads(db, start, days)
+    acute = 1.0 / Config.ATL_DAYS
+    chronic = 1.0 / Config.CTL_DAYS
+
+    db.query(TrainingLoad).filter(owned_by(TrainingLoad), TrainingLoad.date >= start).delete()
+    rows = []
+    for offset, load in enumerate(loads.tolist()):
+        tsb = ctl - atl
+        atl += (load - atl) * acute
+        ctl += (load - ctl) * chronic
+        rows.append(TrainingLoad(date=start + timedelta(days=offset), load=load, atl=atl, ctl=ctl, tsb=tsb))
+    db.add_all(rows)
+    return len(rows)
+
+def rebuild_training_load() -> int:
+    """
+    Recompute every user's training load series from the stored activities.
+
+    Returns:
+        Number of days written
+    """
+    db = next(get_db())
+    try:
+        db.query(TrainingLoad).delete()
+        count = 0
+        for (user_id,) in db.query(Activities.user_id).distinct().all():
+            with user_scope(user_id):
+                count += update_training_load(db)
+                # New rows take their user when flushed
+                db.flush()
+        db.commit()
+        logger.info(f"Rebuilt training load for {count} days")
+        return count
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    from backend.core.log_config import setup_logging
+    setup_logging()
+    rebuild_training_load()
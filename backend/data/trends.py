@@ -0,0 +1,164 @@
+"""
+Rolling health and sleep trends.
+
+This module computes 7- and 28-day rolling means with min/max bands and
+week-over-week deltas of the daily health and sleep metrics. The rows of the
+requested range (plus the lookback the windows need) are loaded once as
+column arrays on a dense calendar-day grid and every window is computed with
+cumulative sums and strided views, so days without data do not shift the
+windows the way a ROWS frame over the stored rows would.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlalchemy import func
+from backend.core.cache import GenerationCache
+from backend.core.tenancy import owned_by
+from backend.models.models import HealthSummary, SleepMetrics
+from backend.utils.time_utils import time_to_seconds
+
+# Rolling window lengths in days
+WINDOWS = (7, 28)
+# Days between the 7-day means compared by the week-over-week delta
+WEEK = 7
+# Days returned when the request gives no start date
+DEFAULT_RANGE_DAYS = 90
+
+# Trend payloads keyed by entity and date range, valid for one sync generation
+trend_cache = GenerationCache()
+
+def _minutes(value) -> Optional[float]:
+    """Convert a Time duration column value to minutes."""
+    return time_to_seconds(value) / 60 if value is not None else None
+
+# Trend metrics per entity: model, date column, and metric name mapped to its
+# column and a converter from the stored value
+TREND_METRICS = {
+    'health': (HealthSummary, HealthSummary.date, {
+        'resting_heart_rate': (HealthSummary.resting_heart_rate, float),
+        'avg_stress': (HealthSummary.avg_stress, float),
+        'steps': (HealthSummary.steps, float),
+        'intensity_minutes': (HealthSummary.intensity_minutes, float),
+    }),
+    'sleep': (SleepMetrics, SleepMetrics.date, {
+        'total_sleep': (SleepMetrics.total_sleep, _minutes),
+        'deep_sleep': (SleepMetrics.deep_sleep, _minutes),
+        'light_sleep': (SleepMetrics.light_sleep, _minutes),
+        'rem_sleep': (SleepMetrics.rem_sleep, _minutes),
+        'awake_time': (SleepMetrics.awake_time, _minutes),
+        'avg_respiration': (SleepMetrics.avg_respiration, float),
+    }),
+}
+
+def rolling_stats(values: np.ndarray, window: int) -> Dict[str, np.ndarray]:
+    """
+    Compute trailing rolling statistics over a daily series.
+
+    A window needs data on at least half of its days; otherwise its
+    statistics are NaN.
+
+    Args:
+        values: Daily values, NaN for days without data
+        window: Window length in days, ending on (and including) each day
+
+    Returns:
+        Dictionary with 'mean', 'min' and 'max' arrays of the same length
+    """
+    present = ~np.isnan(values)
+    padded = np.concatenate((np.full(window - 1, np.nan), values))
+    padded_present = np.concatenate((np.zeros(window - 1, dtype=bool), present))
+
+    sums = np.cumsum(np.concatenate(([0.0], np.where(padded_present, padded, 0.0))))
+    counts = np.cumsum(np.concatenate(([0], padded_present.astype(int))))
+    window_sums = sums[window:] - sums[:-window]
+    window_counts = counts[window:] - counts[:-window]
+
+    views_low = sliding_window_view(np.where(padded_present, padded, np.inf), window)
+    views_high = sliding_window_view(np.where(padded_present, padded, -np.inf), window)
+
+    covered = window_counts >= (window + 1) // 2
+    return {
+        'mean': np.where(covered, window_sums / np.maximum(window_counts, 1), np.nan),
+        'min': np.where(covered, views_low.min(axis=1), np.nan),
+        'max': np.where(covered, views_high.max(axis=1), np.nan),
+    }
+
+def _to_list(values: np.ndarray, digits: int = 1) -> List[Optional[float]]:
+    """Round an array for JSON, turning NaN into None."""
+    return [None if np.isnan(value) else round(value, digits) for value in values.tolist()]
+
+def default_end(db, entity: str) -> Optional[date]:
+    """Return the current user's latest stored date of an entity, or None if it has no rows."""
+    model, date_column, _ = TREND_METRICS[entity]
+    return db.query(func.max(date_column)).filter(owned_by(model)).scalar()
+
+def build_trends(db, entity: str, start: Optional[date] = None, end: Optional[date] = None) -> dict:
+    """
+    Compute the rolling trends of the current user's metrics over a date range.
+
+    Args:
+        db: Database session
+        entity: 'health' or 'sleep'
+        start: First date returned; defaults to DEFAULT_RANGE_DAYS before end
+        end: Last date returned; defaults to the latest stored date
+
+    Returns:
+        Dictionary with the windows, the list of dates and, per metric, the
+        daily values, 'mean_<n>', 'min_<n>' and 'max_<n>' for each window and
+        'wow_delta' (7-day mean minus the 7-day mean a week earlier), each
+        aligned with the dates
+    """
+    model, date_column, metrics = TREND_METRICS[entity]
+    end = end or default_end(db, entity) or date.today()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        return {'windows': list(WINDOWS), 'dates': [], 'metrics': {name: {} for name in metrics}}
+
+    lookback = max(max(WINDOWS), WEEK * 2) - 1
+    first = start - timedelta(days=lookback)
+    days = (end - first).days + 1
+
+    columns = [column for column, _ in metrics.values()]
+    rows = db.query(date_column, *columns)\
+        .filter(owned_by(model))\
+        .filter(date_column >= first)\
+        .filter(date_column <= end)\
+        .all()
+
+    # Average duplicate rows of a day onto the dense day grid
+    sums = np.zeros((len(metrics), days))
+    counts = np.zeros((len(metrics), days))
+    for row in rows:
+        day = row[0].date() if isinstance(row[0], datetime) else row[0]
+        offset = (day - first).days
+        for index, ((_, convert), value) in enumerate(zip(metrics.values(), row[1:])):
+            value = convert(value) if value is not None else None
+            # Zero durations and counts are the defaults of days without data
+            if value:
+                sums[index, offset] += value
+                counts[index, offset] += 1
+    series = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    shown = slice(lookback, days)
+    result = {
+        'windows': list(WINDOWS),
+        'dates': [(start + timedelta(days=offset)).isoformat() for offset in range(days - lookback)],
+        'metrics': {},
+    }
+    for index, name in enumerate(metrics):
+        values = series[index]
+        trend = {'value': _to_list(values[shown])}
+        for window in WINDOWS:
+            stats = rolling_stats(values, window)
+            trend[f'mean_{window}'] = _to_list(stats['mean'][shown])
+            trend[f'min_{window}'] = _to_list(stats['min'][shown])
+            trend[f'max_{window}'] = _to_list(stats['max'][shown])
+            if window == WEEK:
+                weekly = stats['mean']
+                delta = np.full(days, np.nan)
+                delta[WEEK:] = weekly[WEEK:] - weekly[:-WEEK]
+                trend['wow_delta'] = _to_list(delta[shown])
+        result['metrics'][name] = trend
+    return result
@@ -1,8 +1,16 @@
 from .models import (
     Activities,
     ActivityRecords,
+    ActivityTracks,
+    ActivityMapIndex,
+    MapCells,
     SleepMetrics,
     HealthSummary,
+    Achievements,
+    BestEfforts,
+    TrainingLoad,
+    SyncGeneration,
+    ChangeLog,
     get_db,
     init_db
 )
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""
+Lightweight schema migrations.
+
+Base.metadata.create_all() creates missing tables but never alters existing
+ones, so columns and indexes added to a model later would be missing from
+databases created by an older version. This module compares every mapped
+table with the live schema, adds the missing columns with ALTER TABLE and
+creates the missing indexes. Tables whose primary key or unique constraints
+changed are rebuilt: renamed aside, recreated from the model, refilled and
+dropped. Anything more involved (renames, type changes) still needs a
+manual migration.
+"""
+
+import logging
+from typing import List
+from sqlalchemy import MetaData, Table, inspect, text
+
+logger = logging.getLogger(__name__)
+
+def add_missing_columns(engine, metadata) -> List[str]:
+    """
+    Add the columns defined in the models but missing from existing tables.
+
+    Only nullable columns, or columns with a server default filling the
+    existing rows, are added, which every supported database can do in place.
+
+    Args:
+        engine: SQLAlchemy engine of the database to migrate
+        metadata: MetaData holding the model tables
+
+    Returns:
+        List of added columns as 'table.column'
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    ddl_compiler = engine.dialect.ddl_compiler(engine.dialect, None)
+    added = []
+
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                default = ddl_compiler.get_column_default_string(column)
+                if column.primary_key or (not column.nullable and default is None):
+                    logger.warning(f"Cannot add non-nullable column {table.name}.{column.name} automatically")
+                    continue
+                column_sql = f"{preparer.format_column(column)} {column.type.compile(dialect=engine.dialect)}"
+                if default is not None:
+                    column_sql += f" DEFAULT {default}"
+                if not column.nullable:
+                    column_sql += " NOT NULL"
+                connection.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD {column_sql}"))
+                added.append(f"{table.name}.{column.name}")
+                logger.info(f"Added column {table.name}.{column.name}")
+    return added
+
+def create_missing_indexes(engine, metadata) -> List[str]:
+    """
+    Create the indexes defined in the models but missing from existing tables.
+
+    Args:
+        engine: SQLAlchemy engine of the database to migrate
+        metadata: MetaData holding the model tables
+
+    Returns:
+        List of created index names
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(connection)
+                    created.append(index.name)
+                    logger.info(f"Created index {index.name}")
+    return created
+
+def _constraint_columns(inspector, table_name: str):
+    """Return the live primary key and unique column sets of a table."""
+    primary_key = tuple(inspector.get_pk_constraint(table_name)['constrained_columns'])
+    # Some dialects (SQL Server) report unique constraints as unique indexes only
+    unique = {frozenset(index['column_names']) for index in inspector.get_indexes(table_name) if index['unique']}
+    try:
+        unique |= {frozenset(constraint['column_names'])
+                   for constraint in inspector.get_unique_constraints(table_name)}
+    except NotImplementedError:
+        pass
+    return primary_key, unique
+
+def _model_constraint_columns(table):
+    """Return the primary key and unique column sets of a model table."""
+    primary_key = tuple(column.name for column in table.primary_key.columns)
+    unique = {frozenset(column.name for column in constraint.columns)
+              for constraint in table.constraints
+              if constraint.__class__.__name__ == 'UniqueConstraint'}
+    unique |= {frozenset([column.name]) for column in table.columns if column.unique}
+    unique |= {frozenset(column.name for column in index.columns) for index in table.indexes if index.unique}
+    return primary_key, unique
+
+def _rename_table(connection, old_name: str, new_name: str) -> None:
+    """Rename a table with the dialect's syntax."""
+    preparer = connection.dialect.identifier_preparer
+    if connection.dialect.name == 'mssql':
+        connection.execute(text("EXEC sp_rename :old, :new"), {'old': old_name, 'new': new_name})
+    else:
+        connection.execute(text(
+            f"ALTER TABLE {preparer.quote(old_name)} RENAME TO {preparer.quote(new_name)}"
+        ))
+
+def rebuild_changed_tables(engine, metadata) -> List[str]:
+    """
+    Rebuild existing tables whose primary key or unique constraints changed.
+
+    The live table is renamed aside and its indexes dropped, the table is
+    created from the model, the rows are copied over for the columns both
+    share (new columns take their server default) and the old table is
+    dropped, all in one transaction.
+
+    Args:
+        engine: SQLAlchemy engine of the database to migrate
+        metadata: MetaData holding the model tables
+
+    Returns:
+        List of rebuilt table names
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    rebuilt = []
+
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        live_key, live_unique = _constraint_columns(inspector, table.name)
+        model_key, model_unique = _model_constraint_columns(table)
+        if set(live_key) == set(model_key) and live_unique == model_unique:
+            continue
+
+        old_name = f"{table.name}_old"
+        live_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        shared = ', '.join(preparer.quote(column.name) for column in table.columns if column.name in live_columns)
+        with engine.begin() as connection:
+            _rename_table(connection, table.name, old_name)
+            old_table = Table(old_name, MetaData(), autoload_with=connection)
+            for index in old_table.indexes:
+                index.drop(connection)
+            table.create(connection)
+            copy = f"INSERT INTO {preparer.format_table(table)} ({shared}) SELECT {shared} FROM {preparer.quote(old_name)}"
+            if connection.dialect.name == 'mssql' and table.autoincrement_column is not None:
+                # Keep the existing ids of identity columns
+                copy = f"SET IDENTITY_INSERT {preparer.format_table(table)} ON; {copy}; " \
+                       f"SET IDENTITY_INSERT {preparer.format_table(table)} OFF"
+            connection.execute(text(copy))
+            old_table.drop(connection)
+        rebuilt.append(table.name)
+        logger.info(f"Rebuilt table {table.name} for its new primary key or unique constraints")
+    return rebuilt
@@ -6,38 +6,30 @@ tables used in the application. Each class corresponds to a database table,
 and includes column definitions, relationships, and helper methods.
 """
 
-import os
-from sqlalchemy import create_engine, Column, Integer, Float, String, DateTime, Time, Date, ForeignKey
-from sqlalchemy.orm import sessionmaker, declarative_base, scoped_session, relationship
+from sqlalchemy import Column, Integer, Float, String, DateTime, Time, Date, Boolean, ForeignKey, Index, UniqueConstraint, LargeBinary
+from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.ext.declarative import declared_attr
 from datetime import datetime, time
 from typing import Dict, Any, Optional
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Get database connection string from environment
-DATABASE_CONNECTION_STRING = os.getenv('DATABASE_CONNECTION_STRING')
-if not DATABASE_CONNECTION_STRING:
-    raise ValueError("DATABASE_CONNECTION_STRING environment variable is not set.")
-
-# Create database engine with optimized connection settings
-engine = create_engine(
-    DATABASE_CONNECTION_STRING,
-    connect_args={'login_timeout': 30, 'timeout': 90},
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    pool_use_lifo=True
-)
-
-# Create session factories
-SessionFactory = sessionmaker(bind=engine)
-Session = scoped_session(SessionFactory)
+# All sessions share the lazily created engine in create_db; get_db is
+# re-exported here for the fetchers that import it with the models
+from backend.core.config import Config
+from backend.core.create_db import get_db, get_engine
+from backend.core.tenancy import current_user_id
+from backend.models.migrations import add_missing_columns, create_missing_indexes, rebuild_changed_tables
+
 Base = declarative_base()
 
+def user_column(**kwargs) -> Column:
+    """
+    Build the owning user column of a per-user table.
+
+    New rows belong to the user of the current request or sync job; rows of
+    databases created before multi-user support get DEFAULT_USER_ID.
+    """
+    return Column(Integer, nullable=False, default=current_user_id,
+                  server_default=str(Config.DEFAULT_USER_ID), doc="User the row belongs to", **kwargs)
+
 class Activities(Base):
     """
     Model representing activity data from fitness trackers.
@@ -47,8 +39,12 @@ class Activities(Base):
     """
     
     __tablename__ = 'activities'
+    __table_args__ = (
+        Index('ix_activities_user_start_time', 'user_id', 'start_time'),
+    )
     
     activity_id = Column(String(255), primary_key=True, doc="Unique identifier for the activity")
+    user_id = user_column()
     locationName = Column(String(255), doc="Location name of the activity")
     start_time = Column(DateTime, doc="Start time of the activity")
     sport = Column(String(255), doc="Type of sport/activity")
@@ -112,7 +108,11 @@ class ActivityRecords(Base):
     position_long = Column(Float, doc="Longitude coordinate")
     altitude = Column(Float, doc="Altitude in meters")
     heart_rate = Column(Integer, doc="Heart rate in beats per minute")
-    speed = Column(Float, doc="Instantaneous speed in km/h")
+    speed = Column(Float, doc="Instantaneous speed in km/h; GPX speeds (m/s) are converted when parsed")
+    distance = Column(Float, doc="Distance from the activity start in kilometers (FIT only)")
+    cadence = Column(Integer, doc="Cadence in steps or revolutions per minute (FIT only)")
+    power = Column(Integer, doc="Power in watts (FIT only)")
+    temperature = Column(Float, doc="Temperature in degrees Celsius (FIT only)")
     
     # Define relationship to Activities
     activity = relationship("Activities", back_populates="records")
@@ -135,10 +135,79 @@ class ActivityRecords(Base):
             } if self.position_lat and self.position_long else None,
             'altitude': self.altitude,
             'heart_rate': self.heart_rate,
-            'speed': self.speed
+            'speed': self.speed,
+            'distance': self.distance,
+            'cadence': self.cadence,
+            'power': self.power,
+            'temperature': self.temperature
         }
 
 
+class ActivityTracks(Base):
+    """
+    Model representing the complete track of an activity in columnar form.
+    
+    One record per activity holds every track point as delta-encoded,
+    compressed column arrays (see backend.utils.track_codec), replacing the
+    per-point activity_records rows for newly stored activities.
+    """
+    
+    __tablename__ = 'activity_tracks'
+    
+    activity_id = Column(String(255), ForeignKey('activities.activity_id'), primary_key=True, doc="Activity the track belongs to")
+    points = Column(Integer, nullable=False, doc="Number of track points")
+    data = Column(LargeBinary, nullable=False, doc="Encoded track columns")
+    
+    activity = relationship("Activities")
+
+
+class ActivityMapIndex(Base):
+    """
+    Model representing the spatial index entry of an activity track.
+    
+    Each record holds the bounding box of the track, used to find the tracks
+    inside a map viewport, and the track simplified for drawing on a map.
+    """
+    
+    __tablename__ = 'activity_map_index'
+    __table_args__ = (
+        Index('ix_activity_map_index_user_bbox', 'user_id', 'min_lat', 'max_lat', 'min_lon', 'max_lon'),
+    )
+    
+    activity_id = Column(String(255), ForeignKey('activities.activity_id'), primary_key=True, doc="Indexed activity")
+    user_id = user_column()
+    min_lat = Column(Float, nullable=False, doc="Southern edge of the track's bounding box")
+    max_lat = Column(Float, nullable=False, doc="Northern edge of the track's bounding box")
+    min_lon = Column(Float, nullable=False, doc="Western edge of the track's bounding box")
+    max_lon = Column(Float, nullable=False, doc="Eastern edge of the track's bounding box")
+    points = Column(Integer, nullable=False, doc="Number of points in the simplified track")
+    path = Column(LargeBinary, nullable=False, doc="Simplified track positions, encoded with track_codec")
+    
+    activity = relationship("Activities")
+
+
+class MapCells(Base):
+    """
+    Model representing the presence of an activity in a map grid cell.
+    
+    Cells are Web Mercator tiles at a fixed index zoom level; coarser cells
+    for lower zoom levels are derived by integer division of the indices.
+    """
+    
+    __tablename__ = 'map_cells'
+    __table_args__ = (
+        UniqueConstraint('activity_id', 'cell_x', 'cell_y', name='uq_map_cells_activity_cell'),
+        Index('ix_map_cells_user_cell', 'user_id', 'cell_x', 'cell_y'),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True, doc="Unique identifier for the cell entry")
+    user_id = user_column()
+    activity_id = Column(String(255), ForeignKey('activities.activity_id'), nullable=False, doc="Activity passing through the cell")
+    cell_x = Column(Integer, nullable=False, doc="Tile x index at the index zoom level")
+    cell_y = Column(Integer, nullable=False, doc="Tile y index at the index zoom level")
+    points = Column(Integer, nullable=False, doc="Track points of the activity in the cell")
+
+
 class SleepMetrics(Base):
     """
     Model representing sleep data from fitness trackers.
@@ -149,6 +218,7 @@ class SleepMetrics(Base):
     
     __tablename__ = 'sleep_metrics'
     
+    user_id = user_column(primary_key=True)
     date = Column(Date, primary_key=True, doc="Date of the sleep record")
     start_time = Column(DateTime, doc="Sleep start time") 
     end_time = Column(DateTime, doc="Sleep end time")
@@ -190,8 +260,12 @@ class HealthSummary(Base):
     """
     
     __tablename__ = 'health_summary'
+    __table_args__ = (
+        Index('ix_health_summary_user_date', 'user_id', 'date'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True, doc="Unique identifier for the health summary")
+    user_id = user_column()
     date = Column(Date, nullable=False, doc="Date of the health summary")
     resting_heart_rate = Column(Integer, doc="Daily resting heart rate")
     max_heart_rate = Column(Integer, doc="Maximum heart rate recorded for the day")
@@ -230,14 +304,219 @@ class HealthSummary(Base):
         }
 
 
+class Achievements(Base):
+    """
+    Model representing a personal record or streak.
+    
+    Each record holds the current best value of one category for one sport
+    (or 'all' sports), together with the activity that set it. Rows are
+    updated incrementally as new activities are stored.
+    """
+    
+    __tablename__ = 'achievements'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'category', 'sport', name='uq_achievements_user_category_sport'),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True, doc="Unique identifier for the achievement")
+    user_id = user_column()
+    category = Column(String(50), nullable=False, doc="Achievement category, e.g. longest_distance")
+    sport = Column(String(255), nullable=False, doc="Sport the record applies to, or 'all'")
+    value = Column(Float, nullable=False, doc="Record value in the category's unit")
+    activity_id = Column(String(255), ForeignKey('activities.activity_id'), doc="Activity that set the record")
+    achieved_at = Column(DateTime, doc="Start time of the record activity, or the last day of a streak")
+    streak_start = Column(Date, doc="First day of a streak")
+    streak_end = Column(Date, doc="Last day of a streak")
+    updated_at = Column(DateTime, default=datetime.utcnow, doc="When the record was last updated")
+    
+    activity = relationship("Activities")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the model instance to a dictionary for API responses.
+        
+        Returns:
+            Dictionary representation of the achievement
+        """
+        return {
+            'category': self.category,
+            'sport': self.sport,
+            'value': self.value,
+            'activity_id': self.activity_id,
+            'achieved_at': self.achieved_at.isoformat() if self.achieved_at else None,
+            'streak_start': self.streak_start.isoformat() if self.streak_start else None,
+            'streak_end': self.streak_end.isoformat() if self.streak_end else None,
+        }
+
+
+class BestEfforts(Base):
+    """
+    Model representing the best effort of an activity over a target.
+    
+    For distance targets the record holds the fastest time over that distance
+    within the activity; for duration targets it holds the longest distance
+    covered in that time.
+    """
+    
+    __tablename__ = 'best_efforts'
+    __table_args__ = (
+        UniqueConstraint('activity_id', 'effort_type', 'target', name='uq_best_efforts_activity_target'),
+        Index('ix_best_efforts_user_target', 'user_id', 'effort_type', 'target'),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True, doc="Unique identifier for the best effort")
+    user_id = user_column()
+    activity_id = Column(String(255), ForeignKey('activities.activity_id'), nullable=False, doc="Activity the effort belongs to")
+    effort_type = Column(String(20), nullable=False, doc="'distance' or 'duration'")
+    target = Column(Float, nullable=False, doc="Target distance in meters or duration in seconds")
+    elapsed_seconds = Column(Float, nullable=False, doc="Time taken for the effort")
+    distance_meters = Column(Float, nullable=False, doc="Distance covered during the effort")
+    start_record = Column(Integer, doc="Record number where the effort starts")
+    end_record = Column(Integer, doc="Record number where the effort ends")
+    
+    activity = relationship("Activities")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the model instance to a dictionary for API responses.
+        
+        Returns:
+            Dictionary representation of the best effort
+        """
+        return {
+            'activity_id': self.activity_id,
+            'effort_type': self.effort_type,
+            'target': self.target,
+            'elapsed_seconds': round(self.elapsed_seconds, 1),
+            'distance_meters': round(self.distance_meters, 1),
+            'avg_speed': round(self.distance_meters / self.elapsed_seconds * 3.6, 2) if self.elapsed_seconds else None,
+            'pace': round(self.elapsed_seconds / self.distance_meters * 1000, 1) if self.distance_meters else None,
+            'start_record': self.start_record,
+            'end_record': self.end_record,
+        }
+
+
+class TrainingLoad(Base):
+    """
+    Model representing one day of the training load series.
+    
+    Each record holds the summed training load of the day's activities and the
+    exponentially weighted acute (fatigue) and chronic (fitness) loads after
+    that day, with the resulting form (training stress balance).
+    """
+    
+    __tablename__ = 'training_load'
+    
+    user_id = user_column(primary_key=True)
+    date = Column(Date, primary_key=True, doc="Day of the series")
+    load = Column(Float, nullable=False, default=0.0, doc="Summed training load of the day's activities")
+    atl = Column(Float, nullable=False, doc="Acute training load (fatigue) after the day")
+    ctl = Column(Float, nullable=False, doc="Chronic training load (fitness) after the day")
+    tsb = Column(Float, nullable=False, doc="Training stress balance (form): previous day's CTL minus ATL")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the model instance to a dictionary for API responses.
+        
+        Returns:
+            Dictionary representation of the training load day
+        """
+        return {
+            'date': self.date.isoformat() if self.date else None,
+            'load': round(self.load, 1),
+            'atl': round(self.atl, 1),
+            'ctl': round(self.ctl, 1),
+            'tsb': round(self.tsb, 1),
+        }
+
+
+class SyncGeneration(Base):
+    """
+    Model representing one sync run.
+    
+    Every sync opens a new generation; the changes it writes are tagged with
+    the generation id, so clients can ask for everything after a generation.
+    """
+    
+    __tablename__ = 'sync_generations'
+    
+    generation = Column(Integer, primary_key=True, autoincrement=True, doc="Increasing sync generation number")
+    user_id = user_column()
+    started_at = Column(DateTime, default=datetime.utcnow, doc="When the sync started")
+    finished_at = Column(DateTime, doc="When the sync finished")
+    success = Column(Boolean, doc="Whether the sync completed without errors")
+
+
+class ChangeLog(Base):
+    """
+    Model representing a change to a synced row.
+    
+    Each record names the entity ('activities', 'health' or 'sleep'), the key
+    of the changed row (activity id or ISO date) and the operation, tagged
+    with the sync generation that wrote it.
+    """
+    
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        Index('ix_change_log_user_generation', 'user_id', 'generation'),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True, doc="Unique identifier for the change")
+    user_id = user_column()
+    generation = Column(Integer, ForeignKey('sync_generations.generation'), nullable=False, doc="Sync generation that made the change")
+    entity = Column(String(50), nullable=False, doc="Changed entity: activities, health or sleep")
+    key = Column(String(255), nullable=False, doc="Key of the changed row (activity id or ISO date)")
+    operation = Column(String(10), nullable=False, doc="insert, update or delete")
+    changed_at = Column(DateTime, default=datetime.utcnow, doc="When the change was recorded")
+
+
+class SyncCheckpoint(Base):
+    """
+    Model representing a span of days a sync has completed for an entity.
+    
+    Each record covers consecutive days of one entity ('activities',
+    'health' or 'sleep') whose data has been fetched and stored; syncs skip
+    covered days, so an interrupted backfill resumes where it stopped.
+    """
+    
+    __tablename__ = 'sync_checkpoints'
+    __table_args__ = (
+        Index('ix_sync_checkpoints_user_entity', 'user_id', 'entity'),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True, doc="Unique identifier for the span")
+    user_id = user_column()
+    entity = Column(String(50), nullable=False, doc="Synced entity: activities, health or sleep")
+    start_date = Column(Date, nullable=False, doc="First completed day")
+    end_date = Column(Date, nullable=False, doc="Last completed day")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, doc="When the span last grew")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the model instance to a dictionary for API responses.
+        
+        Returns:
+            Dictionary representation of the completed span
+        """
+        return {
+            'from': self.start_date.isoformat(),
+            'to': self.end_date.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
 class User(Base):
     """
     Model representing user information.
     
-    Stores basic user data and preferences for the application.
+    Stores basic user data and preferences for the application. Every data
+    table carries the id of the user its rows belong to.
     """
     
     __tablename__ = 'users'
+    __table_args__ = (
+        Index('ix_users_api_token_hash', 'api_token_hash'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True, doc="Unique identifier for the user")
     username = Column(String(255), unique=True, nullable=False, doc="User's username")
@@ -250,6 +529,11 @@ class User(Base):
     # User preferences
     measurement_system = Column(String(50), default="metric", doc="User's preferred measurement system (metric/imperial)")
     
+    # Synced users need a Garmin token store (see backend.core.garmin_client)
+    sync_enabled = Column(Boolean, nullable=False, default=True, server_default='1', doc="Whether the scheduler syncs the user")
+    # Issued with `python -m backend.core.tenancy <user_id>`; only the hash is stored
+    api_token_hash = Column(String(64), doc="SHA-256 hex digest of the user's API token")
+    
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert the model instance to a dictionary for API responses.
@@ -270,28 +554,17 @@ class User(Base):
         }
 
 
-def get_db():
-    """
-    Generator function that yields a database session and ensures it's closed properly.
-    
-    This function is designed to be used with a context manager or dependency injection
-    system to manage database session lifecycle.
-    
-    Yields:
-        SQLAlchemy session object
-    """
-    db = Session()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 def init_db():
     """
     Initialize the database by creating all defined tables.
     
     This function should be called when setting up the application for the first time
-    or after modifying the database schema.
+    or after modifying the database schema. Tables created by older versions
+    get the columns and indexes added to the models since, and are rebuilt
+    when their primary key or unique constraints changed.
     """
-    Base.metadata.create_all(engine)
\ No newline at end of file
+    engine = get_engine()
+    rebuild_changed_tables(engine, Base.metadata)
+    Base.metadata.create_all(engine)
+    add_missing_columns(engine, Base.metadata)
+    create_missing_indexes(engine, Base.metadata)
\ No newline at end of file
@@ -2,11 +2,19 @@
 API route module initialization.
 
 This module imports and exposes route blueprints for registration with the main Flask application.
-Each blueprint handles a specific category of API endpoints (activities, health, sleep).
+Each blueprint handles a specific category of API endpoints (activities, health, sleep, sync, changes, achievements, best efforts, dashboard, training load, map).
 """
 
 from .activity_route import activity_routes
 from .health_route import health_routes
 from .sleep_route import sleep_routes
+from .profile_route import profile_routes
+from .sync_route import sync_routes
+from .changes_route import change_routes
+from .achievements_route import achievement_routes
+from .best_efforts_route import best_effort_routes
+from .dashboard_route import dashboard_routes
+from .training_load_route import training_load_routes
+from .map_route import map_routes
 
-__all__ = ['activity_routes', 'health_routes', 'sleep_routes']
\ No newline at end of file
+__all__ = ['activity_routes', 'health_routes', 'sleep_routes', 'profile_routes', 'sync_routes', 'change_routes', 'achievement_routes', 'best_effort_routes', 'dashboard_routes', 'training_load_routes', 'map_routes']
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+Achievements API endpoints.
+
+This module serves the personal records and streaks maintained by the
+achievements engine at sync time, so clients no longer derive them from the
+full activity list.
+"""
+
+from datetime import date, timedelta
+from flask import Blueprint, jsonify
+from backend.core.create_db import get_read_db
+from backend.core.compression import snapshot_cache
+from backend.core.tenancy import owned_by
+from backend.data.achievements import ALL_SPORTS, CURRENT_STREAK, unit_for
+from backend.data.change_log import read_latest_generation
+from backend.models.models import Achievements
+from sqlalchemy.orm import joinedload
+import logging
+
+logger = logging.getLogger(__name__)
+achievement_routes = Blueprint('achievements', __name__, url_prefix='/api')
+
+def build_achievements():
+    """
+    Build the achievements payload.
+
+    Returns:
+        Dictionary with 'overall' records, 'by_sport' records per sport, and
+        'streaks', each record including its unit and the activity that set it
+    """
+    db = next(get_read_db())
+    try:
+        rows = db.query(Achievements)\
+            .options(joinedload(Achievements.activity))\
+            .filter(owned_by(Achievements))\
+            .order_by(Achievements.sport, Achievements.category)\
+            .all()
+        
+        result = {'overall': [], 'by_sport': {}, 'streaks': []}
+        for row in rows:
+            achievement = row.to_dict()
+            achievement['unit'] = unit_for(row.category)
+            if row.streak_end is not None:
+                if row.category == CURRENT_STREAK:
+                    # A streak is still alive if the last activity was today or yesterday
+                    achievement['active'] = row.streak_end >= date.today() - timedelta(days=1)
+                result['streaks'].append(achievement)
+                continue
+            
+            achievement['activity'] = row.activity.to_dict() if row.activity else None
+            if row.sport == ALL_SPORTS:
+                result['overall'].append(achievement)
+            else:
+                result['by_sport'].setdefault(row.sport, []).append(achievement)
+        return result
+    finally:
+        db.close()
+
+snapshot_cache.register('achievements', build_achievements)
+
+@achievement_routes.route('/achievements', methods=['GET'])
+def get_achievements():
+    """
+    Retrieve personal records and streaks.
+    
+    Endpoint: GET /api/achievements
+    
+    Returns:
+        JSON object with overall records, records per sport and streaks
+    """
+    try:
+        return snapshot_cache.response('achievements', read_latest_generation())
+    except Exception as e:
+        logger.error(f"Database error: {e}")
+        return jsonify({"error": "Database error"}), 500
@@ -6,9 +6,15 @@ including workouts, GPS tracks, and performance metrics. Each endpoint returns
 data in JSON format with appropriate HTTP status codes.
 """
 
-from flask import Blueprint, jsonify
-from backend.core.create_db import get_db
-from backend.models.models import Activities, ActivityRecords
+import numpy as np
+from flask import Blueprint, jsonify, request
+from backend.core.create_db import get_read_db
+from backend.core.compression import snapshot_cache
+from backend.core.tenancy import owned_by
+from backend.data.change_log import latest_generation, read_latest_generation
+from backend.data.comparison import DEFAULT_STEP_M, MIN_STEP_M, build_comparison, compare_cache
+from backend.data.tracks import load_track
+from backend.models.models import Activities
 from sqlalchemy import func, extract
 import logging
 from datetime import datetime
@@ -24,13 +30,16 @@ def sync_activities():
     
     Endpoint: POST /api/activities/sync
     
+    Runs the same sync as POST /api/sync without parameters: dates the
+    checkpoints record as synced are skipped.
+    
     Returns:
         JSON response with sync status and message
     """
     logger.info("Sync endpoint hit")  
     try:
         logger.info("Starting sync process")  
-        sync_success = sync_all_data(force=True)
+        sync_success = sync_all_data()
         
         if sync_success:
             logger.info("Sync completed successfully")  
@@ -54,6 +63,50 @@ def sync_activities():
         }), 500
 
 
+def build_max_values():
+    """
+    Build the maximum values payload for activity metrics.
+
+    Returns:
+        Dictionary with maximum values for distance, duration, speed, etc.
+    """
+    db = next(get_read_db())
+    try:
+        mine = owned_by(Activities)
+        return {
+            'Distance': db.query(func.max(Activities.distance)).filter(mine).scalar() or 0,
+            'Duration': db.query(func.max(
+                (extract('hour', Activities.elapsed_time) * 3600) +
+                (extract('minute', Activities.elapsed_time) * 60) +
+                extract('second', Activities.elapsed_time)
+            )).filter(mine).scalar() or 0,
+            'Avg Speed': db.query(func.max(Activities.avg_speed)).filter(mine).scalar() or 0,
+            'Calories': db.query(func.max(Activities.calories)).filter(mine).scalar() or 0,
+            'Avg HR': db.query(func.max(Activities.avg_hr)).filter(mine).scalar() or 0
+        }
+    finally:
+        db.close()
+
+def build_activities():
+    """
+    Build the list of all activities.
+
+    Returns:
+        List of activity dictionaries in descending chronological order
+    """
+    db = next(get_read_db())
+    try:
+        activities = db.query(Activities)\
+            .filter(owned_by(Activities))\
+            .order_by(Activities.start_time.desc())\
+            .all()
+        return [activity.to_dict() for activity in activities]
+    finally:
+        db.close()
+
+snapshot_cache.register('activities/max_values', build_max_values)
+snapshot_cache.register('activities', build_activities)
+
 @activity_routes.route('/activities/max_values', methods=['GET'])
 def get_max_values():
     """
@@ -64,25 +117,11 @@ def get_max_values():
     Returns:
         JSON response with maximum values for distance, duration, speed, etc.
     """
-    db = next(get_db())
     try:
-        max_values = {
-            'Distance': db.query(func.max(Activities.distance)).scalar() or 0,
-            'Duration': db.query(func.max(
-                (extract('hour', Activities.elapsed_time) * 3600) +
-                (extract('minute', Activities.elapsed_time) * 60) +
-                extract('second', Activities.elapsed_time)
-            )).scalar() or 0,
-            'Avg Speed': db.query(func.max(Activities.avg_speed)).scalar() or 0,
-            'Calories': db.query(func.max(Activities.calories)).scalar() or 0,
-            'Avg HR': db.query(func.max(Activities.avg_hr)).scalar() or 0
-        }
-        return jsonify(max_values), 200
+        return snapshot_cache.response('activities/max_values', read_latest_generation())
     except Exception as e:
         logger.error(f"Database error: {e}")
         return jsonify({"error": "Database error"}), 500
-    finally:
-        db.close()
 
 @activity_routes.route('/activities', methods=['GET'])
 def get_activities():
@@ -94,13 +133,50 @@ def get_activities():
     Returns:
         JSON array of all activities in descending chronological order
     """
-    db = next(get_db())
     try:
-        activities = db.query(Activities).order_by(Activities.start_time.desc()).all()
-        return jsonify([activity.to_dict() for activity in activities]), 200
+        return snapshot_cache.response('activities', read_latest_generation())
     except Exception as e:
         logger.error(f"Database error: {e}")
         return jsonify({"error": "Database error"}), 500
+
+@activity_routes.route('/activities/compare', methods=['GET'])
+def compare_activities():
+    """
+    Compare two activities aligned by the distance covered.
+    
+    Endpoint: GET /api/activities/compare?a=<activity_id>&b=<activity_id>
+    
+    Query Parameters:
+        a: Reference activity
+        b: Activity compared against it
+        step: Spacing of the distance grid in meters (default 10)
+    
+    Returns:
+        JSON object with both activities, the grid distances and, along them,
+        the elapsed times, the time gap (positive when B is behind) and the
+        heart rates and speeds of both with their deltas, plus a summary
+    """
+    activity_a, activity_b = request.args.get('a'), request.args.get('b')
+    if not activity_a or not activity_b:
+        return jsonify({"error": "Query parameters 'a' and 'b' must name two activities"}), 400
+    step = request.args.get('step', DEFAULT_STEP_M, type=float)
+    if not step or step < MIN_STEP_M:
+        return jsonify({"error": f"Query parameter 'step' must be at least {MIN_STEP_M:g} meters"}), 400
+    
+    db = next(get_read_db())
+    try:
+        key = ('compare', activity_a, activity_b, step)
+        generation = latest_generation(db)
+        builder = lambda: build_comparison(db, activity_a, activity_b, step)
+        comparison = compare_cache.get(key, generation, builder)
+        if comparison is None:
+            return jsonify({"error": "Activity not found"}), 404
+        if 'error' in comparison:
+            return jsonify(comparison), 422
+        return compare_cache.response(key, generation, builder)
+    except Exception as e:
+        logger.error(f"Error comparing activities {activity_a} and {activity_b}: {e}")
+        return jsonify({"error": "Error comparing activities"}), 500
     finally:
         db.close()
 
@@ -117,15 +193,16 @@ def get_activity_gps(activity_id):
     Returns:
         JSON array of GPS coordinates (lat, long)
     """
-    db = next(get_db())
+    db = next(get_read_db())
     try:
-        records = db.query(ActivityRecords)\
-            .filter_by(activity_id=activity_id)\
-            .order_by(ActivityRecords.record)\
-            .all()
-        gps_data = [(record.position_lat, record.position_long) 
-                    for record in records 
-                    if record.position_lat and record.position_long]
+        owned = db.query(Activities.activity_id).filter(owned_by(Activities), Activities.activity_id == activity_id)
+        track = load_track(db, activity_id) if db.query(owned.exists()).scalar() else None
+        if track is None:
+            return jsonify([]), 200
+        lats, lons = track['position_lat'], track['position_long']
+        # Missing positions become 0 and are dropped with the zero placeholders
+        valid = (np.nan_to_num(lats) != 0) & (np.nan_to_num(lons) != 0)
+        gps_data = list(zip(lats[valid].tolist(), lons[valid].tolist()))
         return jsonify(gps_data), 200
     except Exception as e:
         logger.error(f"Error fetching GPS data: {e}")
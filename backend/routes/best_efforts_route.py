@@ -0,0 +1,120 @@
+"""
+Best effort API endpoints.
+
+This module serves the best efforts computed at ingest: the fastest times over
+fixed distances and the longest distances over fixed durations, ranked across
+all activities or listed for a single activity.
+"""
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import case, func
+from backend.core.create_db import get_read_db
+from backend.core.tenancy import owned_by
+from backend.data.best_efforts import DISTANCE
+from backend.models.models import Activities, BestEfforts
+import logging
+
+logger = logging.getLogger(__name__)
+best_effort_routes = Blueprint('best_efforts', __name__, url_prefix='/api')
+
+# Maximum entries per ranking
+MAX_LIMIT = 100
+
+def _effort_entry(effort: BestEfforts, activity: Activities) -> dict:
+    """Combine a best effort with the activity details shown next to it."""
+    entry = effort.to_dict()
+    entry.update({
+        'sport': activity.sport,
+        'start_time': activity.start_time.isoformat() if activity.start_time else None,
+        'locationName': activity.locationName,
+    })
+    return entry
+
+@best_effort_routes.route('/best_efforts', methods=['GET'])
+def get_best_effort_rankings():
+    """
+    Rank best efforts across all activities.
+    
+    Endpoint: GET /api/best_efforts
+    
+    Query Parameters:
+        sport: Only rank activities of this sport (optional)
+        limit: Entries per target, default 10, at most 100
+    
+    Returns:
+        JSON object with 'distance' and 'duration' lists of targets (meters
+        or seconds) in ascending order, each with its efforts fastest or
+        farthest first
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), MAX_LIMIT)
+    except ValueError:
+        return jsonify({"error": "Query parameter 'limit' must be an integer"}), 400
+    sport = request.args.get('sport')
+    
+    db = next(get_read_db())
+    try:
+        # Rank every effort within its target in one pass: shortest time for
+        # distance targets, longest distance for duration targets
+        rank = func.row_number().over(
+            partition_by=(BestEfforts.effort_type, BestEfforts.target),
+            order_by=case(
+                (BestEfforts.effort_type == DISTANCE, BestEfforts.elapsed_seconds),
+                else_=-BestEfforts.distance_meters
+            )
+        ).label('rank')
+        ranked = db.query(BestEfforts.id.label('id'), rank)\
+            .join(Activities, Activities.activity_id == BestEfforts.activity_id)\
+            .filter(owned_by(BestEfforts))
+        if sport:
+            ranked = ranked.filter(Activities.sport == sport)
+        ranked = ranked.subquery()
+        
+        rows = db.query(BestEfforts, Activities, ranked.c.rank)\
+            .join(ranked, ranked.c.id == BestEfforts.id)\
+            .join(Activities, Activities.activity_id == BestEfforts.activity_id)\
+            .filter(ranked.c.rank <= limit)\
+            .order_by(BestEfforts.effort_type, BestEfforts.target, ranked.c.rank)\
+            .all()
+        
+        rankings = {'distance': [], 'duration': []}
+        for effort, activity, position in rows:
+            targets = rankings[effort.effort_type]
+            if not targets or targets[-1]['target'] != effort.target:
+                targets.append({'target': effort.target, 'efforts': []})
+            entry = _effort_entry(effort, activity)
+            entry['rank'] = position
+            targets[-1]['efforts'].append(entry)
+        return jsonify(rankings), 200
+    except Exception as e:
+        logger.error(f"Error fetching best effort rankings: {e}")
+        return jsonify({"error": "Error fetching best efforts"}), 500
+    finally:
+        db.close()
+
+@best_effort_routes.route('/activities/<activity_id>/best_efforts', methods=['GET'])
+def get_activity_best_efforts(activity_id):
+    """
+    Retrieve the best efforts of a single activity.
+    
+    Endpoint: GET /api/activities/<activity_id>/best_efforts
+    
+    Args:
+        activity_id: Unique identifier for the activity
+        
+    Returns:
+        JSON array of the activity's best efforts, distances first
+    """
+    db = next(get_read_db())
+    try:
+        efforts = db.query(BestEfforts)\
+            .filter(owned_by(BestEfforts))\
+            .filter_by(activity_id=activity_id)\
+            .order_by(BestEfforts.effort_type, BestEfforts.target)\
+            .all()
+        return jsonify([effort.to_dict() for effort in efforts]), 200
+    except Exception as e:
+        logger.error(f"Error fetching best efforts for activity {activity_id}: {e}")
+        return jsonify({"error": "Error fetching best efforts"}), 500
+    finally:
+        db.close()
@@ -0,0 +1,103 @@
+"""
+Change feed API endpoints.
+
+This module defines the delta feed clients use to sync incrementally: given
+the last sync generation they have seen, it returns only the activities,
+health days and sleep days inserted, updated or deleted since then.
+"""
+
+from datetime import date
+from flask import Blueprint, jsonify, request
+from backend.core.config import Config
+from backend.core.create_db import get_read_db
+from backend.core.tenancy import owned_by
+from backend.data.change_log import ENTITIES, changes_page, latest_generation
+import logging
+
+logger = logging.getLogger(__name__)
+change_routes = Blueprint('changes', __name__, url_prefix='/api')
+
+# Keys per IN clause, well below the SQL Server parameter limit
+KEY_CHUNK_SIZE = 1000
+
+def _load_rows(db, entity: str, keys: list) -> dict:
+    """
+    Load the current rows for a set of changed keys.
+
+    Args:
+        db: Database session
+        entity: Entity name from ENTITIES
+        keys: Activity ids or ISO dates
+
+    Returns:
+        Dictionary mapping key to the row's API dictionary
+    """
+    model, key_column = ENTITIES[entity]
+    lookup = keys if entity == 'activities' else [date.fromisoformat(key) for key in keys]
+    rows = {}
+    for start in range(0, len(lookup), KEY_CHUNK_SIZE):
+        for row in db.query(model).filter(owned_by(model), key_column.in_(lookup[start:start + KEY_CHUNK_SIZE])):
+            key = getattr(row, key_column.key)
+            rows[key.isoformat() if hasattr(key, 'isoformat') else str(key)] = row.to_dict()
+    return rows
+
+@change_routes.route('/changes', methods=['GET'])
+def get_changes():
+    """
+    Retrieve the rows changed since a sync generation.
+    
+    Endpoint: GET /api/changes?since=<generation>[&after=<change id>]
+    
+    Query Parameters:
+        since: Last generation the client has seen; 0 starts from the first recorded change
+        after: 'next_after' of the previous page, when it ended inside a generation (optional)
+    
+    Returns:
+        JSON object with the current generation and, per entity ('activities',
+        'health', 'sleep'), the inserted and updated rows and the deleted keys.
+        Changes of a sync still running are left out until it finishes.
+        A response covers at most CHANGES_PAGE_SIZE changes: while 'more' is
+        true, request the next page with since='next_since' and
+        after='next_after' (when not null). Once 'more' is false the client
+        has caught up to 'generation', which equals 'next_since'.
+        'reset' is true if the client is ahead of the server (e.g. after the
+        database was recreated) and should reload everything.
+    """
+    try:
+        since = int(request.args.get('since', ''))
+        after = int(request.args['after']) if request.args.get('after') else None
+        if since < 0 or (after is not None and after < 0):
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "Query parameters 'since' and 'after' must be non-negative numbers"}), 400
+    
+    db = next(get_read_db())
+    try:
+        generation = latest_generation(db)
+        page, continuation = changes_page(db, since, generation, after, Config.CHANGES_PAGE_SIZE)
+        next_since, next_after = continuation or (generation, None)
+        result = {
+            'generation': generation,
+            'since': since,
+            'reset': since > generation,
+            'more': continuation is not None,
+            'next_since': next_since,
+            'next_after': next_after,
+        }
+        
+        for entity, changes in page.items():
+            upserted = [key for key, operation in changes.items() if operation != 'delete']
+            rows = _load_rows(db, entity, upserted)
+            result[entity] = {
+                'inserted': [rows[key] for key, operation in changes.items() if operation == 'insert' and key in rows],
+                'updated': [rows[key] for key, operation in changes.items() if operation == 'update' and key in rows],
+                # Rows removed without a logged delete are reported as deleted too
+                'deleted': [key for key in changes if key not in rows],
+            }
+        
+        return jsonify(result), 200
+    except Exception as e:
+        logger.error(f"Error fetching changes: {e}")
+        return jsonify({"error": "Error fetching changes"}), 500
+    finally:
+        db.close()
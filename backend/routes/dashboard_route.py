@@ -0,0 +1,142 @@
+"""
+Dashboard API endpoints.
+
+This module serves per-period, per-sport activity aggregates (counts,
+distance, duration, calories, training load) computed with SQL GROUP BY, so
+calendar and trend views no longer aggregate the raw activity list in the
+browser. Results are cached per sync generation.
+"""
+
+from datetime import date, datetime, timedelta
+from flask import Blueprint, jsonify, request
+from sqlalchemy import extract, func
+from backend.core.cache import GenerationCache
+from backend.core.create_db import get_read_db
+from backend.core.tenancy import owned_by
+from backend.data.change_log import latest_generation
+from backend.models.models import Activities
+from backend.utils.db_util import period_columns, period_label
+import logging
+
+logger = logging.getLogger(__name__)
+dashboard_routes = Blueprint('dashboard', __name__, url_prefix='/api')
+
+PERIODS = ('week', 'month', 'year')
+
+dashboard_cache = GenerationCache()
+
+def _parse_date(value):
+    """Parse an optional ISO date query parameter."""
+    return date.fromisoformat(value) if value else None
+
+def build_dashboard(db, period: str, start=None, end=None, sport=None) -> dict:
+    """
+    Aggregate activities per period and sport.
+
+    Args:
+        db: Database session
+        period: 'week', 'month' or 'year'
+        start: First date to include (optional)
+        end: Last date to include (optional)
+        sport: Only include this sport (optional)
+
+    Returns:
+        Dictionary with the period and a list of periods, newest first, each
+        with totals and a breakdown per sport
+    """
+    group = period_columns(Activities.start_time, period, db.bind.dialect.name)
+    duration = (extract('hour', Activities.elapsed_time) * 3600 +
+                extract('minute', Activities.elapsed_time) * 60 +
+                extract('second', Activities.elapsed_time))
+    
+    query = db.query(
+        *group,
+        Activities.sport,
+        func.count(Activities.activity_id),
+        func.sum(Activities.distance),
+        func.sum(duration),
+        func.sum(Activities.calories),
+        func.sum(Activities.training_load),
+        func.avg(Activities.avg_hr)
+    ).filter(owned_by(Activities), Activities.start_time.isnot(None))
+    if start:
+        query = query.filter(Activities.start_time >= datetime.combine(start, datetime.min.time()))
+    if end:
+        query = query.filter(Activities.start_time < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    if sport:
+        query = query.filter(Activities.sport == sport)
+    rows = query.group_by(*group, Activities.sport).all()
+    
+    periods = {}
+    for row in rows:
+        label = period_label(period, row[:len(group)])
+        sport_name, count, distance, seconds, calories, load, avg_hr = row[len(group):]
+        stats = {
+            'count': count,
+            'distance': round(distance or 0, 2),
+            'duration': int(seconds or 0),
+            'calories': int(calories or 0),
+            'training_load': round(load or 0, 1),
+            'avg_hr': round(avg_hr) if avg_hr is not None else None,
+        }
+        entry = periods.setdefault(label, {'period': label, 'sports': {}})
+        entry['sports'][sport_name or 'unknown'] = stats
+    
+    for entry in periods.values():
+        sports = entry['sports'].values()
+        count = sum(stats['count'] for stats in sports)
+        hr_weight = [(stats['avg_hr'], stats['count']) for stats in sports if stats['avg_hr'] is not None]
+        entry['totals'] = {
+            'count': count,
+            'distance': round(sum(stats['distance'] for stats in sports), 2),
+            'duration': sum(stats['duration'] for stats in sports),
+            'calories': sum(stats['calories'] for stats in sports),
+            'training_load': round(sum(stats['training_load'] for stats in sports), 1),
+            'avg_hr': round(sum(hr * n for hr, n in hr_weight) / sum(n for _, n in hr_weight)) if hr_weight else None,
+        }
+    
+    return {
+        'period': period,
+        'periods': sorted(periods.values(), key=lambda entry: entry['period'], reverse=True),
+    }
+
+@dashboard_routes.route('/dashboard', methods=['GET'])
+def get_dashboard():
+    """
+    Retrieve activity aggregates per period and sport.
+    
+    Endpoint: GET /api/dashboard
+    
+    Query Parameters:
+        period: 'week' (default), 'month' or 'year'; weeks start on Monday
+        from: First date to include, YYYY-MM-DD (optional)
+        to: Last date to include, YYYY-MM-DD (optional)
+        sport: Only include this sport (optional)
+    
+    Returns:
+        JSON object with a list of periods, newest first, each with totals
+        (count, distance km, duration s, calories, training load, avg HR)
+        and the same figures per sport
+    """
+    period = request.args.get('period', 'week')
+    if period not in PERIODS:
+        return jsonify({"error": f"Query parameter 'period' must be one of {', '.join(PERIODS)}"}), 400
+    try:
+        start = _parse_date(request.args.get('from'))
+        end = _parse_date(request.args.get('to'))
+    except ValueError:
+        return jsonify({"error": "Dates must be formatted as YYYY-MM-DD"}), 400
+    sport = request.args.get('sport')
+    
+    db = next(get_read_db())
+    try:
+        return dashboard_cache.response(
+            ('dashboard', period, start, end, sport),
+            latest_generation(db),
+            lambda: build_dashboard(db, period, start, end, sport)
+        )
+    except Exception as e:
+        logger.error(f"Error building dashboard: {e}")
+        return jsonify({"error": "Error building dashboard"}), 500
+    finally:
+        db.close()
@@ -0,0 +1,182 @@
+"""
+Bulk export API endpoints.
+
+This module streams every activity, track point, health day or sleep day of
+the requesting user as NDJSON or CSV. Rows are read from a server-side
+cursor a batch at a time and written out as they arrive, so memory use does
+not grow with the table and the first bytes are sent right away, unlike the
+list endpoints, which build the whole payload before responding.
+"""
+
+import csv
+import io
+import json
+import math
+from datetime import date, datetime, time, timedelta
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from sqlalchemy import select
+from backend.core.create_db import get_read_db
+from backend.core.tenancy import owned_by
+from backend.data.tracks import TRACK_SCALES, load_track, track_timestamps
+from backend.utils.track_metrics import DERIVED_SCALES
+from backend.models.models import Activities, HealthSummary, SleepMetrics
+import logging
+
+logger = logging.getLogger(__name__)
+export_routes = Blueprint('export', __name__, url_prefix='/api')
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+# Last line written when an export fails midway, so clients can tell the
+# download is incomplete even where the connection close ends it cleanly
+ERROR_TRAILERS = {
+    'ndjson': json.dumps({'error': 'Export failed before all rows were sent'}) + '\n',
+    'csv': '# error: export failed before all rows were sent\r\n',
+}
+# Rows fetched from the cursor, and written out, at a time
+EXPORT_BATCH_SIZE = 1000
+
+# Exported entities with their model and the date column 'from'/'to' filter;
+# 'records' exports the track points of the activities in the range
+ENTITIES = {
+    'activities': (Activities, Activities.start_time),
+    'records': (Activities, Activities.start_time),
+    'health': (HealthSummary, HealthSummary.date),
+    'sleep': (SleepMetrics, SleepMetrics.date),
+}
+RECORD_FIELDS = ['activity_id', 'record'] + list(TRACK_SCALES) + list(DERIVED_SCALES)
+
+def export_fields(entity: str) -> list:
+    """Return the exported field names of an entity, in column order."""
+    if entity == 'records':
+        return RECORD_FIELDS
+    model, _ = ENTITIES[entity]
+    return [column.key for column in model.__table__.columns if column.key != 'user_id']
+
+def export_value(value):
+    """Convert a column value to its JSON representation (NaN to null)."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+def export_rows(db, entity: str, start=None, end=None):
+    """
+    Yield the current user's rows of an entity in batches.
+
+    Args:
+        db: Database session
+        entity: Entity name from ENTITIES
+        start: First date to include (optional)
+        end: Last date to include (optional)
+
+    Yields:
+        Lists of rows, each a list of values in export_fields() order
+    """
+    model, date_column = ENTITIES[entity]
+    columns = [Activities.activity_id] if entity == 'records' \
+        else [getattr(model, field) for field in export_fields(entity)]
+    query = select(*columns).where(owned_by(model)).order_by(date_column)
+    if start:
+        query = query.where(date_column >= start)
+    if end:
+        # Activities filter on a timestamp, so include the whole last day
+        query = query.where(date_column < end + timedelta(days=1))
+
+    if entity != 'records':
+        result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for partition in result.partitions():
+            yield [[export_value(value) for value in row] for row in partition]
+        return
+
+    # Tracks are loaded one activity at a time; the ids are read up front,
+    # since SQL Server cannot run a query while another's cursor is open
+    for activity_id in db.execute(query).scalars().all():
+        track = load_track(db, activity_id)
+        if track is None:
+            continue
+        columns = [track_timestamps(track)] + [track[name].tolist() for name in RECORD_FIELDS[3:]]
+        points = [[activity_id, index] + [export_value(value) for value in values]
+                  for index, values in enumerate(zip(*columns))]
+        for offset in range(0, len(points), EXPORT_BATCH_SIZE):
+            yield points[offset:offset + EXPORT_BATCH_SIZE]
+
+def encode_ndjson(fields: list, batches):
+    """Yield each batch of rows as NDJSON objects, one per line."""
+    for rows in batches:
+        yield ''.join(json.dumps(dict(zip(fields, row))) + '\n' for row in rows)
+
+def encode_csv(fields: list, batches):
+    """Yield the CSV header, then each batch of rows as CSV lines."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(['' if value is None else value for value in row] for row in rows)
+        yield buffer.getvalue()
+
+@export_routes.route('/export/<entity>', methods=['GET'])
+def export_entity(entity):
+    """
+    Stream all rows of an entity.
+
+    Endpoint: GET /api/export/<entity>
+
+    Args:
+        entity: 'activities', 'records' (track points), 'health' or 'sleep'
+
+    Query Parameters:
+        format: 'ndjson' (default), one JSON object per line, or 'csv'
+        from: First date to include, YYYY-MM-DD (optional)
+        to: Last date to include, YYYY-MM-DD (optional)
+
+    Returns:
+        Streamed download of the rows in chronological order; activities and
+        their records are filtered by start time. If reading fails midway the
+        last line is an error trailer ({"error": ...} in NDJSON, a line
+        starting with '# error:' in CSV) and a chunked response is aborted
+        without its final chunk
+    """
+    if entity not in ENTITIES:
+        return jsonify({"error": f"Unknown entity '{entity}', expected one of {', '.join(ENTITIES)}"}), 404
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in FORMATS:
+        return jsonify({"error": f"Query parameter 'format' must be one of {', '.join(FORMATS)}"}), 400
+    try:
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({"error": "Dates must be formatted as YYYY-MM-DD"}), 400
+
+    fields = export_fields(entity)
+    encode = encode_csv if export_format == 'csv' else encode_ndjson
+
+    def generate():
+        db = next(get_read_db())
+        try:
+            yield from encode(fields, export_rows(db, entity, start, end))
+        except Exception as e:
+            # Headers are already sent; write the error trailer, then re-raise
+            # so the server aborts a chunked response instead of completing it
+            logger.error(f"Error exporting {entity}: {e}")
+            yield ERROR_TRAILERS[export_format]
+            raise
+        finally:
+            db.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=FORMATS[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{entity}.{export_format}"',
+            'X-Accel-Buffering': 'no'  # Disable proxy buffering (nginx)
+        }
+    )
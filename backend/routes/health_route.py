@@ -6,14 +6,38 @@ including heart rate, stress levels, steps, and other daily health metrics.
 Each endpoint returns data in JSON format with appropriate HTTP status codes.
 """
 
-from flask import Blueprint, jsonify
-from backend.core.create_db import get_db
+from datetime import date
+from flask import Blueprint, jsonify, request
+from backend.core.create_db import get_read_db
+from backend.core.compression import snapshot_cache
+from backend.core.tenancy import owned_by
+from backend.data.change_log import latest_generation, read_latest_generation
+from backend.data.trends import WINDOWS, build_trends, trend_cache
 from backend.models.models import HealthSummary
 import logging
 
 logger = logging.getLogger(__name__)
 health_routes = Blueprint('health', __name__, url_prefix='/api')
 
+def build_health_data():
+    """
+    Build the list of all health summary records.
+
+    Returns:
+        List of daily health summary dictionaries in descending chronological order
+    """
+    db = next(get_read_db())
+    try:
+        health_records = db.query(HealthSummary)\
+            .filter(owned_by(HealthSummary))\
+            .order_by(HealthSummary.date.desc())\
+            .all()
+        return [record.to_dict() for record in health_records]
+    finally:
+        db.close()
+
+snapshot_cache.register('health', build_health_data)
+
 @health_routes.route('/health', methods=['GET'])
 def get_health_data():
     """
@@ -24,14 +48,43 @@ def get_health_data():
     Returns:
         JSON array of daily health summaries in descending chronological order
     """
-    db = next(get_db())
     try:
-        health_records = db.query(HealthSummary)\
-            .order_by(HealthSummary.date.desc())\
-            .all()
-        return jsonify([record.to_dict() for record in health_records]), 200
+        return snapshot_cache.response('health', read_latest_generation())
     except Exception as e:
         logger.error(f"Error fetching health data: {e}")
         return jsonify({"error": "Failed to fetch health data"}), 500
+
+@health_routes.route('/health/trends', methods=['GET'])
+def get_health_trends():
+    """
+    Retrieve rolling health trends.
+    
+    Endpoint: GET /api/health/trends
+    
+    Query Parameters:
+        from: First date to include, YYYY-MM-DD (optional, defaults to 90 days before 'to')
+        to: Last date to include, YYYY-MM-DD (optional, defaults to the latest stored date)
+    
+    Returns:
+        JSON object with the dates and, for resting heart rate, stress, steps and intensity minutes, the daily values,
+        7- and 28-day rolling means with min/max bands and week-over-week
+        deltas, as arrays aligned with the dates
+    """
+    try:
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({"error": "Dates must be formatted as YYYY-MM-DD"}), 400
+    
+    db = next(get_read_db())
+    try:
+        return trend_cache.response(
+            ('health', start, end, WINDOWS),
+            latest_generation(db),
+            lambda: build_trends(db, 'health', start, end)
+        )
+    except Exception as e:
+        logger.error(f"Error building health trends: {e}")
+        return jsonify({"error": "Failed to build health trends"}), 500
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,188 @@
+"""
+Map API endpoints.
+
+This module serves the activity tracks inside a map viewport and heatmap
+cell counts, answered from the spatial index maintained at sync time
+(bounding boxes, simplified tracks and grid cells) instead of loading every
+activity's GPS data. Results are cached per sync generation.
+"""
+
+import math
+from flask import Blueprint, jsonify, request
+from sqlalchemy import distinct, func
+from backend.core.cache import GenerationCache
+from backend.core.create_db import get_read_db
+from backend.core.tenancy import owned_by
+from backend.data.change_log import latest_generation
+from backend.data.map_index import INDEX_ZOOM, PATH_ZOOM, decode_path
+from backend.models.models import Activities, ActivityMapIndex, MapCells
+from backend.utils.geo_utils import MAX_MERCATOR_LAT, mercator_lat_lon, mercator_tile, simplify_to_grid
+import logging
+
+logger = logging.getLogger(__name__)
+map_routes = Blueprint('map', __name__, url_prefix='/api')
+
+MODES = ('tracks', 'heatmap')
+MAX_ZOOM = 22
+# Heatmap cells per tile edge as a power of two (3: 8x8 cells of 32 px)
+HEATMAP_DETAIL = 3
+DEFAULT_TRACK_LIMIT = 200
+MAX_TRACK_LIMIT = 1000
+
+map_cache = GenerationCache()
+
+def parse_bbox(value: str):
+    """
+    Parse a 'minLon,minLat,maxLon,maxLat' bounding box.
+
+    Raises:
+        ValueError: If the value is malformed or the box is empty
+    """
+    min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(','))
+    if not (-180 <= min_lon < max_lon <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise ValueError("Empty or out of range bounding box")
+    return min_lon, min_lat, max_lon, max_lat
+
+def build_tracks(db, bbox, zoom: int, sport=None, limit: int = DEFAULT_TRACK_LIMIT) -> dict:
+    """
+    Collect the simplified tracks whose bounding box intersects a viewport.
+
+    Args:
+        db: Database session
+        bbox: (min_lon, min_lat, max_lon, max_lat) of the viewport
+        zoom: Map zoom level the tracks are drawn at
+        sport: Only include this sport (optional)
+        limit: Maximum number of tracks, newest first
+
+    Returns:
+        Dictionary with the tracks, each with its activity, bounding box and
+        path of [lat, lon] pairs, and whether the limit cut the list short
+    """
+    min_lon, min_lat, max_lon, max_lat = bbox
+    query = db.query(ActivityMapIndex, Activities.sport, Activities.start_time)\
+        .join(Activities, Activities.activity_id == ActivityMapIndex.activity_id)\
+        .filter(owned_by(ActivityMapIndex))\
+        .filter(ActivityMapIndex.min_lat <= max_lat, ActivityMapIndex.max_lat >= min_lat)\
+        .filter(ActivityMapIndex.min_lon <= max_lon, ActivityMapIndex.max_lon >= min_lon)
+    if sport:
+        query = query.filter(Activities.sport == sport)
+    rows = query.order_by(Activities.start_time.desc()).limit(limit + 1).all()
+
+    tracks = []
+    for entry, sport_name, start_time in rows[:limit]:
+        lats, lons = decode_path(entry)
+        if zoom < PATH_ZOOM:
+            kept = simplify_to_grid(lats, lons, zoom)
+            lats, lons = lats[kept], lons[kept]
+        tracks.append({
+            'activity_id': entry.activity_id,
+            'sport': sport_name,
+            'start_time': start_time.isoformat() if start_time else None,
+            'bbox': [entry.min_lon, entry.min_lat, entry.max_lon, entry.max_lat],
+            'path': [[round(lat, 6), round(lon, 6)] for lat, lon in zip(lats.tolist(), lons.tolist())],
+        })
+    return {'mode': 'tracks', 'zoom': zoom, 'truncated': len(rows) > limit, 'tracks': tracks}
+
+def build_heatmap(db, bbox, zoom: int, sport=None) -> dict:
+    """
+    Count the activities passing through each heatmap cell of a viewport.
+
+    Cells are tiles at zoom + HEATMAP_DETAIL (at most the index zoom),
+    aggregated in SQL from the index cells by integer division.
+
+    Args:
+        db: Database session
+        bbox: (min_lon, min_lat, max_lon, max_lat) of the viewport
+        zoom: Map zoom level
+        sport: Only include this sport (optional)
+
+    Returns:
+        Dictionary with the cell zoom level and the cells, each with its tile
+        indices, center coordinates, distinct activity count and point count
+    """
+    min_lon, min_lat, max_lon, max_lat = bbox
+    level = min(zoom + HEATMAP_DETAIL, INDEX_ZOOM)
+    factor = 2 ** (INDEX_ZOOM - level)
+
+    # Viewport edges in heatmap cells; tile y grows southwards, so the
+    # northern edge gives the smallest index
+    west, north = mercator_tile(min(max_lat, MAX_MERCATOR_LAT), min_lon, level)
+    east, south = mercator_tile(max(min_lat, -MAX_MERCATOR_LAT), max_lon, level)
+    cell_x = MapCells.cell_x // factor
+    cell_y = MapCells.cell_y // factor
+
+    # Filter on whole heatmap cells so the edge cells are complete
+    query = db.query(cell_x, cell_y, func.count(distinct(MapCells.activity_id)), func.sum(MapCells.points))\
+        .filter(owned_by(MapCells))\
+        .filter(MapCells.cell_x.between(math.floor(float(west)) * factor, (math.floor(float(east)) + 1) * factor - 1))\
+        .filter(MapCells.cell_y.between(math.floor(float(north)) * factor, (math.floor(float(south)) + 1) * factor - 1))
+    if sport:
+        query = query.join(Activities, Activities.activity_id == MapCells.activity_id)\
+            .filter(Activities.sport == sport)
+    rows = query.group_by(cell_x, cell_y).all()
+
+    cells = []
+    for x, y, activities, points in rows:
+        lat, lon = mercator_lat_lon(x + 0.5, y + 0.5, level)
+        cells.append({
+            'x': int(x),
+            'y': int(y),
+            'lat': round(float(lat), 6),
+            'lon': round(float(lon), 6),
+            'activities': int(activities),
+            'points': int(points or 0),
+        })
+    return {
+        'mode': 'heatmap',
+        'zoom': zoom,
+        'cell_zoom': level,
+        'max_activities': max((cell['activities'] for cell in cells), default=0),
+        'cells': cells,
+    }
+
+@map_routes.route('/map', methods=['GET'])
+def get_map():
+    """
+    Retrieve the tracks or heatmap cells inside a map viewport.
+
+    Endpoint: GET /api/map
+
+    Query Parameters:
+        bbox: Viewport as minLon,minLat,maxLon,maxLat (required)
+        zoom: Map zoom level, 0-22 (default 12)
+        mode: 'tracks' (default) for simplified tracks or 'heatmap' for
+            activity counts per grid cell
+        sport: Only include this sport (optional)
+        limit: Maximum number of tracks in tracks mode (default 200, max 1000)
+
+    Returns:
+        JSON object with the tracks intersecting the viewport, newest first,
+        or the heatmap cells inside it
+    """
+    try:
+        bbox = parse_bbox(request.args['bbox'])
+    except (KeyError, ValueError):
+        return jsonify({"error": "Query parameter 'bbox' must be minLon,minLat,maxLon,maxLat"}), 400
+    zoom = request.args.get('zoom', 12, type=int)
+    if not 0 <= zoom <= MAX_ZOOM:
+        return jsonify({"error": f"Query parameter 'zoom' must be an integer between 0 and {MAX_ZOOM}"}), 400
+    mode = request.args.get('mode', 'tracks')
+    if mode not in MODES:
+        return jsonify({"error": f"Query parameter 'mode' must be one of {', '.join(MODES)}"}), 400
+    limit = min(max(request.args.get('limit', DEFAULT_TRACK_LIMIT, type=int), 1), MAX_TRACK_LIMIT)
+    sport = request.args.get('sport')
+
+    db = next(get_read_db())
+    try:
+        if mode == 'tracks':
+            key = ('map', mode, bbox, zoom, sport, limit)
+            builder = lambda: build_tracks(db, bbox, zoom, sport, limit)
+        else:
+            key = ('map', mode, bbox, zoom, sport)
+            builder = lambda: build_heatmap(db, bbox, zoom, sport)
+        return map_cache.response(key, latest_generation(db), builder)
+    except Exception as e:
+        logger.error(f"Error building map data: {e}")
+        return jsonify({"error": "Error building map data"}), 500
+    finally:
+        db.close()
@@ -0,0 +1,50 @@
+"""
+Request profile API endpoints.
+
+This module defines admin-only REST API endpoints for retrieving the reports
+captured by the request profiler. Every endpoint requires the X-Admin-Token
+header and returns data in JSON format with appropriate HTTP status codes.
+"""
+
+from flask import Blueprint, jsonify
+from backend.core.profiler import is_admin_request, profile_store
+import logging
+
+logger = logging.getLogger(__name__)
+profile_routes = Blueprint('profiles', __name__, url_prefix='/api')
+
+@profile_routes.before_request
+def require_admin():
+    """Reject requests that do not carry the profiler admin token."""
+    if not is_admin_request():
+        return jsonify({"error": "Admin token required"}), 403
+
+@profile_routes.route('/profiles', methods=['GET'])
+def list_profiles():
+    """
+    List the most recent profiling reports.
+    
+    Endpoint: GET /api/profiles
+    
+    Returns:
+        JSON array of report summaries, newest first
+    """
+    return jsonify(profile_store.summaries()), 200
+
+@profile_routes.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """
+    Retrieve a single profiling report.
+    
+    Endpoint: GET /api/profiles/<profile_id>
+    
+    Args:
+        profile_id: Id returned in the X-Profile-Id response header
+        
+    Returns:
+        JSON report with SQL statement timings and the top functions by cumulative time
+    """
+    report = profile_store.get(profile_id)
+    if report is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return jsonify(report), 200
@@ -6,14 +6,38 @@ including sleep duration, sleep stages, and sleep quality metrics.
 Each endpoint returns data in JSON format with appropriate HTTP status codes.
 """
 
-from flask import Blueprint, jsonify
-from backend.core.create_db import get_db
+from datetime import date
+from flask import Blueprint, jsonify, request
+from backend.core.create_db import get_read_db
+from backend.core.compression import snapshot_cache
+from backend.core.tenancy import owned_by
+from backend.data.change_log import latest_generation, read_latest_generation
+from backend.data.trends import WINDOWS, build_trends, trend_cache
 from backend.models.models import SleepMetrics
 import logging
 
 logger = logging.getLogger(__name__)
 sleep_routes = Blueprint('sleep', __name__, url_prefix='/api')
 
+def build_sleep_data():
+    """
+    Build the list of all sleep records.
+
+    Returns:
+        List of sleep record dictionaries in descending chronological order
+    """
+    db = next(get_read_db())
+    try:
+        sleep_records = db.query(SleepMetrics)\
+            .filter(owned_by(SleepMetrics))\
+            .order_by(SleepMetrics.date.desc())\
+            .all()
+        return [record.to_dict() for record in sleep_records]
+    finally:
+        db.close()
+
+snapshot_cache.register('sleep', build_sleep_data)
+
 @sleep_routes.route('/sleep', methods=['GET'])
 def get_sleep_data():
     """
@@ -24,14 +48,43 @@ def get_sleep_data():
     Returns:
         JSON array of sleep records in descending chronological order
     """
-    db = next(get_db())
     try:
-        sleep_records = db.query(SleepMetrics)\
-            .order_by(SleepMetrics.date.desc())\
-            .all()
-        return jsonify([record.to_dict() for record in sleep_records]), 200
+        return snapshot_cache.response('sleep', read_latest_generation())
     except Exception as e:
         logger.error(f"Error fetching sleep data: {e}")
         return jsonify({"error": "Failed to fetch sleep data"}), 500
+
+@sleep_routes.route('/sleep/trends', methods=['GET'])
+def get_sleep_trends():
+    """
+    Retrieve rolling sleep trends.
+    
+    Endpoint: GET /api/sleep/trends
+    
+    Query Parameters:
+        from: First date to include, YYYY-MM-DD (optional, defaults to 90 days before 'to')
+        to: Last date to include, YYYY-MM-DD (optional, defaults to the latest stored date)
+    
+    Returns:
+        JSON object with the dates and, for total sleep, sleep stages, awake time and respiration, the daily values,
+        7- and 28-day rolling means with min/max bands and week-over-week
+        deltas, as arrays aligned with the dates
+    """
+    try:
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({"error": "Dates must be formatted as YYYY-MM-DD"}), 400
+    
+    db = next(get_read_db())
+    try:
+        return trend_cache.response(
+            ('sleep', start, end, WINDOWS),
+            latest_generation(db),
+            lambda: build_trends(db, 'sleep', start, end)
+        )
+    except Exception as e:
+        logger.error(f"Error building sleep trends: {e}")
+        return jsonify({"error": "Failed to build sleep trends"}), 500
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
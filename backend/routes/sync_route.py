@@ -0,0 +1,132 @@
+"""
+Sync API endpoints.
+
+This module defines the endpoint starting a sync, optionally limited to a
+date range and some entities so a long backfill can run in resumable
+chunks, the per-entity checkpoints recording the dates synced so far, and
+a Server-Sent Events stream that pushes sync progress (current fetcher,
+dates processed, new activities) and "data changed" notifications naming
+the entities a sync touched, so clients can refetch only what changed
+instead of reloading every list.
+"""
+
+from datetime import date
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from backend.core.create_db import get_read_db
+from backend.core.events import event_bus
+from backend.core.tenancy import current_user_id
+from backend.data.checkpoints import checkpoint_summary
+from backend.data.sync import SYNC_ENTITIES, sync_all_data
+import logging
+
+logger = logging.getLogger(__name__)
+sync_routes = Blueprint('sync', __name__, url_prefix='/api')
+
+def load_checkpoints() -> dict:
+    """Return the requesting user's checkpoints, see checkpoint_summary()."""
+    db = next(get_read_db())
+    try:
+        return checkpoint_summary(db)
+    finally:
+        db.close()
+
+@sync_routes.route('/sync', methods=['POST'])
+def sync_data():
+    """
+    Synchronize the requesting user's data, resuming from the checkpoints.
+    
+    Endpoint: POST /api/sync
+    
+    Dates synced before are skipped, so repeating a request after a failure
+    continues where it stopped, and a long history can be backfilled in
+    chunks of a few months per request.
+    
+    Query Parameters:
+        from: First date to sync, YYYY-MM-DD (optional; default: the earliest
+            date with data for health, 180 days back for sleep, and only the
+            most recent activities)
+        to: Last date to sync, YYYY-MM-DD (optional, default today)
+        entities: Comma-separated subset of activities, health and sleep
+            (default: all)
+        restart: 'true' to refetch dates already synced
+    
+    Returns:
+        JSON response with the sync status and the checkpoints afterwards
+    """
+    try:
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({"error": "Dates must be formatted as YYYY-MM-DD"}), 400
+    if start and end and start > end:
+        return jsonify({"error": "'from' must not be after 'to'"}), 400
+    
+    entities = [entity.strip() for entity in request.args.get('entities', ','.join(SYNC_ENTITIES)).split(',')
+                if entity.strip()]
+    unknown = [entity for entity in entities if entity not in SYNC_ENTITIES]
+    if unknown or not entities:
+        return jsonify({"error": f"Query parameter 'entities' must list some of {', '.join(SYNC_ENTITIES)}"}), 400
+    restart = request.args.get('restart', 'false').lower() == 'true'
+    
+    logger.info(f"Sync requested for {', '.join(entities)} from {start or 'default'} to {end or 'today'}")
+    success = sync_all_data(force=restart, start_date=start, end_date=end, entities=entities)
+    return jsonify({
+        "status": "success" if success else "error",
+        "entities": entities,
+        "from": start.isoformat() if start else None,
+        "to": end.isoformat() if end else None,
+        "checkpoints": load_checkpoints(),
+    }), 200 if success else 500
+
+@sync_routes.route('/sync/checkpoints', methods=['GET'])
+def get_checkpoints():
+    """
+    Retrieve the dates synced so far.
+    
+    Endpoint: GET /api/sync/checkpoints
+    
+    Returns:
+        JSON object mapping each entity to its synced date spans
+        ({"from", "to", "updated_at"}), oldest first
+    """
+    try:
+        return jsonify(load_checkpoints())
+    except Exception as e:
+        logger.error(f"Error fetching sync checkpoints: {e}")
+        return jsonify({"error": "Failed to fetch sync checkpoints"}), 500
+
+@sync_routes.route('/sync/stream', methods=['GET'])
+def stream_sync_events():
+    """
+    Stream sync events to the client.
+    
+    Endpoint: GET /api/sync/stream
+    
+    Event types:
+        sync: {"state": "started" | "finished", "success", "error"}
+        progress: {"phase", ...} e.g. the date processed or the new activity id
+        changed: {"entities": {"activities": 1, "health": 7, ...}, "generation"}
+            once the changes are served by /api/changes up to "generation"
+    
+    Only the events of the requesting user's syncs are streamed. Clients
+    reconnecting with the Last-Event-ID header receive the events they
+    missed while disconnected, as long as they are still in the history.
+    
+    Returns:
+        text/event-stream response
+    """
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    try:
+        last_event_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        last_event_id = None
+    
+    logger.debug(f"SSE client connected (last event id {last_event_id})")
+    return Response(
+        stream_with_context(event_bus.stream(last_event_id, current_user_id())),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Disable proxy buffering (nginx)
+        }
+    )
@@ -0,0 +1,57 @@
+"""
+Training load API endpoints.
+
+This module serves the daily fitness (CTL), fatigue (ATL) and form (TSB)
+series maintained by the training load model at sync time.
+"""
+
+from datetime import date
+from flask import Blueprint, jsonify, request
+from backend.core.config import Config
+from backend.core.create_db import get_read_db
+from backend.core.tenancy import owned_by
+from backend.models.models import TrainingLoad
+import logging
+
+logger = logging.getLogger(__name__)
+training_load_routes = Blueprint('training_load', __name__, url_prefix='/api')
+
+@training_load_routes.route('/training_load', methods=['GET'])
+def get_training_load():
+    """
+    Retrieve the daily training load series.
+
+    Endpoint: GET /api/training_load
+
+    Query Parameters:
+        from: First date to include, YYYY-MM-DD (optional)
+        to: Last date to include, YYYY-MM-DD (optional)
+
+    Returns:
+        JSON object with the ATL and CTL time constants in days and a list of
+        days, oldest first, each with the day's load, ATL, CTL and TSB
+    """
+    try:
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({"error": "Dates must be formatted as YYYY-MM-DD"}), 400
+
+    db = next(get_read_db())
+    try:
+        query = db.query(TrainingLoad).filter(owned_by(TrainingLoad))
+        if start:
+            query = query.filter(TrainingLoad.date >= start)
+        if end:
+            query = query.filter(TrainingLoad.date <= end)
+        days = query.order_by(TrainingLoad.date).all()
+        return jsonify({
+            'atl_days': Config.ATL_DAYS,
+            'ctl_days': Config.CTL_DAYS,
+            'days': [day.to_dict() for day in days],
+        })
+    except Exception as e:
+        logger.error(f"Database error: {e}")
+        return jsonify({"error": "Database error"}), 500
+    finally:
+        db.close()
@@ -0,0 +1,61 @@
+"""Tests for the personal records and streaks."""
+
+from datetime import date, datetime
+from backend.data.achievements import (
+    ALL_SPORTS, CURRENT_STREAK, LONGEST_STREAK, load_achievements, rebuild_achievements,
+    update_achievements, update_streaks,
+)
+from backend.models.models import Activities
+
+
+def store(db, *days: int, distance: float = 5.0) -> None:
+    """Store one activity per day of January 2024 and update the achievements like a sync."""
+    rows = load_achievements(db)
+    for day in days:
+        activity = Activities(activity_id=f"{day}-{distance}", start_time=datetime(2024, 1, day, 8),
+                              sport='running', distance=distance)
+        db.add(activity)
+        update_achievements(db, activity, rows)
+    update_streaks(db, min(date(2024, 1, day) for day in days))
+    db.commit()
+
+def streak(db, category: str) -> tuple:
+    row = load_achievements(db)[(category, ALL_SPORTS)]
+    return row.streak_start.day, row.streak_end.day, row.value
+
+
+def test_new_days_extend_or_restart_the_current_streak(db):
+    store(db, 1, 2, 3)
+    store(db, 4)
+    assert streak(db, CURRENT_STREAK) == (1, 4, 4)
+
+    store(db, 7, 8)
+    assert streak(db, CURRENT_STREAK) == (7, 8, 2)
+    assert streak(db, LONGEST_STREAK) == (1, 4, 4)
+
+def test_backfilled_days_join_earlier_streaks(db):
+    store(db, 1, 2)
+    store(db, 4, 5)
+    store(db, 3)
+
+    assert streak(db, CURRENT_STREAK) == (1, 5, 5)
+    assert streak(db, LONGEST_STREAK) == (1, 5, 5)
+
+def test_records_keep_the_best_activity(db):
+    store(db, 1, distance=10.0)
+    store(db, 2, distance=5.0)
+
+    record = load_achievements(db)[('longest_distance', 'running')]
+    assert (record.value, record.activity_id) == (10.0, '1-10.0')
+
+def test_incremental_updates_match_a_rebuild(db):
+    store(db, 10, 11, 12)
+    store(db, 2, 3, 5, 6, 7, 8)
+    store(db, 4, 13, 20)
+    incremental = {key: (row.value, row.streak_start, row.streak_end) for key, row in load_achievements(db).items()}
+
+    rebuild_achievements(db)
+    db.commit()
+
+    assert {key: (row.value, row.streak_start, row.streak_end)
+            for key, row in load_achievements(db).items()} == incremental
@@ -0,0 +1,39 @@
+"""Tests for the best effort search."""
+
+import numpy as np
+import pytest
+from backend.data.best_efforts import best_distance_effort, best_duration_effort
+
+
+@pytest.fixture
+def steady_with_surge():
+    # One point per second at 4 m/s, with a 100 s surge at 8 m/s from 500 s
+    speeds = np.full(1000, 4.0)
+    speeds[500:600] = 8.0
+    elapsed = np.arange(1001, dtype=float)
+    distance = np.concatenate(([0.0], np.cumsum(speeds)))
+    return elapsed, distance
+
+def test_fastest_distance_is_found_in_the_surge(steady_with_surge):
+    seconds, start, end = best_distance_effort(*steady_with_surge, 400)
+
+    assert seconds == pytest.approx(50)
+    assert 500 <= start and end <= 600
+
+def test_distance_effort_interpolates_between_points(steady_with_surge):
+    elapsed, distance = steady_with_surge
+
+    seconds, _, _ = best_distance_effort(elapsed[::10], distance[::10], 1000)
+
+    # 800 m in the surge plus 200 m at 4 m/s
+    assert seconds == pytest.approx(150)
+
+def test_longest_distance_in_a_duration(steady_with_surge):
+    meters, start, end = best_duration_effort(*steady_with_surge, 60)
+
+    assert meters == pytest.approx(480)
+    assert 500 <= start and end <= 600
+
+def test_targets_beyond_the_track_have_no_effort(steady_with_surge):
+    assert best_distance_effort(*steady_with_surge, 10000) is None
+    assert best_duration_effort(*steady_with_surge, 3600) is None
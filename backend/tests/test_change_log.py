@@ -0,0 +1,148 @@
+"""Tests for the change feed and the generation served to clients."""
+
+from datetime import datetime, timedelta
+from backend.core.tenancy import user_scope
+from backend.data import change_log
+from backend.data.change_log import changes_page, changes_since, latest_generation, record_change, sync_generation
+from backend.models.models import SyncGeneration
+
+
+def write(db, key: str, operation: str = 'insert', entity: str = 'health') -> None:
+    record_change(db, entity, key, operation)
+    db.commit()
+
+def feed(db, since: int = 0) -> dict:
+    return changes_since(db, since, latest_generation(db))
+
+
+def test_generation_moves_once_the_sync_finishes(db):
+    with sync_generation() as generation:
+        write(db, '2024-01-01')
+        assert latest_generation(db) == 0
+        assert feed(db)['health'] == {}
+
+    assert latest_generation(db) == generation
+    assert feed(db)['health'] == {'2024-01-01': 'insert'}
+
+def test_older_running_sync_holds_back_newer_finished_ones(db):
+    older = change_log._start_generation()
+    with sync_generation() as newer:
+        write(db, '2024-01-02')
+    assert newer > older and latest_generation(db) == 0
+
+    # Rows the older sync commits late are still delivered to a client that
+    # already holds the served generation
+    token = change_log.current_generation.set(older)
+    try:
+        write(db, '2024-01-01')
+    finally:
+        change_log.current_generation.reset(token)
+    change_log._finish_generation(older, True)
+
+    assert latest_generation(db) == newer
+    assert feed(db)['health'] == {'2024-01-01': 'insert', '2024-01-02': 'insert'}
+
+def test_abandoned_generation_stops_holding_back(db):
+    abandoned = change_log._start_generation()
+    db.query(SyncGeneration).filter_by(generation=abandoned)\
+        .update({'started_at': datetime.utcnow() - change_log.ABANDONED_AFTER - timedelta(minutes=1)})
+    db.commit()
+
+    with sync_generation() as generation:
+        write(db, '2024-01-01')
+
+    assert latest_generation(db) == generation
+
+def test_writes_outside_a_sync_get_a_generation_per_transaction(db):
+    record_change(db, 'health', '2024-01-01', 'insert')
+    assert latest_generation(db) == 0
+    db.commit()
+    first = latest_generation(db)
+    assert first > 0
+
+    record_change(db, 'health', '2024-01-02', 'insert')
+    db.rollback()
+    write(db, '2024-01-03')
+
+    assert latest_generation(db) > first
+    assert feed(db, first)['health'] == {'2024-01-03': 'insert'}
+
+def test_changes_collapse_to_one_operation_per_row(db):
+    with sync_generation() as first:
+        write(db, '1', 'insert', 'activities')
+        write(db, '2', 'insert', 'activities')
+    with sync_generation():
+        write(db, '1', 'update', 'activities')
+        write(db, '2', 'delete', 'activities')
+        write(db, '3', 'update', 'activities')
+
+    assert feed(db)['activities'] == {'1': 'insert', '2': 'delete', '3': 'update'}
+    assert feed(db, first)['activities'] == {'1': 'update', '2': 'delete', '3': 'update'}
+    assert feed(db, latest_generation(db)) == {'activities': {}, 'health': {}, 'sleep': {}}
+
+def test_generations_are_served_per_user(db):
+    with user_scope(2):
+        running = change_log._start_generation()
+
+    with sync_generation() as generation:
+        write(db, '2024-01-01')
+
+    assert latest_generation(db) == generation
+    with user_scope(2):
+        assert latest_generation(db) == 0
+        assert feed(db)['health'] == {}
+    change_log._finish_generation(running, True)
+
+def test_pages_end_on_generation_boundaries(db):
+    generations = []
+    for day in range(1, 4):
+        with sync_generation() as generation:
+            write(db, f'2024-01-0{day}')
+            write(db, f'2024-02-0{day}')
+        generations.append(generation)
+    until = latest_generation(db)
+
+    changes, continuation = changes_page(db, 0, until, limit=4)
+    assert continuation == (generations[1], None)
+    assert sorted(changes['health']) == ['2024-01-01', '2024-01-02', '2024-02-01', '2024-02-02']
+
+    changes, continuation = changes_page(db, generations[1], until, limit=4)
+    assert continuation is None
+    assert sorted(changes['health']) == ['2024-01-03', '2024-02-03']
+
+def test_large_generations_are_split_with_the_change_id(db):
+    with sync_generation() as generation:
+        for day in range(1, 6):
+            write(db, f'2024-01-0{day}')
+    until = latest_generation(db)
+
+    seen, since, after = [], 0, None
+    while True:
+        changes, continuation = changes_page(db, since, until, after, limit=2)
+        seen += list(changes['health'])
+        if continuation is None:
+            break
+        since, after = continuation
+        assert since == generation and after is not None
+    assert seen == [f'2024-01-0{day}' for day in range(1, 6)]
+
+def test_changes_route_pages_until_caught_up(db, monkeypatch):
+    from flask import Flask
+    from backend.core.config import Config
+    from backend.routes.changes_route import change_routes
+
+    for day in range(1, 4):
+        with sync_generation():
+            write(db, f'2024-01-0{day}')
+    monkeypatch.setattr(Config, 'CHANGES_PAGE_SIZE', 2)
+    app = Flask(__name__)
+    app.register_blueprint(change_routes)
+    client = app.test_client()
+
+    first = client.get('/api/changes?since=0').get_json()
+    assert first['more'] and first['next_after'] is None
+    second = client.get(f"/api/changes?since={first['next_since']}").get_json()
+    assert not second['more'] and second['next_since'] == second['generation'] == latest_generation(db)
+    # Only the changes were recorded, so the missing rows are reported as deleted
+    assert first['health']['deleted'] + second['health']['deleted'] == ['2024-01-01', '2024-01-02', '2024-01-03']
+    assert client.get('/api/changes?since=0&after=-1').status_code == 400
@@ -0,0 +1,89 @@
+"""Tests for the resumable sync checkpoints."""
+
+from datetime import date, timedelta
+from backend.core.config import Config
+from backend.core.tenancy import user_scope
+from backend.data.checkpoints import Checkpoint, day_chunks, load_spans, merge_spans, missing_days, refetch_start
+from backend.models.models import SyncCheckpoint
+
+D = date(2024, 3, 1)
+
+def days(first: int, last: int) -> list:
+    return [D + timedelta(days=offset) for offset in range(first, last + 1)]
+
+
+def test_merge_spans_joins_overlapping_and_adjacent_spans():
+    spans = [(D + timedelta(days=10), D + timedelta(days=12)),
+             (D, D + timedelta(days=2)),
+             (D + timedelta(days=3), D + timedelta(days=4)),
+             (D + timedelta(days=1), D + timedelta(days=1)),
+             (D + timedelta(days=6), D + timedelta(days=11))]
+
+    assert merge_spans(spans) == [(D, D + timedelta(days=4)), (D + timedelta(days=6), D + timedelta(days=12))]
+    assert merge_spans([]) == []
+
+def test_missing_days_lists_the_uncovered_days():
+    spans = [(D + timedelta(days=2), D + timedelta(days=3)), (D + timedelta(days=6), D + timedelta(days=20))]
+
+    assert missing_days(spans, D, D + timedelta(days=9)) == days(0, 1) + days(4, 5)
+    assert missing_days([], D, D + timedelta(days=2)) == days(0, 2)
+    assert missing_days([(D - timedelta(days=5), D + timedelta(days=5))], D, D + timedelta(days=5)) == []
+
+def test_day_chunks_split_at_gaps_and_size():
+    chunks = day_chunks(days(0, 4) + days(7, 8), 3)
+
+    assert chunks == [days(0, 2), days(3, 4), days(7, 8)]
+
+def test_checkpoint_skips_saved_days_and_retries_failed_ones(db):
+    start = refetch_start() - timedelta(days=10)
+    end = refetch_start() - timedelta(days=1)
+    checkpoint = Checkpoint('health', start, end)
+    assert len(checkpoint.days) == 10
+
+    # The fifth day failed and is not marked
+    checkpoint.done(*[day for day in checkpoint.days if day != start + timedelta(days=4)])
+    checkpoint.commit()
+
+    assert Checkpoint('health', start, end).days == [start + timedelta(days=4)]
+    assert Checkpoint('health', start, end, force=True).days == checkpoint.days
+    assert Checkpoint('sleep', start, end).days == checkpoint.days
+
+def test_recent_days_are_never_recorded(db):
+    today = date.today()
+    checkpoint = Checkpoint('health', today - timedelta(days=9), today)
+
+    checkpoint.done(*checkpoint.days)
+    checkpoint.commit()
+
+    assert load_spans(db, 'health') == [(today - timedelta(days=9), refetch_start() - timedelta(days=1))]
+    assert len(Checkpoint('health', today - timedelta(days=9), today).days) == Config.SYNC_REFETCH_DAYS
+
+def test_spans_reaching_into_the_refetch_window_are_clipped(db):
+    today = date.today()
+    db.add(SyncCheckpoint(entity='sleep', start_date=today - timedelta(days=30), end_date=today))
+    db.commit()
+
+    assert Checkpoint('sleep', today - timedelta(days=30), today).days == \
+        [refetch_start() + timedelta(days=offset) for offset in range(Config.SYNC_REFETCH_DAYS)]
+
+def test_save_keeps_spans_saved_by_another_sync(db):
+    start = refetch_start() - timedelta(days=20)
+    first = Checkpoint('activities', start, start + timedelta(days=9))
+    second = Checkpoint('activities', start + timedelta(days=10), start + timedelta(days=19))
+
+    first.done(*first.days)
+    second.done(*second.days)
+    first.commit()
+    second.commit()
+
+    assert load_spans(db, 'activities') == [(start, start + timedelta(days=19))]
+
+def test_checkpoints_are_kept_per_user(db):
+    start = refetch_start() - timedelta(days=5)
+    with user_scope(2):
+        checkpoint = Checkpoint('health', start, start + timedelta(days=4))
+        checkpoint.done(*checkpoint.days)
+        checkpoint.commit()
+        assert Checkpoint('health', start, start + timedelta(days=4)).days == []
+
+    assert len(Checkpoint('health', start, start + timedelta(days=4)).days) == 5
@@ -0,0 +1,43 @@
+"""Tests for aligning two activities by distance."""
+
+import numpy as np
+import pytest
+from backend.data.comparison import MAX_POINTS, align_tracks
+from backend.data.tracks import TRACK_SCALES, with_derived
+
+
+def steady_track(speed: float, meters: float, heart_rate: float) -> dict:
+    """Build a derived track at a constant speed in m/s, one point per second."""
+    seconds = np.arange(0.0, meters / speed + 1)
+    track = {name: np.full(seconds.size, np.nan) for name in TRACK_SCALES}
+    track['timestamp'] = 1.7e9 + seconds
+    track['distance'] = seconds * speed / 1000
+    track['speed'] = np.full(seconds.size, speed * 3.6)
+    track['heart_rate'] = np.full(seconds.size, heart_rate)
+    return with_derived(track)
+
+
+def test_tracks_are_compared_at_equal_distances():
+    comparison = align_tracks(steady_track(4.0, 2000, 150), steady_track(5.0, 3000, 160), step=100)
+
+    assert comparison['distance'][0] == 0 and comparison['distance'][-1] == 2000
+    assert comparison['distance'][10] == 1000
+    assert comparison['elapsed']['a'][10] == pytest.approx(250)
+    assert comparison['elapsed']['b'][10] == pytest.approx(200)
+    # B is ahead, so the gap is negative
+    assert comparison['time_gap'][10] == pytest.approx(-50)
+    assert comparison['summary']['final_gap_s'] == pytest.approx(-100)
+    assert comparison['speed']['delta'][10] == pytest.approx(3.6, abs=0.05)
+    assert comparison['summary']['mean_hr_delta'] == pytest.approx(10)
+
+def test_step_is_widened_for_long_tracks():
+    comparison = align_tracks(steady_track(10.0, 200000, 140), steady_track(10.0, 200000, 140), step=1)
+
+    assert comparison['step_m'] > 1
+    assert len(comparison['distance']) <= MAX_POINTS
+    assert comparison['summary']['max_gap_s'] == pytest.approx(0)
+
+def test_tracks_without_distance_cannot_be_compared():
+    empty = {name: np.full(1, np.nan) for name in TRACK_SCALES}
+
+    assert align_tracks(with_derived(empty), steady_track(4.0, 1000, 150)) is None
@@ -0,0 +1,82 @@
+"""Tests for the precompressed snapshot cache."""
+
+import gzip
+import json
+import threading
+import time
+import pytest
+from flask import Flask
+from backend.core.compression import SnapshotCache
+from backend.core.tenancy import user_scope
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+@pytest.fixture
+def builds():
+    return []
+
+@pytest.fixture
+def cache(builds):
+    cache = SnapshotCache()
+
+    def build():
+        builds.append(None)
+        time.sleep(0.2)
+        return {'build': len(builds)}
+
+    cache.register('items', build)
+    return cache
+
+def fetch_concurrently(app, cache, generation: int, requests: int = 5) -> list:
+    results = []
+
+    def fetch():
+        with app.test_request_context('/'):
+            results.append(json.loads(cache.get('items', generation)['identity']))
+
+    threads = [threading.Thread(target=fetch) for _ in range(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_requests_build_a_missing_snapshot_once(app, cache, builds):
+    assert fetch_concurrently(app, cache, 1) == [{'build': 1}] * 5
+    assert len(builds) == 1
+
+def test_a_newer_generation_is_rebuilt_once_while_the_stale_snapshot_is_served(app, cache, builds):
+    fetch_concurrently(app, cache, 1, requests=1)
+
+    results = fetch_concurrently(app, cache, 2)
+
+    assert len(builds) == 2
+    assert results.count({'build': 2}) == 1 and results.count({'build': 1}) == 4
+    assert fetch_concurrently(app, cache, 2, requests=1) == [{'build': 2}]
+
+def test_an_older_generation_keeps_the_snapshot(app, cache, builds):
+    fetch_concurrently(app, cache, 3, requests=1)
+    fetch_concurrently(app, cache, 2, requests=1)
+
+    assert len(builds) == 1
+
+def test_snapshots_are_kept_per_user(app, cache, builds):
+    with app.test_request_context('/'):
+        cache.get('items', 1)
+        with user_scope(2):
+            cache.get('items', 1)
+    assert len(builds) == 2
+
+def test_response_serves_the_negotiated_encoding_and_etag(app, cache):
+    with app.test_request_context('/', headers={'Accept-Encoding': 'gzip'}):
+        response = cache.response('items', 1)
+        etag = response.get_etag()[0]
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(response.get_data())) == {'build': 1}
+
+    with app.test_request_context('/', headers={'If-None-Match': f'"{etag}"'}):
+        assert cache.response('items', 1).status_code == 304
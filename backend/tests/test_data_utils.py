@@ -0,0 +1,53 @@
+"""Tests for the FIT and GPX track parsers."""
+
+import pytest
+from benchmarks.fake_garmin import FakeGarminConnect
+from backend.utils.data_utils import parse_fit, parse_gpx
+
+
+@pytest.fixture(scope='module')
+def fake():
+    return FakeGarminConnect(days=30, records_per_activity=20)
+
+def _activity_id(fake, sport: str, fit: bool = True) -> int:
+    return next(activity['activityId'] for activity in fake._activities
+                if activity['activityType']['typeKey'] == sport and fake.has_fit(activity['activityId']) == fit)
+
+def test_parse_fit_round_trips_record_fields(fake):
+    activity_id = _activity_id(fake, 'cycling')
+    points = fake.track_points(activity_id)
+    parsed = parse_fit(fake.download_activity(activity_id, fake.ActivityDownloadFormat.ORIGINAL))
+
+    assert len(parsed) == len(points)
+    for point, record in zip(points, parsed):
+        assert record['time'] == point['time'].replace(microsecond=0)
+        # Degrees, not semicircles
+        assert record['lat'] == pytest.approx(point['lat'], abs=1e-6)
+        assert record['lon'] == pytest.approx(point['lon'], abs=1e-6)
+        assert record['ele'] == pytest.approx(point['ele'], abs=0.2)
+        assert record['hr'] == point['hr']
+        assert record['speed'] == pytest.approx(point['speed'] * 3.6, abs=0.01)
+        assert record['distance'] == pytest.approx(point['distance'], abs=1e-4)
+        assert record['cadence'] == point['cadence']
+        assert record['power'] == point['power']
+        assert record['temp'] == point['temp']
+
+def test_parse_fit_leaves_unrecorded_fields_empty(fake):
+    activity_id = _activity_id(fake, 'running')
+    parsed = parse_fit(fake.download_activity(activity_id, fake.ActivityDownloadFormat.ORIGINAL))
+
+    assert parsed and all(record['power'] is None for record in parsed)
+
+def test_parse_gpx_speed_is_km_per_hour(fake):
+    activity_id = _activity_id(fake, 'running', fit=False)
+    points = fake.track_points(activity_id)
+    parsed = parse_gpx(fake.download_activity(activity_id, fake.ActivityDownloadFormat.GPX))
+
+    assert [record['speed'] for record in parsed] == pytest.approx([point['speed'] * 3.6 for point in points])
+    assert [(record['lat'], record['lon']) for record in parsed] == [(point['lat'], point['lon']) for point in points]
+
+def test_activity_without_fit_file_is_rejected(fake):
+    activity_id = _activity_id(fake, 'running', fit=False)
+
+    with pytest.raises(Exception):
+        fake.download_activity(activity_id, fake.ActivityDownloadFormat.ORIGINAL)
@@ -0,0 +1,49 @@
+"""Tests for the streamed bulk exports."""
+
+import json
+import pytest
+from datetime import datetime
+from flask import Flask
+from backend.models.models import Activities
+from backend.routes import export_route
+
+
+@pytest.fixture
+def client(db):
+    for day in range(1, 4):
+        db.add(Activities(activity_id=str(day), start_time=datetime(2024, 1, day, 8), sport='running', distance=5.0))
+    db.commit()
+    app = Flask(__name__)
+    app.register_blueprint(export_route.export_routes)
+    return app.test_client()
+
+def test_export_streams_every_row(client):
+    response = client.get('/api/export/activities')
+
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['activity_id'] for row in rows] == ['1', '2', '3']
+    assert 'user_id' not in rows[0]
+
+def test_csv_export_starts_with_the_header(client):
+    lines = client.get('/api/export/activities?format=csv&from=2024-01-02').get_data(as_text=True).splitlines()
+
+    assert lines[0].split(',') == export_route.export_fields('activities')
+    assert len(lines) == 3
+
+@pytest.mark.parametrize('export_format', ['ndjson', 'csv'])
+def test_failure_midway_aborts_the_stream(client, monkeypatch, export_format):
+    def failing_rows(db, entity, start=None, end=None):
+        yield [['1'] + [None] * (len(export_route.export_fields(entity)) - 1)]
+        raise RuntimeError('connection lost')
+
+    monkeypatch.setattr(export_route, 'export_rows', failing_rows)
+    response = client.get(f'/api/export/activities?format={export_format}', buffered=False)
+    assert response.status_code == 200
+
+    chunks = []
+    with pytest.raises(RuntimeError, match='connection lost'):
+        for chunk in response.response:
+            chunks.append(chunk)
+    # The rows read before the failure were sent, followed by the error trailer
+    assert len(chunks) > 1
+    assert chunks[-1].decode() == export_route.ERROR_TRAILERS[export_format]
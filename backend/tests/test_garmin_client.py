@@ -0,0 +1,38 @@
+"""Tests for the per-user Garmin Connect rate limiter."""
+
+import asyncio
+import time
+from backend.core.garmin_client import RateLimiter
+
+
+def timed(acquire, calls: int) -> float:
+    started = time.monotonic()
+    for _ in range(calls):
+        acquire()
+    return time.monotonic() - started
+
+def test_burst_is_allowed_at_once():
+    limiter = RateLimiter(per_minute=60, burst=5)
+
+    assert timed(limiter.acquire, 5) < 0.05
+
+def test_calls_beyond_the_burst_wait_for_tokens():
+    limiter = RateLimiter(per_minute=600, burst=2)
+
+    # Two calls from the burst, then one every 0.1 s
+    assert 0.25 <= timed(limiter.acquire, 5) < 0.6
+
+def test_zero_rate_means_no_limit():
+    limiter = RateLimiter(per_minute=0, burst=1)
+
+    assert timed(limiter.acquire, 1000) < 0.05
+
+def test_async_acquire_shares_the_bucket():
+    limiter = RateLimiter(per_minute=600, burst=1)
+
+    async def acquire_all():
+        await asyncio.gather(*(limiter.acquire_async() for _ in range(4)))
+
+    started = time.monotonic()
+    asyncio.run(acquire_all())
+    assert 0.25 <= time.monotonic() - started < 0.6
@@ -0,0 +1,22 @@
+"""Tests that importing the backend does no startup work, see benchmarks/startup.py."""
+
+import pytest
+from benchmarks.startup import DEFAULT_BUDGET_MS, run_probe
+
+
+@pytest.fixture(scope='module')
+def probe():
+    return run_probe(importtime=False)[0]
+
+def test_import_creates_no_engine(probe):
+    assert not probe['engine_created']
+
+def test_import_does_not_log_in_to_garmin(probe):
+    assert not probe['garminconnect_imported']
+    assert not probe['garmin_logged_in']
+
+def test_import_installs_no_logging_handlers(probe):
+    assert not probe['logging_configured']
+
+def test_import_stays_within_the_time_budget(probe):
+    assert probe['import_ms'] <= DEFAULT_BUDGET_MS
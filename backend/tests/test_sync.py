@@ -0,0 +1,63 @@
+"""Tests for the change notifications published after a sync."""
+
+import queue
+import pytest
+from backend.core.events import event_bus
+from backend.data import change_log
+from backend.data.change_log import latest_generation, record_change, sync_generation
+from backend.data.sync import announce_changes
+
+
+@pytest.fixture
+def events():
+    subscriber = event_bus.subscribe()
+    yield subscriber
+    event_bus.unsubscribe(subscriber)
+
+def changed_events(subscriber) -> list:
+    published = []
+    while True:
+        try:
+            _, event, data = subscriber.get_nowait()
+        except queue.Empty:
+            return published
+        if event == 'changed':
+            published.append(data)
+
+def write(db, entity: str, key: str) -> None:
+    record_change(db, entity, key, 'insert')
+    db.commit()
+
+
+def test_finished_sync_announces_the_served_generation(db, events):
+    with sync_generation() as generation:
+        write(db, 'health', '2024-01-01')
+    announce_changes(generation)
+
+    assert changed_events(events) == [{'entities': {'health': 1}, 'generation': generation}]
+
+def test_sync_finishing_before_an_older_one_waits_for_it(db, events):
+    older = change_log._start_generation()
+    with sync_generation() as newer:
+        write(db, 'health', '2024-01-01')
+    announce_changes(newer)
+    assert changed_events(events) == []
+
+    token = change_log.current_generation.set(older)
+    try:
+        write(db, 'sleep', '2024-01-01')
+    finally:
+        change_log.current_generation.reset(token)
+    change_log._finish_generation(older, True)
+    announce_changes(older)
+
+    # The generation announced is the one /api/changes serves, covering both syncs
+    assert latest_generation(db) == newer
+    assert changed_events(events) == [{'entities': {'health': 1, 'sleep': 1}, 'generation': newer}]
+
+def test_sync_without_changes_announces_nothing(db, events):
+    with sync_generation() as generation:
+        pass
+    announce_changes(generation)
+
+    assert changed_events(events) == []
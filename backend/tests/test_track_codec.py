@@ -0,0 +1,58 @@
+"""Tests for the columnar track codec."""
+
+import numpy as np
+import pytest
+from backend.utils.track_codec import MAGIC, TrackCodecError, decode_track, encode_track
+
+
+def test_round_trip_keeps_values_at_the_column_scale():
+    rng = np.random.default_rng(1)
+    columns = {
+        'timestamp': 1.7e9 + np.cumsum(rng.uniform(0.5, 2.0, 500)),
+        'position_lat': 60.17 + np.cumsum(rng.normal(0, 1e-5, 500)),
+        'heart_rate': rng.integers(90, 190, 500).astype(float),
+    }
+    scales = {'timestamp': 1000, 'position_lat': 1e7, 'heart_rate': 1}
+
+    count, decoded = decode_track(encode_track(columns, scales))
+
+    assert count == 500
+    assert list(decoded) == list(columns)
+    for name, values in columns.items():
+        np.testing.assert_allclose(decoded[name], values, rtol=0, atol=0.51 / scales[name])
+
+def test_round_trip_keeps_missing_values():
+    columns = {'altitude': np.array([np.nan, 10.0, np.nan, np.nan, 12.5, 11.0, np.nan, np.nan, np.nan])}
+
+    count, decoded = decode_track(encode_track(columns, {'altitude': 10}))
+
+    assert count == 9
+    np.testing.assert_array_equal(np.isnan(decoded['altitude']), np.isnan(columns['altitude']))
+    np.testing.assert_allclose(decoded['altitude'][~np.isnan(decoded['altitude'])], [10.0, 12.5, 11.0])
+
+def test_round_trip_of_empty_and_all_missing_columns():
+    count, decoded = decode_track(encode_track({'speed': np.array([])}, {'speed': 1000}))
+    assert count == 0 and decoded['speed'].size == 0
+
+    count, decoded = decode_track(encode_track({'power': np.full(4, np.nan)}, {'power': 1}))
+    assert count == 4 and np.isnan(decoded['power']).all()
+
+def test_large_jumps_widen_the_delta_type():
+    columns = {'distance': np.array([0.0, 1.0, 5e6, 5e6 + 1.0])}
+
+    _, decoded = decode_track(encode_track(columns, {'distance': 1000}))
+
+    np.testing.assert_allclose(decoded['distance'], columns['distance'])
+
+def test_columns_of_different_length_are_rejected():
+    with pytest.raises(TrackCodecError):
+        encode_track({'a': np.zeros(3), 'b': np.zeros(4)}, {'a': 1, 'b': 1})
+
+@pytest.mark.parametrize('blob', [
+    b'not a track',
+    MAGIC + bytes([99]) + b'payload',
+    MAGIC + bytes([1]) + b'not zlib',
+])
+def test_invalid_blobs_are_rejected(blob):
+    with pytest.raises(TrackCodecError):
+        decode_track(blob)
@@ -0,0 +1,23 @@
+"""Tests for the rolling trend statistics."""
+
+import numpy as np
+from backend.data.trends import rolling_stats
+
+
+def test_rolling_stats_over_a_full_series():
+    stats = rolling_stats(np.arange(1.0, 8.0), 3)
+
+    # The first window holds one day, fewer than half of three
+    np.testing.assert_allclose(stats['mean'], [np.nan, 1.5, 2, 3, 4, 5, 6])
+    np.testing.assert_allclose(stats['min'], [np.nan, 1, 1, 2, 3, 4, 5])
+    np.testing.assert_allclose(stats['max'], [np.nan, 2, 3, 4, 5, 6, 7])
+
+def test_windows_need_data_on_half_of_their_days():
+    values = np.array([4.0, np.nan, np.nan, np.nan, 8.0, 6.0])
+
+    stats = rolling_stats(values, 4)
+
+    # Only the window ending on the last day holds two values
+    np.testing.assert_allclose(stats['mean'], [np.nan] * 5 + [7])
+    np.testing.assert_allclose(stats['min'], [np.nan] * 5 + [6])
+    np.testing.assert_allclose(stats['max'], [np.nan] * 5 + [8])
@@ -3,10 +3,14 @@ Utility functions for data processing and conversion.
 
 This module provides helper functions for parsing and transforming
 data from various formats, handling type conversions safely, and
-processing specialized data formats like GPX.
+processing specialized data formats like GPX and FIT.
 """
 
+import io
 import logging
+import os
+import tempfile
+import zipfile
 import xml.etree.ElementTree as ET
 from datetime import datetime, time
 from typing import Dict, List, Optional, Any
@@ -101,7 +105,8 @@ def parse_gpx(gpx_data: str) -> List[Dict[str, Any]]:
         gpx_data: String containing GPX XML data
         
     Returns:
-        List of dictionaries containing parsed track point data
+        List of dictionaries containing parsed track point data, with
+        'speed' converted from the GPX meters per second to km/h
     """
     if not gpx_data:
         logger.warning("Empty GPX data provided")
@@ -132,10 +137,11 @@ def parse_gpx(gpx_data: str) -> List[Dict[str, Any]]:
                 if hr_elem is not None:
                     point_data['hr'] = safe_int(hr_elem.text)
                 
-                # Add speed if available
+                # Add speed if available, in km/h like the FIT records
                 speed_elem = point.find('.//gpx:speed', namespace)
                 if speed_elem is not None:
-                    point_data['speed'] = safe_float(speed_elem.text)
+                    speed = safe_float(speed_elem.text)
+                    point_data['speed'] = speed * 3.6 if speed is not None else None
                 
                 gps_data.append(point_data)
                 
@@ -143,9 +149,74 @@ def parse_gpx(gpx_data: str) -> List[Dict[str, Any]]:
                 logger.warning(f"Error parsing track point: {e}")
                 continue
         
-        logger.info(f"Successfully parsed {len(gps_data)} GPS points from GPX data")
+        logger.debug(f"Successfully parsed {len(gps_data)} GPS points from GPX data")
         return gps_data
         
     except Exception as e:
         logger.error(f"Error parsing GPX data: {e}")
-        return []
\ No newline at end of file
+        return []
+
+def parse_fit(fit_archive: bytes) -> List[Dict[str, Any]]:
+    """
+    Parse the record messages of an original FIT activity download.
+    
+    Garmin Connect serves the original upload as a zip archive holding the FIT
+    file. The record messages are decoded with fitfile in metric units, giving
+    the same keys as parse_gpx() plus the fields GPX drops.
+    
+    Args:
+        fit_archive: Zip archive (or bare FIT file) bytes
+        
+    Returns:
+        List of dictionaries containing parsed track point data, with
+        'speed' in km/h, and 'distance' (km), 'cadence', 'power' (W) and
+        'temp' (C) when recorded
+    """
+    if not fit_archive:
+        logger.warning("Empty FIT data provided")
+        return []
+    
+    # Imported on first use: fitfile builds large field tables at import
+    import fitfile
+    
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            if zipfile.is_zipfile(io.BytesIO(fit_archive)):
+                with zipfile.ZipFile(io.BytesIO(fit_archive)) as archive:
+                    names = [name for name in archive.namelist() if name.lower().endswith('.fit')]
+                    if not names:
+                        logger.error("FIT archive contains no .fit file")
+                        return []
+                    path = archive.extract(names[0], directory)
+            else:
+                path = os.path.join(directory, 'activity.fit')
+                with open(path, 'wb') as file:
+                    file.write(fit_archive)
+            fit_file = fitfile.File(path, fitfile.field_enums.DisplayMeasure.metric)
+        
+        gps_data = []
+        for message in fit_file[fitfile.MessageType.record]:
+            fields = message.fields
+            timestamp = fields.get('timestamp')
+            if timestamp is None:
+                continue
+            # Stored as naive UTC, like the GPX track points
+            gps_data.append({
+                'lat': fields.get('position_lat'),
+                'lon': fields.get('position_long'),
+                'time': timestamp.replace(tzinfo=None),
+                'ele': safe_float(fields.get('altitude')),
+                'hr': safe_int(fields.get('heart_rate')),
+                'speed': safe_float(fields.get('speed')),
+                'distance': safe_float(fields.get('distance')),
+                'cadence': safe_int(fields.get('cadence')),
+                'power': safe_int(fields.get('power')),
+                'temp': safe_float(fields.get('temperature')),
+            })
+        
+        logger.debug(f"Successfully parsed {len(gps_data)} track points from FIT data")
+        return gps_data
+        
+    except Exception as e:
+        logger.error(f"Error parsing FIT data: {e}")
+        return []
@@ -7,17 +7,18 @@ functionality.
 """
 
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import Date, cast, extract, func, literal_column
 import logging
 
 from backend.models.models import Activities, HealthSummary, SleepMetrics
 from backend.core.create_db import get_db
+from backend.core.tenancy import owned_by
 
 logger = logging.getLogger(__name__)
 
 def get_earliest_date() -> datetime.date:
     """
-    Find the earliest date with data across all tables.
+    Find the current user's earliest date with data across all tables.
     
     This function queries the database to find the earliest date with data in
     any of the main data tables (Activities, HealthSummary, SleepMetrics).
@@ -36,17 +37,17 @@ def get_earliest_date() -> datetime.date:
         dates = []
         
         # Check Activities table
-        earliest_activity = db.query(func.min(Activities.start_time)).scalar()
+        earliest_activity = db.query(func.min(Activities.start_time)).filter(owned_by(Activities)).scalar()
         if earliest_activity:
             dates.append(earliest_activity.date())
             
         # Check HealthSummary table
-        earliest_health = db.query(func.min(HealthSummary.date)).scalar()
+        earliest_health = db.query(func.min(HealthSummary.date)).filter(owned_by(HealthSummary)).scalar()
         if earliest_health:
             dates.append(earliest_health)
             
         # Check SleepMetrics table
-        earliest_sleep = db.query(func.min(SleepMetrics.date)).scalar()
+        earliest_sleep = db.query(func.min(SleepMetrics.date)).filter(owned_by(SleepMetrics)).scalar()
         if earliest_sleep:
             dates.append(earliest_sleep)
         
@@ -61,7 +62,7 @@ def get_earliest_date() -> datetime.date:
 
 def get_latest_activity_date() -> datetime.date:
     """
-    Find the date of the most recent activity.
+    Find the date of the current user's most recent activity.
     
     Returns:
         The date of the most recent activity or today's date if none found
@@ -73,7 +74,7 @@ def get_latest_activity_date() -> datetime.date:
     """
     db = next(get_db())
     try:
-        latest = db.query(func.max(Activities.start_time)).scalar()
+        latest = db.query(func.max(Activities.start_time)).filter(owned_by(Activities)).scalar()
         return latest.date() if latest else datetime.now().date()
     except Exception as e:
         logger.error(f"Error determining latest activity date: {e}")
@@ -83,7 +84,7 @@ def get_latest_activity_date() -> datetime.date:
 
 def get_date_range_activity_count(start_date: datetime.date, end_date: datetime.date) -> int:
     """
-    Count activities within a date range.
+    Count the current user's activities within a date range.
     
     Args:
         start_date: Start date (inclusive)
@@ -99,6 +100,7 @@ def get_date_range_activity_count(start_date: datetime.date, end_date: datetime.
         end_datetime = datetime.combine(end_date, datetime.max.time())
         
         count = db.query(func.count(Activities.activity_id))\
+            .filter(owned_by(Activities))\
             .filter(Activities.start_time >= start_datetime)\
             .filter(Activities.start_time <= end_datetime)\
             .scalar()
@@ -133,4 +135,71 @@ def check_record_exists(model, **kwargs) -> bool:
         logger.error(f"Error checking if record exists: {e}")
         return False
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def week_start(column, dialect: str):
+    """
+    Build a SQL expression for the Monday starting the week of a datetime column.
+    
+    Week arithmetic has no portable SQL form, so the expression is chosen per
+    database dialect.
+    
+    Args:
+        column: SQLAlchemy datetime column or expression
+        dialect: Name of the database dialect, e.g. 'sqlite' or 'mssql'
+        
+    Returns:
+        SQLAlchemy expression evaluating to the week's Monday
+    """
+    if dialect == 'sqlite':
+        # Move forward to Sunday (or stay on it), then back to Monday
+        return func.date(column, 'weekday 0', '-6 days')
+    if dialect == 'mssql':
+        # Day 0 (1900-01-01) was a Monday, so whole weeks since then land on
+        # Mondays at midnight regardless of the server's DATEFIRST setting
+        days = func.datediff(literal_column('day'), 0, column)
+        return func.dateadd(literal_column('day'), days // 7 * 7, 0)
+    return cast(func.date_trunc('week', column), Date)
+
+def period_columns(column, period: str, dialect: str) -> list:
+    """
+    Build the GROUP BY expressions bucketing a datetime column by calendar period.
+    
+    Args:
+        column: SQLAlchemy datetime column or expression
+        period: 'week', 'month' or 'year'
+        dialect: Name of the database dialect
+        
+    Returns:
+        List of SQLAlchemy expressions identifying the period
+        
+    Raises:
+        ValueError: If the period is not supported
+    """
+    if period == 'week':
+        return [week_start(column, dialect)]
+    if period == 'month':
+        return [extract('year', column), extract('month', column)]
+    if period == 'year':
+        return [extract('year', column)]
+    raise ValueError(f"Unsupported period '{period}'")
+
+def period_label(period: str, values) -> str:
+    """
+    Format the values of period_columns() as a period label.
+    
+    Args:
+        period: 'week', 'month' or 'year'
+        values: Row values of the period columns
+        
+    Returns:
+        'YYYY-MM-DD' of the week's Monday, 'YYYY-MM' or 'YYYY'
+    """
+    if period == 'week':
+        value = values[0]
+        if isinstance(value, datetime):
+            value = value.date()
+        return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+    if period == 'month':
+        return f"{int(values[0]):04d}-{int(values[1]):02d}"
+    return f"{int(values[0]):04d}"
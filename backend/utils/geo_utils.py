@@ -0,0 +1,126 @@
+"""
+Geographic utility functions.
+
+This module provides vectorized helpers for working with GPS tracks, such as
+great-circle distances between consecutive points and cumulative distance
+along a track.
+"""
+
+import numpy as np
+
+# Mean Earth radius in meters
+EARTH_RADIUS_M = 6371008.8
+
+def haversine(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Compute great-circle distances between coordinate pairs.
+    
+    Args:
+        lat1, lon1: Latitudes and longitudes of the first points in degrees
+        lat2, lon2: Latitudes and longitudes of the second points in degrees
+        
+    Returns:
+        Array of distances in meters
+    
+    Example:
+        >>> round(float(haversine(60.1699, 24.9384, 60.1699, 24.9484)))
+        553
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=float)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def cumulative_distance(lats, lons) -> np.ndarray:
+    """
+    Compute the cumulative distance along a track.
+    
+    Points with a missing position contribute no distance; the track resumes
+    from the next valid point.
+    
+    Args:
+        lats: Latitudes in degrees, NaN where missing
+        lons: Longitudes in degrees, NaN where missing
+        
+    Returns:
+        Array of cumulative distances in meters, starting at 0
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    if lats.size == 0:
+        return np.zeros(0)
+    
+    valid = ~(np.isnan(lats) | np.isnan(lons))
+    # Carry the last valid position forward over gaps
+    index = np.where(valid, np.arange(lats.size), 0)
+    np.maximum.accumulate(index, out=index)
+    lats, lons = lats[index], lons[index]
+    
+    steps = np.nan_to_num(haversine(lats[:-1], lons[:-1], lats[1:], lons[1:]))
+    return np.concatenate(([0.0], np.cumsum(steps)))
+
+# Latitude limit of the Web Mercator projection
+MAX_MERCATOR_LAT = 85.05112878
+# Pixels per map tile edge
+TILE_SIZE = 256
+
+def mercator_tile(lats, lons, zoom: int):
+    """
+    Project coordinates to fractional Web Mercator tile coordinates.
+    
+    Args:
+        lats: Latitudes in degrees
+        lons: Longitudes in degrees
+        zoom: Map zoom level
+        
+    Returns:
+        Tuple of (x, y) arrays; the integer parts are the tile indices, y
+        growing southwards as in slippy map tiles
+    """
+    lats = np.radians(np.clip(np.asarray(lats, dtype=float), -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+    lons = np.asarray(lons, dtype=float)
+    scale = 2.0 ** zoom
+    x = (lons + 180.0) / 360.0 * scale
+    y = (1.0 - np.log(np.tan(lats) + 1.0 / np.cos(lats)) / np.pi) / 2.0 * scale
+    return x, y
+
+def mercator_lat_lon(x, y, zoom: int):
+    """
+    Convert fractional Web Mercator tile coordinates back to degrees.
+    
+    Args:
+        x: Tile x coordinates
+        y: Tile y coordinates
+        zoom: Map zoom level
+        
+    Returns:
+        Tuple of (latitude, longitude) arrays in degrees
+    """
+    scale = 2.0 ** zoom
+    lons = np.asarray(x, dtype=float) / scale * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * np.asarray(y, dtype=float) / scale))))
+    return lats, lons
+
+def simplify_to_grid(lats, lons, zoom: int) -> np.ndarray:
+    """
+    Select the track points needed to draw a track at a zoom level.
+    
+    A point is kept when it falls on a different screen pixel than the point
+    before it; the first and last points are always kept.
+    
+    Args:
+        lats: Latitudes in degrees, without missing values
+        lons: Longitudes in degrees, without missing values
+        zoom: Map zoom level the track is drawn at
+        
+    Returns:
+        Indices of the points to keep
+    """
+    if len(lats) <= 2:
+        return np.arange(len(lats))
+    x, y = mercator_tile(lats, lons, zoom)
+    px = np.floor(x * TILE_SIZE).astype(np.int64)
+    py = np.floor(y * TILE_SIZE).astype(np.int64)
+    keep = np.ones(px.size, dtype=bool)
+    keep[1:] = (px[1:] != px[:-1]) | (py[1:] != py[:-1])
+    keep[-1] = True
+    return np.flatnonzero(keep)
@@ -0,0 +1,146 @@
+"""
+Columnar track codec.
+
+This module packs the per-point columns of an activity track (timestamps,
+positions, altitude, heart rate, speed, ...) into one compact binary blob.
+Each column is quantized to integers with a fixed scale, delta-encoded so
+that slowly changing values become small numbers, stored in the narrowest
+integer type holding its deltas, and the whole payload is zlib-compressed.
+Missing values are kept in a per-column bitmap instead of sentinels, so the
+deltas stay small around gaps.
+
+Decoding decompresses once and reads every column with np.frombuffer, a
+zero-copy view into the decompressed buffer, before the running sum restores
+the values.
+
+Blob layout (little endian), after the 4-byte magic and a version byte, all
+zlib-compressed:
+    uint32 point count, uint8 column count, then per column:
+    uint8 name length, name (UTF-8), 1-char integer dtype code, float64 scale,
+    uint8 has-bitmap flag, uint32 stored value count,
+    bitmap (np.packbits of the presence mask) if flagged, then the deltas.
+"""
+
+import struct
+import zlib
+from typing import Dict, Tuple
+import numpy as np
+
+MAGIC = b'GTRK'
+VERSION = 1
+COMPRESSION_LEVEL = 6
+
+# Integer types tried in order for a column's deltas
+_DTYPES = ('b', 'h', 'i', 'q')
+
+_HEADER = struct.Struct('<IB')
+_COLUMN = struct.Struct('<cdBI')
+
+
+class TrackCodecError(ValueError):
+    """Raised when a blob is not a valid encoded track."""
+
+
+def _narrowest_dtype(values: np.ndarray) -> str:
+    """Return the code of the narrowest integer type holding all values."""
+    if values.size == 0:
+        return 'b'
+    low, high = int(values.min()), int(values.max())
+    for code in _DTYPES:
+        info = np.iinfo(np.dtype(code))
+        if info.min <= low and high <= info.max:
+            return code
+    raise TrackCodecError("Column deltas exceed 64 bits")
+
+
+def encode_track(columns: Dict[str, np.ndarray], scales: Dict[str, float]) -> bytes:
+    """
+    Encode equally long float columns into a compressed blob.
+
+    Args:
+        columns: Column name mapped to a float array, NaN for missing values
+        scales: Column name mapped to the factor values are multiplied with
+            before rounding to integers, i.e. the inverse of the resolution kept
+
+    Returns:
+        Encoded track bytes
+
+    Raises:
+        TrackCodecError: If the columns differ in length
+    """
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise TrackCodecError("Track columns differ in length")
+    count = lengths.pop() if lengths else 0
+
+    parts = [_HEADER.pack(count, len(columns))]
+    for name, values in columns.items():
+        values = np.asarray(values, dtype=float)
+        present = ~np.isnan(values)
+        quantized = np.round(values[present] * scales[name]).astype(np.int64)
+        deltas = np.diff(quantized, prepend=np.int64(0))
+        code = _narrowest_dtype(deltas)
+        has_mask = not present.all()
+
+        encoded_name = name.encode('utf-8')
+        parts.append(struct.pack('<B', len(encoded_name)) + encoded_name)
+        parts.append(_COLUMN.pack(code.encode('ascii'), float(scales[name]), has_mask, quantized.size))
+        if has_mask:
+            parts.append(np.packbits(present).tobytes())
+        parts.append(deltas.astype(np.dtype(code).newbyteorder('<')).tobytes())
+
+    return MAGIC + bytes([VERSION]) + zlib.compress(b''.join(parts), COMPRESSION_LEVEL)
+
+
+def decode_track(blob: bytes) -> Tuple[int, Dict[str, np.ndarray]]:
+    """
+    Decode a blob produced by encode_track().
+
+    Args:
+        blob: Encoded track bytes
+
+    Returns:
+        Tuple of (point count, column name mapped to a float array with NaN
+        for missing values)
+
+    Raises:
+        TrackCodecError: If the blob is not a valid encoded track
+    """
+    if blob[:len(MAGIC)] != MAGIC:
+        raise TrackCodecError("Not an encoded track")
+    if blob[len(MAGIC)] != VERSION:
+        raise TrackCodecError(f"Unsupported track encoding version {blob[len(MAGIC)]}")
+    try:
+        buffer = zlib.decompress(blob[len(MAGIC) + 1:])
+    except zlib.error as e:
+        raise TrackCodecError(f"Corrupt track data: {e}") from e
+
+    count, column_count = _HEADER.unpack_from(buffer, 0)
+    offset = _HEADER.size
+    columns = {}
+    for _ in range(column_count):
+        name_length = buffer[offset]
+        name = buffer[offset + 1:offset + 1 + name_length].decode('utf-8')
+        offset += 1 + name_length
+        code, scale, has_mask, stored = _COLUMN.unpack_from(buffer, offset)
+        offset += _COLUMN.size
+
+        present = None
+        if has_mask:
+            mask_bytes = (count + 7) // 8
+            present = np.unpackbits(np.frombuffer(buffer, dtype=np.uint8, count=mask_bytes, offset=offset),
+                                    count=count).astype(bool)
+            offset += mask_bytes
+
+        dtype = np.dtype(code.decode('ascii')).newbyteorder('<')
+        deltas = np.frombuffer(buffer, dtype=dtype, count=stored, offset=offset)
+        offset += stored * dtype.itemsize
+
+        values = np.cumsum(deltas, dtype=np.int64) / scale
+        if present is None:
+            columns[name] = values
+        else:
+            column = np.full(count, np.nan)
+            column[present] = values
+            columns[name] = column
+    return count, columns
@@ -0,0 +1,145 @@
+"""
+Derived per-point track metrics.
+
+This module derives the metrics every track consumer needs from the raw
+columns (timestamps, positions, altitude, recorded speed and distance) in
+one vectorized pass: the distance covered since the previous point, the
+cumulative distance, the grade smoothed over a distance window, the pace,
+and whether the athlete was moving. They are computed once when a track is
+stored and kept as extra columns of the track, so reads and analytics do not
+redo the work.
+"""
+
+from typing import Dict
+import numpy as np
+from .geo_utils import haversine
+
+# Derived columns with the factor applied before rounding when stored:
+# distances 1 cm, grade 0.1 %, pace 0.1 s/km
+DERIVED_SCALES = {
+    'step_distance': 100,
+    'cumulative_distance': 100,
+    'grade': 10,
+    'pace': 10,
+    'moving': 1,
+}
+
+# Distance window the grade is measured over, centered on each point
+GRADE_WINDOW_M = 50.0
+# Steeper values are GPS or barometer noise
+MAX_GRADE_PERCENT = 45.0
+# Slower points count as stopped
+MOVING_SPEED_KMH = 1.8
+
+def step_distances(track: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Compute the meters covered between each point and the one before it.
+
+    The device-recorded distance of FIT tracks is used when every point has
+    it, otherwise the great-circle distance between consecutive GPS
+    positions (missing positions carry the last one forward), and tracks
+    without positions fall back to integrating the recorded speed, which
+    the parsers deliver in km/h for both FIT and GPX.
+
+    Args:
+        track: Track columns with NaN for missing values
+
+    Returns:
+        Array of non-negative step distances in meters, 0 for the first point
+    """
+    count = track['timestamp'].size
+    steps = np.zeros(count)
+    if count < 2:
+        return steps
+
+    recorded = track['distance']
+    if not np.isnan(recorded).any():
+        # Kilometers, never decreasing
+        steps[1:] = np.maximum(np.diff(np.maximum.accumulate(recorded * 1000)), 0.0)
+        return steps
+
+    lats, lons = track['position_lat'], track['position_long']
+    valid = ~(np.isnan(lats) | np.isnan(lons))
+    if valid.any():
+        index = np.where(valid, np.arange(count), 0)
+        np.maximum.accumulate(index, out=index)
+        lats, lons = lats[index], lons[index]
+        steps[1:] = np.nan_to_num(haversine(lats[:-1], lons[:-1], lats[1:], lons[1:]))
+        return steps
+
+    seconds = np.nan_to_num(np.diff(track['timestamp']))
+    steps[1:] = np.nan_to_num(track['speed'][1:]) / 3.6 * np.maximum(seconds, 0.0)
+    return steps
+
+def smoothed_grade(cumulative: np.ndarray, altitude: np.ndarray, window: float = GRADE_WINDOW_M) -> np.ndarray:
+    """
+    Compute the grade at each point over a distance window centered on it.
+
+    The altitude is interpolated over gaps, and the climb between the first
+    points at least half a window behind and ahead is divided by the
+    distance between them, which smooths out the point-to-point noise of
+    GPS and barometric altitude.
+
+    Args:
+        cumulative: Cumulative meters per point, non-decreasing
+        altitude: Altitude in meters, NaN where missing
+        window: Distance window in meters
+
+    Returns:
+        Grade in percent, NaN where the window is too short or the track has
+        no altitude
+    """
+    grade = np.full(cumulative.size, np.nan)
+    recorded = ~np.isnan(altitude)
+    if np.count_nonzero(recorded) < 2:
+        return grade
+    altitude = np.interp(cumulative, cumulative[recorded], altitude[recorded])
+
+    behind = np.searchsorted(cumulative, cumulative - window / 2, side='right') - 1
+    ahead = np.searchsorted(cumulative, cumulative + window / 2, side='left')
+    behind = np.maximum(behind, 0)
+    ahead = np.minimum(ahead, cumulative.size - 1)
+    span = cumulative[ahead] - cumulative[behind]
+    # Near the ends the window is cut short; half of it is still a usable base
+    usable = span >= window / 2
+    grade[usable] = (altitude[ahead] - altitude[behind])[usable] / span[usable] * 100
+    return np.clip(grade, -MAX_GRADE_PERCENT, MAX_GRADE_PERCENT)
+
+def derive_metrics(track: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Derive the DERIVED_SCALES columns of a track.
+
+    The speed is the step distance over the time since the previous point,
+    so pace always matches the distance the track covers; the recorded
+    speed only fills in points without a time step. Points slower than
+    MOVING_SPEED_KMH are stopped and have no pace.
+
+    Args:
+        track: Track columns with NaN for missing values
+
+    Returns:
+        Column name mapped to a float array for every column in
+        DERIVED_SCALES; 'moving' is 1.0 or 0.0
+    """
+    steps = step_distances(track)
+    cumulative = np.cumsum(steps)
+
+    seconds = np.full(steps.size, np.nan)
+    seconds[1:] = np.diff(track['timestamp'])
+    derived_speed = np.divide(steps, seconds, out=np.full(steps.size, np.nan),
+                              where=np.nan_to_num(seconds) > 0) * 3.6
+    speed = np.where(np.isnan(derived_speed), track['speed'], derived_speed)
+    if speed.size > 1 and np.isnan(speed[0]):
+        speed[0] = speed[1]
+
+    moving = np.nan_to_num(speed) >= MOVING_SPEED_KMH
+    pace = np.full(steps.size, np.nan)
+    pace[moving] = 3600 / speed[moving]
+
+    return {
+        'step_distance': steps,
+        'cumulative_distance': cumulative,
+        'grade': smoothed_grade(cumulative, track['altitude']),
+        'pace': pace,
+        'moving': moving.astype(float),
+    }
@@ -0,0 +1,424 @@
+"""
+Local stand-in for the Garmin Connect API.
+
+This module provides FakeGarminConnect, an object exposing the subset of the
+garminconnect.Garmin interface that GarminClient uses. Every payload is
+generated deterministically from a seed and the requested date or activity id,
+so benchmarks are reproducible without credentials or network access. Payloads
+follow the shapes the fetchers parse.
+
+Network behaviour is simulated per API call: a configurable latency with
+jitter, a random error rate raising GarminConnectConnectionError, and a
+token-bucket rate limit raising GarminConnectTooManyRequestsError like the
+real service's HTTP 429. Errors are drawn from a seeded sequence, so the same
+call order fails at the same calls on every run.
+
+Activity tracks are served as zipped original FIT files, encoded here with
+the record fields the FIT parser reads, and as GPX exports. Every
+GPX_ONLY_EVERY-th activity has no FIT file, like manual entries and uploads
+in other formats, so both download paths are exercised.
+"""
+
+import io
+import math
+import random
+import struct
+import threading
+import time
+import zipfile
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from garminconnect import GarminConnectConnectionError, GarminConnectTooManyRequestsError
+
+# Sports generated for synthetic activities, with typical speeds in m/s
+SPORTS = {
+    'running': 3.0,
+    'cycling': 7.5,
+    'walking': 1.4,
+    'hiking': 1.1,
+}
+
+# Starting point of every synthetic track (Helsinki)
+ORIGIN_LAT = 60.1699
+ORIGIN_LON = 24.9384
+
+# Every n-th activity (by day) is served without an original FIT file
+GPX_ONLY_EVERY = 4
+
+# FIT epoch (1989-12-31 00:00 UTC) and the scale of positions in semicircles
+FIT_EPOCH = datetime(1989, 12, 31)
+SEMICIRCLES_PER_DEGREE = 2 ** 31 / 180
+
+# Record message fields written to FIT files: (field number, FIT base type,
+# struct format, point key, scale, offset); see the FIT SDK profile
+FIT_RECORD_FIELDS = (
+    (253, 0x86, 'I', 'time', 1, 0),
+    (0, 0x85, 'i', 'lat', SEMICIRCLES_PER_DEGREE, 0),
+    (1, 0x85, 'i', 'lon', SEMICIRCLES_PER_DEGREE, 0),
+    (2, 0x84, 'H', 'ele', 5, 500),
+    (3, 0x02, 'B', 'hr', 1, 0),
+    (4, 0x02, 'B', 'cadence', 1, 0),
+    (5, 0x86, 'I', 'distance', 100 * 1000, 0),
+    (6, 0x84, 'H', 'speed', 1000, 0),
+    (7, 0x84, 'H', 'power', 1, 0),
+    (13, 0x01, 'b', 'temp', 1, 0),
+)
+
+# Nibble table of the FIT CRC-16
+FIT_CRC_TABLE = (0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
+                 0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400)
+
+
+def _fit_crc(data: bytes, crc: int = 0) -> int:
+    """Return the FIT CRC-16 of some bytes."""
+    for byte in data:
+        for nibble in (byte & 0xF, byte >> 4):
+            tmp = FIT_CRC_TABLE[crc & 0xF]
+            crc = (crc >> 4) & 0x0FFF
+            crc = crc ^ tmp ^ FIT_CRC_TABLE[nibble]
+    return crc
+
+def encode_fit(points: List[Dict[str, Any]]) -> bytes:
+    """
+    Encode track points as a FIT activity file.
+
+    Writes a file_id message and one record message per point; naive point
+    times are taken as UTC.
+
+    Args:
+        points: Points as returned by FakeGarminConnect.track_points()
+
+    Returns:
+        FIT file bytes
+    """
+    created = int((points[0]['time'] - FIT_EPOCH).total_seconds()) if points else 0
+    messages = [
+        # Definition and data of file_id (global 0): type activity, manufacturer garmin
+        struct.pack('<BBBHB', 0x40, 0, 0, 0, 3) + bytes((0, 1, 0x00, 1, 2, 0x84, 4, 4, 0x86)),
+        struct.pack('<BBHI', 0x00, 4, 1, created),
+        # Definition of record (global 20) on local message type 1
+        struct.pack('<BBBHB', 0x41, 0, 0, 20, len(FIT_RECORD_FIELDS))
+        + b''.join(struct.pack('<BBB', number, struct.calcsize(fmt), base_type)
+                   for number, base_type, fmt, *_ in FIT_RECORD_FIELDS),
+    ]
+    for point in points:
+        values = []
+        for _, _, fmt, key, scale, offset in FIT_RECORD_FIELDS:
+            value = point.get(key)
+            if key == 'time':
+                # Whole seconds, truncated like the GPX times
+                value = int((value - FIT_EPOCH).total_seconds())
+            if value is None:
+                # Invalid value: all bits set, the sign bit cleared for signed types
+                bits = 8 * struct.calcsize(fmt) - (0 if fmt.isupper() else 1)
+                values.append(2 ** bits - 1)
+            else:
+                values.append(round((value + offset) * scale))
+        messages.append(struct.pack('<B' + ''.join(fmt for _, _, fmt, *_ in FIT_RECORD_FIELDS), 0x01, *values))
+
+    data = b''.join(messages)
+    header = struct.pack('<BBHI4s', 14, 0x20, 2132, len(data), b'.FIT')
+    header += struct.pack('<H', _fit_crc(header))
+    return header + data + struct.pack('<H', _fit_crc(header + data))
+
+
+class FakeGarminConnect:
+    """
+    Deterministic fake of garminconnect.Garmin.
+
+    Activities are generated for the `days` days up to `end_date`, roughly one
+    every `activity_every_days` days, with `records_per_activity` GPS points
+    each. Health and sleep payloads exist for every date.
+
+    Every API method first sleeps for `latency` seconds plus up to
+    `latency_jitter` seconds, then fails with probability `error_rate`. If
+    `rate_limit` is set, calls beyond `rate_limit` per second (after an
+    initial `burst`) are rejected as throttled.
+    """
+
+    class ActivityDownloadFormat(Enum):
+        ORIGINAL = 1
+        TCX = 2
+        GPX = 3
+        KML = 4
+        CSV = 5
+
+    def __init__(self, seed: int = 42, days: int = 365, end_date: Optional[date] = None,
+                 activity_every_days: float = 1.5, records_per_activity: int = 600,
+                 latency: float = 0.0, latency_jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: Optional[float] = None, burst: int = 10):
+        self.seed = seed
+        self.days = days
+        self.end_date = end_date or date.today()
+        self.activity_every_days = activity_every_days
+        self.records_per_activity = records_per_activity
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self._activities = self._generate_activities()
+        self._by_id = {str(activity['activityId']): activity for activity in self._activities}
+
+        self._lock = threading.Lock()
+        self._fault_rng = self._rng('faults')
+        self._tokens = float(burst)
+        self._token_time = time.monotonic()
+        self._simulate = True
+        self.stats = defaultdict(lambda: {'calls': 0, 'errors': 0, 'throttled': 0})
+
+    def _rng(self, *key) -> random.Random:
+        """Return a random generator seeded by the fake's seed and the given key."""
+        return random.Random(':'.join(str(part) for part in (self.seed,) + key))
+
+    def _generate_activities(self) -> List[Dict[str, Any]]:
+        """Build the activity list, newest first like Garmin Connect returns it."""
+        activities = []
+        start = self.end_date - timedelta(days=self.days - 1)
+        for offset in range(self.days):
+            day = start + timedelta(days=offset)
+            rng = self._rng('activities', day.isoformat())
+            if rng.random() >= 1 / self.activity_every_days:
+                continue
+
+            sport = rng.choice(sorted(SPORTS))
+            speed = SPORTS[sport] * rng.uniform(0.85, 1.15)
+            duration = rng.uniform(1200, 5400)
+            start_time = datetime.combine(day, datetime.min.time()) + timedelta(hours=rng.uniform(6, 20))
+            activities.append({
+                'activityId': day.toordinal() * 10,
+                'locationName': 'Helsinki',
+                'startTimeLocal': start_time.strftime('%Y-%m-%d %H:%M:%S'),
+                'activityType': {'typeKey': sport},
+                'distance': speed * duration,
+                'duration': duration,
+                'averageSpeed': speed,
+                'maxSpeed': speed * rng.uniform(1.2, 1.6),
+                'calories': int(duration / 60 * rng.uniform(6, 12)),
+                'averageHR': rng.randint(120, 160),
+                'maxHR': rng.randint(165, 190),
+                'steps': int(duration * 2.7) if sport in ('running', 'walking', 'hiking') else None,
+                'aerobicTrainingEffect': rng.uniform(1.5, 4.5),
+                'activityTrainingLoad': rng.uniform(20, 250),
+                'vO2MaxValue': rng.uniform(45, 55),
+            })
+        activities.reverse()
+        return activities
+
+    @property
+    def activity_count(self) -> int:
+        """Total number of generated activities."""
+        return len(self._activities)
+
+    @contextmanager
+    def passthrough(self):
+        """Serve calls without latency, errors or throttling, e.g. while seeding."""
+        self._simulate = False
+        try:
+            yield self
+        finally:
+            self._simulate = True
+
+    def _acquire_token(self) -> bool:
+        """Take one token from the rate-limit bucket. Caller holds the lock."""
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._token_time) * self.rate_limit)
+        self._token_time = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _call(self, method: str) -> None:
+        """
+        Simulate the network side of one API call.
+
+        Args:
+            method: API method name used for the call statistics
+
+        Raises:
+            GarminConnectTooManyRequestsError: If the rate limit is exceeded
+            GarminConnectConnectionError: If the call is picked to fail
+        """
+        if not self._simulate:
+            return
+
+        with self._lock:
+            self.stats[method]['calls'] += 1
+            throttled = self.rate_limit is not None and not self._acquire_token()
+            failed = self._fault_rng.random() < self.error_rate
+            delay = self.latency + self._fault_rng.uniform(0, self.latency_jitter)
+            if throttled:
+                self.stats[method]['throttled'] += 1
+            elif failed:
+                self.stats[method]['errors'] += 1
+
+        if delay > 0:
+            time.sleep(delay)
+        if throttled:
+            raise GarminConnectTooManyRequestsError(f"Too many requests: {method}")
+        if failed:
+            raise GarminConnectConnectionError(f"Simulated connection error: {method}")
+
+    def call_summary(self) -> Dict[str, int]:
+        """Return the call, error and throttle counts summed over all methods."""
+        with self._lock:
+            return {key: sum(stats[key] for stats in self.stats.values())
+                    for key in ('calls', 'errors', 'throttled')}
+
+    def login(self, tokenstore: Optional[str] = None):
+        self._call('login')
+        return True
+
+    def get_activities(self, start: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        self._call('get_activities')
+        return self._activities[start:start + limit]
+
+    def get_activities_by_date(self, startdate: str, enddate: Optional[str] = None,
+                               activitytype: Optional[str] = None, sortorder: Optional[str] = None) -> List[Dict[str, Any]]:
+        self._call('get_activities_by_date')
+        end = enddate or '9999-12-31'
+        activities = [activity for activity in self._activities
+                      if startdate <= activity['startTimeLocal'][:10] <= end]
+        return activities[::-1] if sortorder == 'asc' else activities
+
+    def track_points(self, activity_id: str) -> List[Dict[str, Any]]:
+        """
+        Generate the GPS track of an activity as parsed points.
+
+        Args:
+            activity_id: Synthetic activity id
+
+        Returns:
+            List of dictionaries with time, lat, lon, ele, hr, speed (m/s),
+            distance (km from the start), cadence and, when cycling, power keys
+        """
+        activity = self._by_id[str(activity_id)]
+        rng = self._rng('track', activity_id)
+        start_time = datetime.strptime(activity['startTimeLocal'], '%Y-%m-%d %H:%M:%S')
+        interval = activity['duration'] / self.records_per_activity
+        heading = rng.uniform(0, 2 * math.pi)
+        lat, lon, ele = ORIGIN_LAT, ORIGIN_LON, rng.uniform(0, 80)
+        distance = 0.0
+        cycling = activity['activityType']['typeKey'] == 'cycling'
+
+        points = []
+        for i in range(self.records_per_activity):
+            speed = activity['averageSpeed'] * rng.uniform(0.8, 1.2)
+            heading += rng.uniform(-0.3, 0.3)
+            step = speed * interval
+            lat += step * math.cos(heading) / 111320
+            lon += step * math.sin(heading) / (111320 * math.cos(math.radians(lat)))
+            ele += rng.uniform(-1.5, 1.5)
+            distance += step / 1000
+            points.append({
+                'time': start_time + timedelta(seconds=i * interval),
+                'lat': round(lat, 7),
+                'lon': round(lon, 7),
+                'ele': round(ele, 1),
+                'hr': int(activity['averageHR'] + rng.uniform(-15, 15)),
+                'speed': round(speed, 3),
+                'distance': round(distance, 5),
+                'cadence': rng.randint(75, 95),
+                'power': rng.randint(150, 250) if cycling else None,
+                'temp': 18,
+            })
+        return points
+
+    def has_fit(self, activity_id) -> bool:
+        """Whether an activity has an original FIT file to download."""
+        return int(activity_id) // 10 % GPX_ONLY_EVERY != 0
+
+    def download_activity(self, activity_id, dl_fmt=ActivityDownloadFormat.TCX) -> bytes:
+        if dl_fmt not in (self.ActivityDownloadFormat.ORIGINAL, self.ActivityDownloadFormat.GPX):
+            raise ValueError(f"FakeGarminConnect only serves original and GPX downloads, not {dl_fmt}")
+        self._call('download_activity')
+
+        if dl_fmt == self.ActivityDownloadFormat.ORIGINAL:
+            if not self.has_fit(activity_id):
+                raise GarminConnectConnectionError(f"Activity {activity_id} has no original file")
+            archive = io.BytesIO()
+            with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zipped:
+                zipped.writestr(f"{activity_id}_ACTIVITY.fit", encode_fit(self.track_points(activity_id)))
+            return archive.getvalue()
+
+        trackpoints = ''.join(
+            f'<trkpt lat="{point["lat"]}" lon="{point["lon"]}"><ele>{point["ele"]}</ele>'
+            f'<time>{point["time"].strftime("%Y-%m-%dT%H:%M:%S.000Z")}</time>'
+            f'<extensions><hr>{point["hr"]}</hr><speed>{point["speed"]}</speed></extensions></trkpt>'
+            for point in self.track_points(activity_id)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<gpx xmlns="http://www.topografix.com/GPX/1/1" version="1.1" creator="FakeGarminConnect">'
+            f'<trk><trkseg>{trackpoints}</trkseg></trk></gpx>'
+        ).encode('utf-8')
+
+    def get_user_summary(self, cdate: str) -> Dict[str, Any]:
+        self._call('get_user_summary')
+        rng = self._rng('summary', cdate)
+        return {
+            'averageStressLevel': rng.randint(15, 45),
+            'maxStressLevel': rng.randint(60, 99),
+            'totalSteps': rng.randint(3000, 18000),
+            'bodyBatteryChargedValue': rng.randint(20, 80),
+            'bodyBatteryDrainedValue': rng.randint(20, 80),
+        }
+
+    def get_stats(self, cdate: str) -> Dict[str, Any]:
+        self._call('get_stats')
+        return {'activeKilocalories': self._rng('stats', cdate).randint(200, 1200)}
+
+    def get_heart_rates(self, cdate: str) -> Dict[str, Any]:
+        self._call('get_heart_rates')
+        rng = self._rng('heart_rates', cdate)
+        return {'heartRateValues': [{'value': rng.randint(45, 150)} for _ in range(720)]}
+
+    def get_rhr_day(self, cdate: str) -> List[Dict[str, Any]]:
+        self._call('get_rhr_day')
+        return [{'metricId': 60, 'value': self._rng('rhr', cdate).randint(42, 58)}]
+
+    def get_intensity_minutes_data(self, cdate: str) -> Dict[str, Any]:
+        self._call('get_intensity_minutes_data')
+        rng = self._rng('intensity', cdate)
+        return {
+            'moderateIntensityDuration': rng.randint(0, 60) * 60,
+            'vigorousIntensityDuration': rng.randint(0, 40) * 60,
+        }
+
+    def get_sleep_data(self, cdate: str) -> Dict[str, Any]:
+        self._call('get_sleep_data')
+        rng = self._rng('sleep', cdate)
+        night = datetime.strptime(cdate, '%Y-%m-%d') - timedelta(hours=rng.uniform(1, 3))
+        deep, light, rem = rng.randint(3600, 7200), rng.randint(10800, 18000), rng.randint(3600, 7200)
+        return {
+            'dailySleepDTO': {
+                'sleepStartTimestampGMT': int(night.timestamp() * 1000),
+                'sleepEndTimestampGMT': int((night + timedelta(seconds=deep + light + rem)).timestamp() * 1000),
+                'deepSleepSeconds': deep,
+                'lightSleepSeconds': light,
+                'remSleepSeconds': rem,
+                'awakeSleepSeconds': rng.randint(300, 2400),
+                'averageRespirationValue': round(rng.uniform(12, 17), 1),
+                'avgSleepStress': round(rng.uniform(10, 30), 1),
+            }
+        }
+
+def add_fake_arguments(parser) -> None:
+    """Add the FakeGarminConnect network simulation options to an argument parser."""
+    group = parser.add_argument_group('fake Garmin Connect')
+    group.add_argument('--latency', type=float, default=0.0, help='Base latency per API call in seconds')
+    group.add_argument('--latency-jitter', type=float, default=0.0, help='Extra random latency per call in seconds')
+    group.add_argument('--error-rate', type=float, default=0.0, help='Fraction of API calls that fail')
+    group.add_argument('--rate-limit', type=float, help='Allowed API calls per second before throttling')
+    group.add_argument('--burst', type=int, default=10, help='Calls allowed at once before the rate limit applies')
+
+def fake_from_args(args) -> FakeGarminConnect:
+    """Build a FakeGarminConnect from parsed benchmark arguments."""
+    return FakeGarminConnect(seed=args.seed, days=args.days, activity_every_days=args.activity_every,
+                             records_per_activity=args.records, latency=args.latency,
+                             latency_jitter=args.latency_jitter, error_rate=args.error_rate,
+                             rate_limit=args.rate_limit, burst=args.burst)
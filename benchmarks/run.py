@@ -0,0 +1,260 @@
+"""
+Offline load-test and benchmark harness for the Flask backend.
+
+Boots create_app() against a SQLite database seeded with synthetic data,
+replaces the Garmin Connect client with FakeGarminConnect, serves the app on
+a local threaded server and drives the read endpoints and the sync endpoint
+with concurrent clients. Reports p50/p95/p99 latency and requests per second
+per endpoint, so regressions show up before deploy without credentials or an
+Azure SQL instance.
+
+Usage:
+    python -m benchmarks.run --days 365 --records 600 --concurrency 8 --requests 400
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from benchmarks.fake_garmin import add_fake_arguments, fake_from_args
+
+def configure_environment(database_url: str) -> None:
+    """
+    Point the backend configuration at the benchmark database.
+
+    Must run before anything from the backend package is imported, since
+    the configuration is read from the environment at import time.
+
+    Args:
+        database_url: SQLAlchemy URL of the benchmark database
+    """
+    os.environ.update({
+        'DATA_SOURCE': 'garmin_connect',
+        'DATABASE_CONNECTION_STRING': database_url,
+        'READ_DATABASE_CONNECTION_STRING': '',
+        'GARMIN_USERNAME': 'benchmark',
+        'GARMIN_PASSWORD': 'benchmark',
+        'PROFILER_SAMPLE_RATE': '0',
+        # The fake simulates Garmin's latency; throttling would only time the limiter
+        'GARMIN_CALLS_PER_MINUTE': '0',
+    })
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Return the nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values: Sorted sample values
+        pct: Percentile between 0 and 100
+
+    Returns:
+        Percentile value, or 0.0 for an empty sample
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+def timed_request(base_url: str, method: str, path: str, timeout: float = 600) -> tuple:
+    """
+    Issue one HTTP request and measure its latency.
+
+    Args:
+        base_url: Server base URL
+        method: HTTP method
+        path: Request path
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Tuple of (latency in seconds, status code or None on connection error)
+    """
+    request = urllib.request.Request(base_url + path, method=method,
+                                     headers={'Accept-Encoding': 'gzip, br'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = None
+    return time.perf_counter() - start, status
+
+def drive(base_url: str, targets: List[tuple], total_requests: int, concurrency: int,
+          seed: int = 0) -> Dict[str, dict]:
+    """
+    Send requests to randomly chosen targets from concurrent clients.
+
+    Args:
+        base_url: Server base URL
+        targets: List of (label, method, paths) tuples; one of the paths is
+            picked per request so parameterized routes get their fair share
+        total_requests: Number of requests to send in total
+        concurrency: Number of concurrent clients
+        seed: Seed for the target choice
+
+    Returns:
+        Dictionary of latency statistics per target label
+    """
+    rng = random.Random(seed)
+    plan = []
+    for _ in range(total_requests):
+        label, method, paths = rng.choice(targets)
+        plan.append((label, method, rng.choice(paths)))
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+
+    def run(target):
+        label, method, path = target
+        latency, status = timed_request(base_url, method, path)
+        with lock:
+            samples[label].append(latency)
+            if status is None or status >= 400:
+                errors[label] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(run, plan))
+    wall_time = time.perf_counter() - start
+
+    return summarize(samples, errors, wall_time)
+
+def summarize(samples: Dict[str, List[float]], errors: Dict[str, int], wall_time: float) -> Dict[str, dict]:
+    """Compute count, errors, latency percentiles and throughput per label."""
+    results = {}
+    for label, latencies in sorted(samples.items()):
+        latencies.sort()
+        results[label] = {
+            'requests': len(latencies),
+            'errors': errors.get(label, 0),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'rps': round(len(latencies) / wall_time, 2) if wall_time else 0.0,
+        }
+    total = sum(len(latencies) for latencies in samples.values())
+    results['total'] = {'requests': total, 'wall_time_s': round(wall_time, 2),
+                        'rps': round(total / wall_time, 2) if wall_time else 0.0}
+    return results
+
+def print_report(title: str, results: Dict[str, dict]) -> None:
+    """Print a latency table for one benchmark phase."""
+    print(f"\n== {title} ==")
+    print(f"{'endpoint':<40}{'reqs':>7}{'errs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>9}")
+    for label, stats in results.items():
+        if label == 'total':
+            continue
+        print(f"{label:<40}{stats['requests']:>7}{stats['errors']:>6}{stats['p50_ms']:>10}"
+              f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['rps']:>9}")
+    total = results['total']
+    print(f"total: {total['requests']} requests in {total['wall_time_s']}s ({total['rps']} req/s)")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--database', help='SQLAlchemy URL to benchmark against (default: temporary SQLite file)')
+    parser.add_argument('--days', type=int, default=365, help='Days of synthetic history')
+    parser.add_argument('--activity-every', type=float, default=1.5, help='Average days between activities')
+    parser.add_argument('--records', type=int, default=600, help='GPS records per activity')
+    parser.add_argument('--unsynced-days', type=int, default=7, help='Newest days left for the sync to fetch')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--requests', type=int, default=400, help='Read requests per phase')
+    parser.add_argument('--sync-runs', type=int, default=1, help='Sync requests issued while reads run')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for data generation and request mix')
+    parser.add_argument('--json', help='Write the results to this JSON file')
+    add_fake_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='garminsync-bench-')
+    configure_environment(args.database or f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+
+    # Backend imports must follow configure_environment()
+    from werkzeug.serving import make_server
+    from backend.app import create_app
+    from backend.core.garmin_client import GarminClient
+    from backend.models.models import init_db
+    from benchmarks.seed import seed_database
+
+    fake = fake_from_args(args)
+    # Every GarminClient() now talks to the fake instead of logging in
+    GarminClient._client = fake
+
+    init_db()
+    seed_start = time.perf_counter()
+    counts = seed_database(fake, unsynced_days=args.unsynced_days)
+    print(f"Seeded {counts} in {time.perf_counter() - seed_start:.1f}s")
+
+    cwd = os.getcwd()
+    os.chdir(workdir)  # keep app.log out of the working tree
+    try:
+        app = create_app()
+    finally:
+        os.chdir(cwd)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    activity_ids = [str(activity['activityId']) for activity in fake.get_activities(0, fake.activity_count)]
+    rng = random.Random(args.seed)
+    targets = [
+        ('GET /api/activities', 'GET', ['/api/activities']),
+        ('GET /api/activities/max_values', 'GET', ['/api/activities/max_values']),
+        ('GET /api/health', 'GET', ['/api/health']),
+        ('GET /api/sleep', 'GET', ['/api/sleep']),
+        ('GET /api/activities/<id>/gps', 'GET', [
+            f'/api/activities/{activity_id}/gps'
+            for activity_id in rng.sample(activity_ids, min(20, len(activity_ids)))
+        ]),
+    ]
+
+    report = {'config': vars(args), 'seeded': counts}
+    try:
+        report['reads'] = drive(base_url, targets, args.requests, args.concurrency, args.seed)
+        print_report('Read endpoints', report['reads'])
+
+        # Reads measured while sync requests run alongside them
+        sync_samples, sync_errors = [], 0
+        def run_syncs():
+            nonlocal sync_errors
+            for _ in range(args.sync_runs):
+                latency, status = timed_request(base_url, 'POST', '/api/activities/sync')
+                sync_samples.append(latency)
+                sync_errors += status != 200
+
+        sync_thread = threading.Thread(target=run_syncs)
+        sync_start = time.perf_counter()
+        sync_thread.start()
+        report['reads_during_sync'] = drive(base_url, targets, args.requests, args.concurrency, args.seed + 1)
+        sync_thread.join()
+        report['sync'] = summarize({'POST /api/activities/sync': sync_samples},
+                                   {'POST /api/activities/sync': sync_errors},
+                                   time.perf_counter() - sync_start)
+        print_report('Read endpoints during sync', report['reads_during_sync'])
+        report['garmin_calls'] = fake.call_summary()
+        print_report('Sync endpoint', report['sync'])
+        print(f"Garmin API calls: {report['garmin_calls']}")
+    finally:
+        server.shutdown()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Synthetic data seeding for benchmarks.
+
+This module fills the application database with activities, GPS records,
+health summaries and sleep rows generated by FakeGarminConnect, running them
+through the same processors as a real sync. The newest days are left out so a
+subsequent sync against the same fake has new data to store.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from backend.core.create_db import get_db
+from backend.data.fetchers.health_fetcher import fetch_health_data_with_debug
+from backend.data.map_index import build_map_index
+from backend.data.tracks import build_track_rows, records_to_track
+from backend.data.processors.activity_processor import process_activity, process_gps_data
+from backend.data.processors.health_processor import process_health_data
+from backend.data.processors.sleep_processor import process_sleep_data
+from benchmarks.fake_garmin import FakeGarminConnect
+
+logger = logging.getLogger(__name__)
+
+# Rows flushed per bulk insert
+BATCH_SIZE = 5000
+
+def seed_database(fake: FakeGarminConnect, unsynced_days: int = 7) -> dict:
+    """
+    Seed the database with the fake's data, leaving the newest days unsynced.
+
+    Args:
+        fake: Data generator to seed from
+        unsynced_days: Number of most recent days left for the sync to fetch
+
+    Returns:
+        Dictionary with the number of rows inserted per table
+    """
+    cutoff = fake.end_date - timedelta(days=unsynced_days)
+    counts = {'activities': 0, 'activity_records': 0, 'health_summary': 0, 'sleep_metrics': 0}
+
+    db = next(get_db())
+    try:
+        # Seeding reads the fake directly, without simulated network behaviour
+        with fake.passthrough():
+            pending = []
+            for activity in fake.get_activities(0, fake.activity_count):
+                if datetime.strptime(activity['startTimeLocal'], '%Y-%m-%d %H:%M:%S').date() > cutoff:
+                    continue
+                pending.append(process_activity(activity))
+                records = process_gps_data(str(activity['activityId']), fake.track_points(activity['activityId']))
+                pending.extend(build_track_rows(str(activity['activityId']), records))
+                pending.extend(build_map_index(str(activity['activityId']), records_to_track(records)))
+                counts['activities'] += 1
+                counts['activity_records'] += len(records)
+                if len(pending) >= BATCH_SIZE:
+                    db.bulk_save_objects(pending)
+                    db.commit()
+                    pending = []
+
+            current_date = fake.end_date - timedelta(days=fake.days - 1)
+            while current_date <= cutoff:
+                date_str = current_date.strftime('%Y-%m-%d')
+                day = datetime.combine(current_date, datetime.min.time())
+
+                health = process_health_data(fetch_health_data_with_debug(fake, date_str), day, hr_values=[])
+                if health is not None:
+                    pending.append(health)
+                    counts['health_summary'] += 1
+
+                sleep = process_sleep_data(fake.get_sleep_data(date_str), day)
+                if sleep is not None:
+                    pending.append(sleep)
+                    counts['sleep_metrics'] += 1
+
+                current_date += timedelta(days=1)
+
+            db.bulk_save_objects(pending)
+            db.commit()
+            logger.info(f"Seeded database: {counts}")
+            return counts
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
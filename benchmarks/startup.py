@@ -0,0 +1,130 @@
+"""
+Startup-time benchmark for the backend package.
+
+Imports backend.app in a fresh interpreter under `python -X importtime`,
+reports the slowest modules by cumulative import time, and checks that the
+import did no startup work of its own: no database engine, no garminconnect
+import and no logging handlers. Exits non-zero when the import exceeds the
+time budget or has side effects, so it can gate CI next to the other checks;
+backend/tests/test_startup.py runs the same probe in the test suite.
+
+Usage:
+    python -m benchmarks.startup --budget-ms 800
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Tuple
+from benchmarks.run import configure_environment
+
+# Default maximum import time of backend.app in milliseconds
+DEFAULT_BUDGET_MS = 1000
+
+# Probe results that fail the check when true
+SIDE_EFFECTS = ('engine_created', 'garminconnect_imported', 'garmin_logged_in', 'logging_configured')
+
+# Runs in the child interpreter after the timed import
+SIDE_EFFECT_PROBE = """
+import json, logging, sys, time
+start = time.perf_counter()
+import backend.app
+import_ms = (time.perf_counter() - start) * 1000
+from backend.core import create_db
+from backend.core.garmin_client import GarminClient
+print(json.dumps({
+    'import_ms': import_ms,
+    'engine_created': create_db._engine is not None or create_db._read_engine is not None,
+    'garminconnect_imported': 'garminconnect' in sys.modules,
+    'garmin_logged_in': bool(GarminClient._instances) or GarminClient._client is not None,
+    'logging_configured': bool(logging.getLogger().handlers),
+}))
+"""
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Parse `-X importtime` output into (module, self_us, cumulative_us) rows.
+
+    Args:
+        stderr: Standard error of the child interpreter
+
+    Returns:
+        List of tuples sorted by cumulative time, slowest first
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|', 2)
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return sorted(rows, key=lambda row: row[2], reverse=True)
+
+def run_probe(importtime: bool = True) -> Tuple[dict, list]:
+    """
+    Import backend.app in a fresh interpreter against a throwaway SQLite database.
+
+    Args:
+        importtime: Run the child under `-X importtime` to list the slowest
+            modules; its own overhead inflates the measured import time
+
+    Returns:
+        Tuple of the probe results (import time and side effects) and the
+        modules from parse_importtime()
+
+    Raises:
+        RuntimeError: If the child interpreter fails
+    """
+    workdir = tempfile.mkdtemp(prefix='garminsync-startup-')
+    # Configure the child only; the caller's environment is left as it was
+    saved = dict(os.environ)
+    try:
+        configure_environment(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+        env = dict(os.environ)
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+    result = subprocess.run(
+        [sys.executable, *(['-X', 'importtime'] if importtime else []), '-c', SIDE_EFFECT_PROBE],
+        capture_output=True, text=True, cwd=os.getcwd(), env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing backend.app failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help='Maximum allowed import time of backend.app')
+    parser.add_argument('--top', type=int, default=15, help='Number of slowest modules to list')
+    parser.add_argument('--json', help='Write the results to this JSON file')
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    try:
+        probe, modules = run_probe()
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    print(f"import backend.app: {probe['import_ms']:.1f}ms (budget {args.budget_ms:.0f}ms)")
+    print(f"{'module':<60}{'self ms':>10}{'cumul ms':>10}")
+    for module, self_us, cumulative_us in modules[:args.top]:
+        print(f"{module:<60}{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}")
+
+    failures = [name for name in SIDE_EFFECTS if probe[name]]
+    if probe['import_ms'] > args.budget_ms:
+        failures.append('over_budget')
+    for failure in failures:
+        print(f"FAIL: {failure}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'probe': probe, 'modules': modules[:args.top], 'failures': failures}, f, indent=2)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
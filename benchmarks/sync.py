@@ -0,0 +1,103 @@
+"""
+Sync throughput benchmark against the fake Garmin Connect API.
+
+Seeds a SQLite database, then runs sync_all_data() in-process against a
+FakeGarminConnect with the requested latency, error rate and rate limit, and
+reports the sync wall time, rows stored per second and the API calls made,
+failed and throttled. The fake is deterministic, so two runs with the same
+options differ only by the code under test.
+
+Usage:
+    python -m benchmarks.sync --days 120 --unsynced-days 30 --latency 0.05 --error-rate 0.02
+    python -m benchmarks.sync --days 120 --unsynced-days 30 --latency 0.05 --garmin-concurrency 1
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from benchmarks.fake_garmin import add_fake_arguments, fake_from_args
+from benchmarks.run import configure_environment
+
+def count_rows(db) -> dict:
+    """Return the number of rows per synced table."""
+    from backend.models.models import Activities, ActivityRecords, ActivityTracks, HealthSummary, SleepMetrics
+    return {model.__tablename__: db.query(model).count()
+            for model in (Activities, ActivityRecords, ActivityTracks, HealthSummary, SleepMetrics)}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--database', help='SQLAlchemy URL to benchmark against (default: temporary SQLite file)')
+    parser.add_argument('--days', type=int, default=120, help='Days of synthetic history')
+    parser.add_argument('--activity-every', type=float, default=1.5, help='Average days between activities')
+    parser.add_argument('--records', type=int, default=600, help='GPS records per activity')
+    parser.add_argument('--unsynced-days', type=int, default=30, help='Newest days left for the sync to fetch')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for data generation and fault injection')
+    parser.add_argument('--garmin-concurrency', type=int, default=8,
+                        help='Requests in flight during the sync, 1 for the sequential fetchers')
+    parser.add_argument('--json', help='Write the results to this JSON file')
+    add_fake_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='garminsync-sync-bench-')
+    configure_environment(args.database or f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    os.environ['GARMIN_CONCURRENCY'] = str(args.garmin_concurrency)
+
+    # Backend imports must follow configure_environment()
+    from backend.core.create_db import get_db
+    from backend.core.garmin_client import GarminClient
+    from backend.data.sync import sync_all_data
+    from backend.models.models import init_db
+    from benchmarks.seed import seed_database
+
+    fake = fake_from_args(args)
+    GarminClient._client = fake
+
+    init_db()
+    seeded = seed_database(fake, unsynced_days=args.unsynced_days)
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    db = next(get_db())
+    try:
+        before = count_rows(db)
+        start = time.perf_counter()
+        success = sync_all_data()
+        elapsed = time.perf_counter() - start
+        after = count_rows(db)
+    finally:
+        db.close()
+
+    added = {table: after[table] - before[table] for table in after}
+    calls = fake.call_summary()
+    report = {
+        'config': vars(args),
+        'seeded': seeded,
+        'success': success,
+        'wall_time_s': round(elapsed, 3),
+        'rows_added': added,
+        'rows_per_s': round(sum(added.values()) / elapsed, 1) if elapsed else 0.0,
+        'garmin_calls': calls,
+        'garmin_calls_per_s': round(calls['calls'] / elapsed, 1) if elapsed else 0.0,
+        'per_method': {method: dict(stats) for method, stats in sorted(fake.stats.items())},
+    }
+
+    print(f"Sync {'succeeded' if success else 'failed'} in {report['wall_time_s']}s")
+    print(f"Rows added: {added} ({report['rows_per_s']} rows/s)")
+    print(f"Garmin API: {calls['calls']} calls ({report['garmin_calls_per_s']}/s), "
+          f"{calls['errors']} errors, {calls['throttled']} throttled")
+    print(f"{'method':<32}{'calls':>8}{'errors':>8}{'throttled':>11}")
+    for method, stats in report['per_method'].items():
+        print(f"{method:<32}{stats['calls']:>8}{stats['errors']:>8}{stats['throttled']:>11}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""
+Shared setup of the backend tests in backend/tests.
+
+The backend reads its configuration from the environment at import time, so
+the test database is configured here, before the backend package is first
+imported. Tests using the `db` fixture get freshly created tables.
+"""
+
+import os
+import tempfile
+import pytest
+from benchmarks.run import configure_environment
+
+configure_environment(f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='garminsync-tests-'), 'test.db')}")
+os.environ['LOG_FILE'] = ''
+
+
+@pytest.fixture
+def db():
+    """Yield a session on an empty database."""
+    from backend.core.create_db import get_db, get_engine
+    from backend.models.models import Base, init_db
+
+    Base.metadata.drop_all(get_engine())
+    init_db()
+    session = next(get_db())
+    try:
+        yield session
+    finally:
+        session.close()